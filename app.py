@@ -15,10 +15,23 @@ import plotly.express as px
 import pandas as pd
 import geopandas as gpd
 import json
+import threading
+from dataclasses import dataclass
 import folium
 from folium import GeoJson
 import matplotlib.colors as mcolors
 
+from src.config import settings
+from src.monitoring import cached, instrument_dash_app
+from src.analysis.clustering import zone_clusters
+from src.analysis.scenarios import ScenarioEngine
+from src.analysis.winners import WinnerIndex
+from src.etl.coverage import dissolve_coverage
+from src.visualization.labels import LabelLayer, add_label_anchors
+from src.visualization.maps import cluster_layer
+from src.visualization.live_push import attach_live_push, live_push_components
+from src.visualization.scenario_panel import register_scenario_callbacks, scenario_panel
+
 # ============================================================================
 # CONFIGURACIÓN Y DATOS
 # ============================================================================
@@ -38,28 +51,52 @@ PARTY_COLORS = {
 # Cargar datos
 print("Cargando datos...")
 gdf_geo = gpd.read_file('data/raw/Seccionales_Circuitos.geojson')
-gdf_geo['geometry'] = gdf_geo.geometry.buffer(0)
-dissolved = gdf_geo.dissolve(by='Seccional').reset_index()
+# Unión por aristas compartidas de la cobertura de circuitos (reparada y cacheada)
+dissolved = dissolve_coverage(gdf_geo, by='Seccional')
 dissolved['geometry'] = dissolved.geometry.simplify(tolerance=0.001, preserve_topology=True)
 dissolved['Seccional'] = dissolved['Seccional'].astype(str)
-dissolved['centroid'] = dissolved.geometry.centroid
-dissolved['lat'] = dissolved['centroid'].y
-dissolved['lon'] = dissolved['centroid'].x
+# Todas las etiquetas de seccional visibles desde el zoom inicial del mapa (12)
+dissolved = add_label_anchors(dissolved, 'Sec. ' + dissolved['Seccional'], min_zoom=11, max_zoom=15,
+                              show_all_from=12)
 
 df_electoral = pd.read_csv('data/processed/electoral_data_clean.csv')
 df_electoral['seccional'] = df_electoral['seccional'].astype(str)
 
-# Calcular ganadores
-ganadores = df_electoral.loc[df_electoral.groupby(['anio', 'seccional'])['votos'].idxmax()]
+# Calcular ganadores (índice incremental: se actualiza con los datos en vivo sin reagrupar)
+winner_index = WinnerIndex.from_frame(df_electoral)
+
+# Perfiles electorales (clustering de seccionales, cacheado por versión de datos).
+# En proceso: 14 seccionales no justifican un pool, y con spawn (Windows/macOS)
+# cada worker reimportaría el dashboard. Con datos en vivo el año en conteo queda
+# fuera: los perfiles no se recalculan con cada snapshot parcial
+perfilados = df_electoral[df_electoral['anio'] != settings.LIVE_YEAR] if settings.LIVE_ENABLED else df_electoral
+clusters = zone_clusters(perfilados, workers=1)
+
+
+@dataclass(frozen=True, eq=False)
+class DatosElectorales:
+    """Resultados, ganadores y perfiles de una misma versión de los datos"""
+    df_electoral: pd.DataFrame
+    ganadores: pd.DataFrame
+    clusters: pd.DataFrame
+
+
+# Los callbacks leen `datos` una vez por llamada; los datos en vivo lo reemplazan entero
+datos = DatosElectorales(df_electoral, winner_index.frame(), clusters)
+datos_lock = threading.Lock()
+
+# Escenarios (coaliciones y swing) sobre la matriz de votos precargada
+scenario_engine = ScenarioEngine.from_results(df_electoral)
 
 print(f"Datos cargados: {len(dissolved)} seccionales, {len(df_electoral)} registros")
 
 # Función para crear mapa Folium con colores por partido
-def create_folium_map(selected_year):
+def create_folium_map(selected_year, version=None):
     """Crea mapa Folium con colores según partido ganador"""
+    version = version or datos
 
     # Filtrar ganadores del año
-    gan_year = ganadores[ganadores['anio'] == selected_year].copy()
+    gan_year = version.ganadores[version.ganadores['anio'] == selected_year].copy()
 
     # Merge con geometrías
     gdf_year = dissolved.merge(
@@ -131,6 +168,7 @@ def create_folium_map(selected_year):
     # Agregar GeoJSON con hover
     geojson = GeoJson(
         data=gdf_for_geojson,
+        name='Ganador por seccional',
         style_function=style_function,
         highlight_function=highlight_function,
         tooltip=folium.GeoJsonTooltip(
@@ -154,23 +192,37 @@ def create_folium_map(selected_year):
     )
     geojson.add_to(m)
 
-    # Agregar etiquetas
-    for idx, row in gdf_year.iterrows():
-        folium.Marker(
-            location=[row['lat'], row['lon']],
-            icon=folium.DivIcon(html=f"""
-                <div style="
-                    font-size: 11px;
-                    font-weight: bold;
-                    color: #1a1a1a;
-                    text-shadow: -1px -1px 0 #fff, 1px -1px 0 #fff, -1px 1px 0 #fff, 1px 1px 0 #fff;
-                    text-align: center;
-                ">Sec. {row['Seccional']}</div>
-            """)
-        ).add_to(m)
+    # Capa opcional de perfiles electorales
+    cluster_layer(dissolved, 'Seccional', version.clusters).add_to(m)
+    folium.LayerControl(collapsed=True).add_to(m)
+
+    # Agregar etiquetas (una sola capa, anclas precalculadas)
+    LabelLayer(dissolved).add_to(m)
 
     return m
 
+@cached('map_html', maxsize=16)
+def render_map_html(selected_year, version):
+    """HTML del mapa de un año; se cachea por año y versión de los datos"""
+    return create_folium_map(selected_year, version)._repr_html_()
+
+# Resultados en vivo (python -m src.etl.live): llegan por push y reemplazan al año en conteo
+def apply_live_results(live):
+    """Reemplaza el año en conteo por el último snapshot en vivo"""
+    global datos
+    if live.empty:
+        return
+    with datos_lock:
+        actual = datos
+        df = actual.df_electoral
+        df = pd.concat([df[df['anio'] != live['anio'].iloc[0]], live], ignore_index=True)
+        ganadores = winner_index.frame() if winner_index.replace(live) else actual.ganadores
+        # Escenarios sobre los mismos datos que el mapa principal
+        scenario_engine.update(live)
+        # Una sola asignación publica la versión nueva; el HTML de las anteriores ya no se pide
+        datos = DatosElectorales(df, ganadores, actual.clusters)
+    render_map_html.cache_clear()
+
 # ============================================================================
 # INICIALIZAR APP
 # ============================================================================
@@ -209,6 +261,9 @@ app.index_string = '''
 # ============================================================================
 
 app.layout = dbc.Container([
+    # Datos en vivo (stream SSE y estado en el cliente)
+    *live_push_components(PARTY_COLORS),
+
     # Header
     dbc.Row([
         dbc.Col([
@@ -326,6 +381,9 @@ app.layout = dbc.Container([
         ], xs=12, md=4, lg=4)
     ], className="mb-3 map-section"),
 
+    # Escenarios
+    scenario_panel(scenario_engine),
+
     # Tabla comparativa
     dbc.Row([
         dbc.Col([
@@ -372,13 +430,13 @@ app.layout = dbc.Container([
 def update_map_and_metrics(selected_year, selected_seccional):
     """Actualiza mapa y métricas según año y seccional seleccionados"""
 
-    # Filtrar datos del año
-    gan_year = ganadores[ganadores['anio'] == selected_year].copy()
-    df_year = df_electoral[df_electoral['anio'] == selected_year].copy()
+    # Filtrar datos del año (una sola versión de los datos en toda la llamada)
+    version = datos
+    gan_year = version.ganadores[version.ganadores['anio'] == selected_year].copy()
+    df_year = version.df_electoral[version.df_electoral['anio'] == selected_year].copy()
 
     # Generar mapa Folium
-    folium_map = create_folium_map(selected_year)
-    map_html = folium_map._repr_html_()
+    map_html = render_map_html(selected_year, version)
     
     # Inyectar CSS personalizado directamente en el iframe del mapa
     # Esto soluciona los problemas de estilo en móviles que no se arreglan desde el padre
@@ -531,7 +589,7 @@ def update_comparison_table(selected_year):
     """Tabla comparativa de resultados"""
 
     # Obtener resultados de todos los años
-    gan_all = ganadores.pivot(index='seccional', columns='anio', values='agrupacion').reset_index()
+    gan_all = datos.ganadores.pivot(index='seccional', columns='anio', values='agrupacion').reset_index()
     gan_all.columns = ['Seccional'] + [str(int(col)) if col != 'seccional' else col for col in gan_all.columns[1:]]
     gan_all = gan_all.sort_values('Seccional')
 
@@ -565,6 +623,14 @@ def update_comparison_table(selected_year):
         size='sm'
     )
 
+# Panel de escenarios: mapa Plotly + tabla de bancas, recalculados por ScenarioEngine
+register_scenario_callbacks(scenario_engine, dissolved, 'Seccional', PARTY_COLORS,
+                            refresh_id='live-data' if settings.LIVE_ENABLED else None)
+
+# Push de resultados en vivo (SSE) a los dashboards abiertos
+if settings.LIVE_ENABLED:
+    attach_live_push(app, on_update=apply_live_results)
+
 # ============================================================================
 # RUN SERVER
 # ============================================================================
@@ -572,6 +638,10 @@ def update_comparison_table(selected_year):
 # Exponer server para gunicorn
 server = app.server
 
+# Métricas Prometheus en /metrics y latencia por callback
+if settings.METRICS_ENABLED:
+    instrument_dash_app(app)
+
 if __name__ == '__main__':
     import os
     port = int(os.environ.get('PORT', 8050))
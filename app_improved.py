@@ -19,10 +19,23 @@ import plotly.express as px
 import pandas as pd
 import geopandas as gpd
 import json
+import threading
+from dataclasses import dataclass
 import folium
 from folium import GeoJson
 import matplotlib.colors as mcolors
 
+from src.config import settings
+from src.monitoring import cached, instrument_dash_app
+from src.analysis.clustering import zone_clusters
+from src.analysis.scenarios import ScenarioEngine
+from src.analysis.winners import WinnerIndex
+from src.etl.coverage import dissolve_coverage
+from src.visualization.labels import LabelLayer, add_label_anchors
+from src.visualization.maps import cluster_layer
+from src.visualization.live_push import attach_live_push, live_push_components
+from src.visualization.scenario_panel import register_scenario_callbacks, scenario_panel
+
 # ============================================================================
 # CONFIGURACIÓN Y DATOS
 # ============================================================================
@@ -39,23 +52,45 @@ PARTY_COLORS = {
     'DEFAULT': '#CCCCCC'
 }
 
+@dataclass(frozen=True, eq=False)
+class DatosElectorales:
+    """Resultados, ganadores y perfiles de una misma versión de los datos"""
+    df_electoral: pd.DataFrame
+    ganadores: pd.DataFrame
+    clusters: pd.DataFrame
+
+
 # Cargar datos
 print("Cargando datos...")
 try:
     gdf_geo = gpd.read_file('data/raw/Seccionales_Circuitos.geojson')
-    gdf_geo['geometry'] = gdf_geo.geometry.buffer(0)
-    dissolved = gdf_geo.dissolve(by='Seccional').reset_index()
+    # Unión por aristas compartidas de la cobertura de circuitos (reparada y cacheada)
+    dissolved = dissolve_coverage(gdf_geo, by='Seccional')
     dissolved['geometry'] = dissolved.geometry.simplify(tolerance=0.001, preserve_topology=True)
     dissolved['Seccional'] = dissolved['Seccional'].astype(str)
-    dissolved['centroid'] = dissolved.geometry.centroid
-    dissolved['lat'] = dissolved['centroid'].y
-    dissolved['lon'] = dissolved['centroid'].x
+    # Todas las etiquetas de seccional visibles desde el zoom inicial del mapa (12)
+    dissolved = add_label_anchors(dissolved, 'Sec. ' + dissolved['Seccional'], min_zoom=11, max_zoom=15,
+                                  show_all_from=12)
 
     df_electoral = pd.read_csv('data/processed/electoral_data_clean.csv')
     df_electoral['seccional'] = df_electoral['seccional'].astype(str)
 
-    # Calcular ganadores
-    ganadores = df_electoral.loc[df_electoral.groupby(['anio', 'seccional'])['votos'].idxmax()]
+    # Calcular ganadores (índice incremental: se actualiza con los datos en vivo sin reagrupar)
+    winner_index = WinnerIndex.from_frame(df_electoral)
+
+    # Perfiles electorales (clustering de seccionales, cacheado por versión de datos).
+    # En proceso: 14 seccionales no justifican un pool, y con spawn (Windows/macOS)
+    # cada worker reimportaría el dashboard. Con datos en vivo el año en conteo queda
+    # fuera: los perfiles no se recalculan con cada snapshot parcial
+    perfilados = df_electoral[df_electoral['anio'] != settings.LIVE_YEAR] if settings.LIVE_ENABLED else df_electoral
+    clusters = zone_clusters(perfilados, workers=1)
+
+    # Los callbacks leen `datos` una vez por llamada; los datos en vivo lo reemplazan entero
+    datos = DatosElectorales(df_electoral, winner_index.frame(), clusters)
+    datos_lock = threading.Lock()
+
+    # Escenarios (coaliciones y swing) sobre la matriz de votos precargada
+    scenario_engine = ScenarioEngine.from_results(df_electoral)
 
     print(f"OK Datos cargados: {len(dissolved)} seccionales, {len(df_electoral)} registros")
     DATA_LOADED = True
@@ -64,13 +99,14 @@ except Exception as e:
     DATA_LOADED = False
 
 # Función para crear mapa Folium
-def create_folium_map(selected_year):
+def create_folium_map(selected_year, version=None):
     """Crea mapa Folium con colores según partido ganador"""
 
     if not DATA_LOADED:
         return folium.Map(location=[-31.4201, -64.1888], zoom_start=12)
 
-    gan_year = ganadores[ganadores['anio'] == selected_year].copy()
+    version = version or datos
+    gan_year = version.ganadores[version.ganadores['anio'] == selected_year].copy()
     gdf_year = dissolved.merge(gan_year, left_on='Seccional', right_on='seccional', how='left')
     gdf_year['color'] = gdf_year['agrupacion'].apply(
         lambda x: PARTY_COLORS.get(x, PARTY_COLORS['DEFAULT']) if pd.notna(x) else PARTY_COLORS['DEFAULT']
@@ -109,6 +145,7 @@ def create_folium_map(selected_year):
 
     geojson = GeoJson(
         data=gdf_for_geojson,
+        name='Ganador por seccional',
         style_function=style_function,
         highlight_function=highlight_function,
         tooltip=folium.GeoJsonTooltip(
@@ -120,14 +157,36 @@ def create_folium_map(selected_year):
     )
     geojson.add_to(m)
 
-    for idx, row in gdf_year.iterrows():
-        folium.Marker(
-            location=[row['lat'], row['lon']],
-            icon=folium.DivIcon(html=f'<div style="font-size:11px;font-weight:bold;color:#1a1a1a;text-shadow:-1px -1px 0 #fff,1px -1px 0 #fff,-1px 1px 0 #fff,1px 1px 0 #fff;text-align:center;">Sec. {row["Seccional"]}</div>')
-        ).add_to(m)
+    # Capa opcional de perfiles electorales
+    cluster_layer(dissolved, 'Seccional', version.clusters).add_to(m)
+    folium.LayerControl(collapsed=True).add_to(m)
+
+    LabelLayer(dissolved).add_to(m)
 
     return m
 
+@cached('map_html', maxsize=16)
+def render_map_html(selected_year, version):
+    """HTML del mapa de un año; se cachea por año y versión de los datos"""
+    return create_folium_map(selected_year, version)._repr_html_()
+
+# Resultados en vivo (python -m src.etl.live): llegan por push y reemplazan al año en conteo
+def apply_live_results(live):
+    """Reemplaza el año en conteo por el último snapshot en vivo"""
+    global datos
+    if live.empty:
+        return
+    with datos_lock:
+        actual = datos
+        df = actual.df_electoral
+        df = pd.concat([df[df['anio'] != live['anio'].iloc[0]], live], ignore_index=True)
+        ganadores = winner_index.frame() if winner_index.replace(live) else actual.ganadores
+        # Escenarios sobre los mismos datos que el mapa principal
+        scenario_engine.update(live)
+        # Una sola asignación publica la versión nueva; el HTML de las anteriores ya no se pide
+        datos = DatosElectorales(df, ganadores, actual.clusters)
+    render_map_html.cache_clear()
+
 # ============================================================================
 # INICIALIZAR APP
 # ============================================================================
@@ -146,6 +205,10 @@ app.title = "Dashboard Electoral Córdoba"
 # Expose server for deployment
 server = app.server
 
+# Métricas Prometheus en /metrics y latencia por callback
+if settings.METRICS_ENABLED:
+    instrument_dash_app(app)
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -164,6 +227,9 @@ def create_info_tooltip(text):
 # ============================================================================
 
 app.layout = dbc.Container([
+    # Datos en vivo (stream SSE y estado en el cliente)
+    *live_push_components(PARTY_COLORS),
+
     # Loading overlay
     html.Div(id="loading-overlay", style={"display": "none"}),
 
@@ -347,6 +413,9 @@ app.layout = dbc.Container([
         ], xs=12, lg=4)
     ], className="mb-4"),
 
+    # Escenarios
+    scenario_panel(scenario_engine) if DATA_LOADED else html.Div(),
+
     # Tabla comparativa - COLAPSABLE
     dbc.Row([
         dbc.Col([
@@ -441,13 +510,13 @@ def update_dashboard(selected_year, selected_seccional):
         empty_fig.add_annotation(text="Error cargando datos", showarrow=False)
         return ("", "Error", "Error", [], "Error", empty_fig, empty_fig, "Error", "Error")
 
-    # Filtrar datos
-    gan_year = ganadores[ganadores['anio'] == selected_year].copy()
-    df_year = df_electoral[df_electoral['anio'] == selected_year].copy()
+    # Filtrar datos (una sola versión de los datos en toda la llamada)
+    version = datos
+    gan_year = version.ganadores[version.ganadores['anio'] == selected_year].copy()
+    df_year = version.df_electoral[version.df_electoral['anio'] == selected_year].copy()
 
     # Generar mapa
-    folium_map = create_folium_map(selected_year)
-    map_html = folium_map._repr_html_()
+    map_html = render_map_html(selected_year, version)
 
     # Filtrar por seccional
     if selected_seccional and selected_seccional != 'all':
@@ -502,7 +571,7 @@ def update_table(selected_year):
     if not DATA_LOADED:
         return html.P("Error cargando datos", className="text-danger")
 
-    gan_all = ganadores.pivot(index='seccional', columns='anio', values='agrupacion').reset_index()
+    gan_all = datos.ganadores.pivot(index='seccional', columns='anio', values='agrupacion').reset_index()
     gan_all.columns = ['Seccional'] + [str(int(col)) if col != 'seccional' else col for col in gan_all.columns[1:]]
     gan_all = gan_all.sort_values('Seccional')
 
@@ -522,6 +591,15 @@ def update_table(selected_year):
     return dbc.Table(table_header + [html.Tbody(rows)], bordered=True, hover=True,
                     responsive=True, striped=True, size='sm', className="comparison-table")
 
+# Panel de escenarios: mapa Plotly + tabla de bancas, recalculados por ScenarioEngine
+if DATA_LOADED:
+    register_scenario_callbacks(scenario_engine, dissolved, 'Seccional', PARTY_COLORS,
+                                refresh_id='live-data' if settings.LIVE_ENABLED else None)
+
+# Push de resultados en vivo (SSE) a los dashboards abiertos
+if settings.LIVE_ENABLED and DATA_LOADED:
+    attach_live_push(app, on_update=apply_live_results)
+
 # ============================================================================
 # RUN SERVER
 # ============================================================================
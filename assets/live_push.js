@@ -0,0 +1,204 @@
+// Resultados en vivo por Server-Sent Events (ver src/visualization/live_push.py)
+// connect() abre el stream una sola vez y deja el estado en el store live-data;
+// apply() actualiza gráficos, métricas y colores del mapa sin pedir figuras al servidor.
+
+(function () {
+    let source = null;
+    let state = null;  // {version, year, parties, zones: {seccional: [votos]}, changed}
+
+    function publish() {
+        window.dash_clientside.set_props('live-data', {data: state});
+    }
+
+    function open(url) {
+        source = new EventSource(url);
+
+        source.addEventListener('snapshot', function (event) {
+            state = JSON.parse(event.data);
+            publish();
+        });
+
+        source.addEventListener('delta', function (event) {
+            const delta = JSON.parse(event.data);
+            if (!state || state.version !== delta.base) {
+                // Falta una versión intermedia: al reconectar llega el snapshot completo
+                source.close();
+                open(url);
+                return;
+            }
+            const width = delta.parties.length;
+            const zones = {};
+            Object.entries(state.zones).forEach(function ([zone, votes]) {
+                zones[zone] = votes.concat(new Array(width - votes.length).fill(0));
+            });
+            Object.assign(zones, delta.zones);
+            state = {
+                version: delta.version, year: delta.year, parties: delta.parties,
+                zones: zones, changed: Object.keys(delta.zones)
+            };
+            publish();
+        });
+    }
+
+    function partyTotals(data, seccional) {
+        const sums = new Array(data.parties.length).fill(0);
+        Object.entries(data.zones).forEach(function ([zone, votes]) {
+            if (seccional && seccional !== 'all' && zone !== String(seccional)) {
+                return;
+            }
+            votes.forEach(function (v, i) { sums[i] += v; });
+        });
+        return data.parties.map(function (party, i) { return [party, sums[i]]; })
+            .filter(function (row) { return row[1] > 0; })
+            .sort(function (a, b) { return b[1] - a[1]; });
+    }
+
+    function format(value) {
+        return value.toLocaleString('en-US');
+    }
+
+    function darken(hex) {
+        const rgb = hex.replace('#', '').match(/../g).map(function (c) {
+            return Math.round(parseInt(c, 16) * 0.7).toString(16).padStart(2, '0');
+        });
+        return '#' + rgb.join('');
+    }
+
+    function pieFigure(figure, top, total, color) {
+        const trace = Object.assign({}, figure.data[0], {
+            labels: top.map(function (row) { return row[0]; }),
+            values: top.map(function (row) { return row[1]; }),
+            customdata: top.map(function (row) { return [row[0]]; }),
+            marker: Object.assign({}, figure.data[0].marker, {colors: top.map(function (row) { return color(row[0]); })})
+        });
+        const layout = Object.assign({}, figure.layout);
+        if (layout.annotations) {
+            layout.annotations = layout.annotations.map(function (note) {
+                return note.text && note.text.startsWith('Total')
+                    ? Object.assign({}, note, {text: 'Total<br>' + format(total)}) : note;
+            });
+        }
+        return Object.assign({}, figure, {data: [trace], layout: layout});
+    }
+
+    function barFigure(figure, top, color) {
+        const template = figure.data[0] || {type: 'bar', orientation: 'h'};
+        const data = top.map(function ([party, votes]) {
+            return Object.assign({}, template, {
+                name: party, legendgroup: party, x: [votes], y: [party],
+                text: template.text !== undefined ? [votes] : undefined,
+                marker: Object.assign({}, template.marker, {color: color(party)})
+            });
+        });
+        return Object.assign({}, figure, {data: data});
+    }
+
+    // Ventanas con Leaflet dentro del iframe del mapa (Folium anida un segundo iframe)
+    function mapWindows(win) {
+        const found = [];
+        try {
+            if (win.L) {
+                found.push(win);
+            }
+            for (let i = 0; i < win.frames.length; i++) {
+                found.push.apply(found, mapWindows(win.frames[i]));
+            }
+        } catch (e) {
+            // Iframe de otro origen
+        }
+        return found;
+    }
+
+    function recolorMap(data, color) {
+        const frame = document.getElementById('electoral-map');
+        if (!frame || !frame.contentWindow) {
+            return;
+        }
+        const updates = {};
+        (data.changed || Object.keys(data.zones)).forEach(function (zone) {
+            const votes = data.zones[zone];
+            const total = votes.reduce(function (a, b) { return a + b; }, 0);
+            const best = votes.indexOf(Math.max.apply(null, votes));
+            if (total > 0) {
+                updates[zone] = {
+                    agrupacion: data.parties[best], votos: votes[best],
+                    porcentaje: Math.round(votes[best] / total * 10000) / 100, color: color(data.parties[best])
+                };
+            }
+        });
+
+        mapWindows(frame.contentWindow).forEach(function (win) {
+            Object.keys(win).forEach(function (name) {
+                const layer = win[name];
+                if (!name.startsWith('geo_json_') || !(layer instanceof win.L.GeoJSON)) {
+                    return;
+                }
+                const features = layer.getLayers();
+                if (!features.length || !('agrupacion' in features[0].feature.properties)) {
+                    return;  // Solo la capa de ganadores
+                }
+                if (!layer._liveColors) {
+                    // Los estilos de Folium salen de funciones fijas: envolverlas para que resetStyle y el hover usen el nuevo color
+                    layer._liveColors = {};
+                    const style = layer.options.style;
+                    layer.options.style = function (feature) {
+                        const fill = layer._liveColors[feature.properties.Seccional];
+                        return fill ? Object.assign({}, style(feature), {fillColor: fill}) : style(feature);
+                    };
+                    const highlighter = win[name + '_highlighter'];
+                    if (highlighter) {
+                        win[name + '_highlighter'] = function (feature) {
+                            const fill = layer._liveColors[feature.properties.Seccional];
+                            return fill ? Object.assign({}, highlighter(feature), {fillColor: darken(fill)}) : highlighter(feature);
+                        };
+                    }
+                }
+                features.forEach(function (feature) {
+                    const props = feature.feature.properties;
+                    const update = updates[props.Seccional];
+                    if (!update) {
+                        return;
+                    }
+                    layer._liveColors[props.Seccional] = update.color;
+                    props.agrupacion = update.agrupacion;
+                    props.votos = update.votos;
+                    props.porcentaje = update.porcentaje;
+                    layer.resetStyle(feature);
+                });
+            });
+        });
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        live: {
+            connect: function (config) {
+                if (config && config.url && !source) {
+                    open(config.url);
+                }
+                return window.dash_clientside.no_update;
+            },
+
+            apply: function (data, config, year, seccional, pie, bar) {
+                const skip = window.dash_clientside.no_update;
+                if (!data || !config || data.year !== year || !pie || !bar) {
+                    return [skip, skip, skip, skip];
+                }
+                const color = function (party) { return config.colors[party] || config.default; };
+
+                const city = partyTotals(data, 'all');
+                const selected = partyTotals(data, seccional);
+                const top = selected.slice(0, 5);
+                const selectedTotal = selected.reduce(function (a, row) { return a + row[1]; }, 0);
+                const cityTotal = city.reduce(function (a, row) { return a + row[1]; }, 0);
+
+                recolorMap(data, color);
+                return [
+                    pieFigure(pie, top, selectedTotal, color),
+                    barFigure(bar, top, color),
+                    format(cityTotal),
+                    city.length ? city[0][0] : skip
+                ];
+            }
+        }
+    });
+})();
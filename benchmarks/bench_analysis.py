@@ -0,0 +1,144 @@
+"""Benchmarks for every public function in src/analysis."""
+import numpy as np
+import pytest
+
+from src.analysis import electoral_trends, political_analysis
+from src.analysis import clustering, seats, transfers
+from src.analysis.scenarios import ScenarioEngine
+from src.analysis.rollup import build_rollup, circuito_code
+from src.analysis.spatial import SpatialAnalysis, SpatialWeights, share_matrix
+from src.analysis.winners import WinnerIndex
+from src.backends import BACKENDS, get_backend
+
+TRENDS = ['get_votes_by_year', 'get_votes_by_seccional', 'calculate_growth_rate',
+          'get_winner_by_seccional', 'get_top_parties']
+POLITICAL = ['calculate_pedersen_index', 'identify_competitive_seccionales',
+             'calculate_concentration_index', 'analyze_vote_swing']
+
+
+@pytest.mark.parametrize('name', TRENDS)
+def bench_electoral_trends(benchmark, clean_results, name):
+    benchmark(getattr(electoral_trends, name), clean_results)
+
+
+@pytest.mark.parametrize('name', POLITICAL)
+def bench_political_analysis(benchmark, clean_results, name):
+    benchmark(getattr(political_analysis, name), clean_results)
+
+
+def bench_build_rollup(benchmark, mesa_results):
+    benchmark(build_rollup, mesa_results)
+
+
+@pytest.fixture(scope='module')
+def mesa_parquet(mesa_results, tmp_path_factory):
+    path = tmp_path_factory.mktemp('backends') / 'resultados_mesa.parquet'
+    mesa_results.to_parquet(path, index=False)
+    return path
+
+
+@pytest.fixture(params=list(BACKENDS))
+def backend(request):
+    try:
+        return get_backend(request.param)
+    except ImportError as exc:
+        pytest.skip(str(exc))
+
+
+@pytest.mark.parametrize('operation', ['group_totals', 'shares', 'winners'])
+def bench_backend_mesa_parquet(benchmark, backend, mesa_parquet, operation):
+    if operation == 'group_totals':
+        benchmark(backend.group_totals, mesa_parquet, ['anio', 'seccional', 'agrupacion'])
+    else:
+        benchmark(getattr(backend, operation), mesa_parquet, ['anio', 'seccional', 'circuito'])
+
+
+@pytest.fixture(scope='module')
+def circuit_zones(circuits):
+    codes = [circuito_code(props) for props in circuits.drop(columns='geometry').to_dict('records')]
+    return circuits.assign(circuito=codes)
+
+
+@pytest.mark.parametrize('kind', ['queen', 'rook'])
+def bench_spatial_weights(benchmark, circuit_zones, kind):
+    benchmark(SpatialWeights.from_geodataframe, circuit_zones, 'circuito', kind)
+
+
+@pytest.mark.parametrize('statistic', ['global_moran', 'local_moran', 'getis_ord'])
+def bench_spatial_statistics(benchmark, circuit_zones, mesa_results, statistic):
+    weights = SpatialWeights.from_geodataframe(circuit_zones, 'circuito', 'rook')
+    analysis = SpatialAnalysis(share_matrix(mesa_results, zone='circuito'), weights, permutations=99, workers=1)
+    benchmark(getattr(analysis, statistic))
+
+
+@pytest.mark.parametrize('method', clustering.METHODS)
+def bench_cluster_sweep_uncached(benchmark, circuit_zones, mesa_results, method):
+    weights = SpatialWeights.from_geodataframe(circuit_zones, 'circuito', 'rook')
+    profiles = clustering.profile_matrix(mesa_results, zone='circuito')
+    benchmark.pedantic(clustering.cluster_zones, args=(profiles, [method]),
+                       kwargs={'weights': weights, 'workers': 1, 'cache_dir': None},
+                       setup=clustering._memory_cache.clear, rounds=3, iterations=1)
+
+
+@pytest.fixture(scope='module')
+def mesa_votes(mesa_results):
+    mesas = mesa_results.assign(mesa_id=mesa_results['circuito'] + '-' + mesa_results['mesa'].astype(str))
+    return transfers.zone_votes(mesas, 'mesa_id')
+
+
+@pytest.mark.parametrize('bootstrap', [0, 100])
+def bench_transfers_mesa(benchmark, mesa_votes, bootstrap):
+    years = sorted(mesa_votes.columns.get_level_values('anio').unique())
+    benchmark.pedantic(transfers.estimate_transfers, args=(mesa_votes, years[0], years[1]),
+                       kwargs={'bootstrap': bootstrap, 'workers': 1, 'cache_dir': None},
+                       setup=transfers._memory_cache.clear, rounds=3, iterations=1)
+
+
+@pytest.mark.parametrize('scenarios', [1_000, 100_000])
+def bench_dhondt(benchmark, scenarios):
+    votes = np.random.default_rng(0).random((scenarios, 12)) * 1e5
+    benchmark(seats.dhondt, votes, 9)
+
+
+def bench_simulate_seats(benchmark, clean_results):
+    year = int(clean_results['anio'].max())
+    benchmark.pedantic(seats.simulate_seats, args=(clean_results, year),
+                       kwargs={'seats': 9, 'simulations': 20_000, 'volatility': 5.0, 'workers': 1},
+                       rounds=3, iterations=1)
+
+
+@pytest.fixture(scope='module')
+def scenario_engine(mesa_results):
+    return ScenarioEngine(transfers.zone_votes(mesa_results, 'circuito', min_share=0))
+
+
+@pytest.mark.parametrize('steps', [1, 1_000])
+def bench_scenario_swing(benchmark, scenario_engine, steps):
+    party = scenario_engine.parties[0]
+    swing = {party: np.linspace(-10, 10, steps) if steps > 1 else 5.0}
+    benchmark(scenario_engine.run, swing=swing, years=scenario_engine.years[-1:])
+
+
+@pytest.fixture(scope='module')
+def winner_index(mesa_results):
+    return WinnerIndex.from_frame(mesa_results, by=('anio', 'circuito'))
+
+
+def bench_winner_index_build(benchmark, mesa_results):
+    benchmark(WinnerIndex.from_frame, mesa_results, ('anio', 'circuito'))
+
+
+def bench_winners_groupby(benchmark, mesa_results):
+    """Reference: full regrouping, as the apps did before the index."""
+    def winners():
+        totals = mesa_results.groupby(['anio', 'circuito', 'agrupacion'], as_index=False)['votos'].sum()
+        return totals.loc[totals.groupby(['anio', 'circuito'])['votos'].idxmax()]
+    benchmark(winners)
+
+
+@pytest.mark.parametrize('cells', [1, 1_000])
+def bench_winner_index_update(benchmark, winner_index, cells):
+    rng = np.random.default_rng(0)
+    rows = rng.integers(len(winner_index), size=cells)
+    columns = rng.integers(len(winner_index.parties), size=cells)
+    benchmark(winner_index.add_codes, rows, columns, np.ones(cells, dtype=np.int64))
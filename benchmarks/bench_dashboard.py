@@ -0,0 +1,66 @@
+"""
+Benchmarks for the dashboard map builders and Dash callbacks.
+
+Callbacks are called directly as functions. The module-level data of each
+app is replaced with the scaled synthetic dataset so the timings follow
+the --scale option instead of the bundled files. Callback timings include
+the per-year map HTML cache, as in production.
+"""
+import importlib
+
+import pytest
+
+from src.analysis.clustering import zone_clusters
+from src.analysis.winners import WinnerIndex
+from src.visualization.labels import add_label_anchors
+
+APPS = ['app', 'app_improved']
+
+
+@pytest.fixture(scope='module', params=APPS)
+def dashboard(request, clean_results, seccionales):
+    module = importlib.import_module(request.param)
+
+    dissolved = seccionales.rename(columns={'seccional': 'Seccional'})
+    dissolved['Seccional'] = dissolved['Seccional'].astype(str)
+    dissolved['geometry'] = dissolved.geometry.simplify(tolerance=0.001, preserve_topology=True)
+    dissolved = add_label_anchors(dissolved, 'Sec. ' + dissolved['Seccional'], min_zoom=11, max_zoom=15,
+                                  show_all_from=12)
+
+    df_electoral = clean_results.copy()
+    df_electoral['seccional'] = df_electoral['seccional'].astype(str)
+    winner_index = WinnerIndex.from_frame(df_electoral)
+
+    patch = pytest.MonkeyPatch()
+    patch.setattr(module, 'dissolved', dissolved)
+    patch.setattr(module, 'winner_index', winner_index)
+    patch.setattr(module, 'datos', module.DatosElectorales(
+        df_electoral, winner_index.frame(), zone_clusters(df_electoral, workers=1, cache_dir=None)))
+    module.render_map_html.cache_clear()
+    yield module
+    patch.undo()
+    module.render_map_html.cache_clear()
+
+
+@pytest.fixture(scope='module')
+def year(clean_results):
+    return int(clean_results['anio'].max())
+
+
+def bench_create_folium_map(benchmark, dashboard, year):
+    benchmark(dashboard.create_folium_map, year)
+
+
+def bench_render_map_html_uncached(benchmark, dashboard, year):
+    benchmark(dashboard.render_map_html.__wrapped__, year, dashboard.datos)
+
+
+@pytest.mark.parametrize('seccional', ['all', '1'])
+def bench_map_callback(benchmark, dashboard, year, seccional):
+    callback = getattr(dashboard, 'update_map_and_metrics', None) or dashboard.update_dashboard
+    benchmark(callback, year, seccional)
+
+
+def bench_table_callback(benchmark, dashboard, year):
+    callback = getattr(dashboard, 'update_comparison_table', None) or dashboard.update_table
+    benchmark(callback, year)
@@ -0,0 +1,78 @@
+"""Benchmarks for the stages of run_etl_pipeline."""
+import pandas as pd
+import pytest
+
+from src.config import settings
+from src.etl import coverage, live, load
+from src.etl.extract import extract_electoral_data, extract_geojson
+from src.etl.transform import calculate_percentages, transform_electoral_data, transform_geojson
+from src.etl.utils import get_party_normalization, get_seccional_mapping
+
+
+@pytest.fixture
+def output_paths(tmp_path, monkeypatch):
+    """Point the load stage at a temporary directory."""
+    monkeypatch.setattr(settings, 'CLEAN_CSV', tmp_path / 'electoral_data_clean.csv')
+    monkeypatch.setattr(settings, 'DATABASE_FILE', tmp_path / 'electoral_data.db')
+    return tmp_path
+
+
+def bench_extract_electoral_data(benchmark, synthetic_settings):
+    benchmark.pedantic(extract_electoral_data, rounds=3, iterations=1)
+
+
+def bench_extract_geojson(benchmark, synthetic_settings):
+    benchmark(extract_geojson)
+
+
+def bench_transform_electoral_data(benchmark, election, synthetic_settings):
+    benchmark(transform_electoral_data, election.raw_results())
+
+
+def bench_calculate_percentages(benchmark, mesa_results):
+    # calculate_percentages works in place: each round gets its own copy of the session fixture
+    benchmark.pedantic(calculate_percentages, setup=lambda: ((mesa_results.copy(),), {}), rounds=20, iterations=1)
+
+
+def bench_transform_geojson(benchmark, circuits):
+    benchmark(lambda: transform_geojson(circuits.copy()))
+
+
+def bench_repair_coverage_uncached(benchmark, circuits):
+    benchmark.pedantic(coverage.repair_coverage, args=(circuits.geometry.values,), kwargs={'cache_dir': None},
+                       setup=coverage._memory_cache.clear, rounds=5, iterations=1)
+
+
+def bench_dissolve_overlay(benchmark, circuits):
+    """Reference: the general GEOS union behind GeoDataFrame.dissolve."""
+    benchmark(lambda: circuits.assign(geometry=circuits.buffer(0)).dissolve(by='Seccional'))
+
+
+def bench_load_to_csv(benchmark, clean_results, output_paths):
+    benchmark(load.load_to_csv, clean_results)
+
+
+def bench_load_to_database(benchmark, clean_results, seccionales, output_paths):
+    benchmark.pedantic(load.load_to_database, args=(clean_results, seccionales), rounds=3, iterations=1)
+
+
+@pytest.fixture(scope='module')
+def live_batches(mesa_results):
+    """Last election's mesas in 50 batches, as they would arrive on election night."""
+    year = int(mesa_results['anio'].max())
+    rows = mesa_results[mesa_results['anio'] == year]
+    mesa = pd.factorize(rows['circuito'] + '/' + rows['mesa'].astype(str))[0]
+    return year, [batch for _, batch in rows.groupby(mesa % 50)]
+
+
+def bench_live_ingest(benchmark, live_batches):
+    year, batches = live_batches
+    mappings = get_seccional_mapping(), get_party_normalization()
+
+    def ingest():
+        count = live.LiveCount(year)
+        for batch in batches:
+            count.apply(live.validate_batch(batch, year, settings.LIVE_CARGO, *mappings))
+        return count
+
+    benchmark.pedantic(ingest, rounds=3, iterations=1)
@@ -0,0 +1,94 @@
+"""
+Benchmark suite for the ETL, analysis and dashboard code paths.
+
+Run from the repository root:
+
+    python -m pytest benchmarks                      # small scale
+    python -m pytest benchmarks --scale large
+    python -m pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:10%
+
+Every run is saved under benchmarks/.results (--benchmark-autosave), so
+--benchmark-compare checks the current tree against the previous run and
+the compare-fail threshold turns a slowdown into a failing run.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# app.py / app_improved.py read their data with paths relative to the root
+os.chdir(ROOT)
+
+from src.etl.synthetic import SyntheticElection  # noqa: E402
+
+# Dataset sizes per scale; the real data is 3 years, ~8 parties, 14 seccionales
+SCALES = {
+    'small': dict(years=3, parties=8, seccionales=14, circuits=8, mesas=10, vertices=16),
+    'medium': dict(years=6, parties=16, seccionales=56, circuits=12, mesas=25, vertices=64),
+    'large': dict(years=10, parties=24, seccionales=140, circuits=16, mesas=50, vertices=256),
+}
+
+
+def pytest_addoption(parser):
+    parser.addoption('--scale', choices=sorted(SCALES), default='small',
+                     help='Synthetic dataset size for the benchmarks')
+
+
+def pytest_benchmark_update_machine_info(config, machine_info):
+    machine_info['scale'] = config.getoption('--scale')
+
+
+@pytest.fixture(scope='session')
+def election(request) -> SyntheticElection:
+    return SyntheticElection(**SCALES[request.config.getoption('--scale')])
+
+
+@pytest.fixture(scope='session')
+def raw_files(election, tmp_path_factory):
+    """Raw workbooks, mesa CSVs, circuits GeoJSON and seccional mapping on disk."""
+    return election.write(tmp_path_factory.mktemp('raw'))
+
+
+@pytest.fixture
+def synthetic_settings(raw_files, election, monkeypatch):
+    """Point the ETL at the synthetic raw files (first three years)."""
+    from src.config import settings
+    for anio, attr in zip(election.anios, ['ELECTORAL_2021', 'ELECTORAL_2023', 'ELECTORAL_2025']):
+        monkeypatch.setattr(settings, attr, raw_files[f'seccional_{anio}'])
+    monkeypatch.setattr(settings, 'GEOJSON_FILE', raw_files['geojson'])
+    monkeypatch.setattr(settings, 'SECCIONAL_MAPPING_FILE', raw_files['seccional_mapping'])
+    return settings
+
+
+@pytest.fixture(scope='session')
+def results(election):
+    """Seccional-level results, processed schema."""
+    return election.results()
+
+
+@pytest.fixture(scope='session')
+def mesa_results(election):
+    """Mesa-level results, normalized (adds circuito and mesa columns)."""
+    return election.mesa_results(raw=False)
+
+
+@pytest.fixture(scope='session')
+def clean_results(results):
+    """Seccional-level results with total_votos/porcentaje, as in the clean CSV."""
+    from src.etl.transform import calculate_percentages
+    return calculate_percentages(results.copy())
+
+
+@pytest.fixture(scope='session')
+def circuits(election):
+    return election.circuits_frame()
+
+
+@pytest.fixture(scope='session')
+def seccionales(circuits):
+    from src.etl.transform import transform_geojson
+    return transform_geojson(circuits.copy())
@@ -0,0 +1,395 @@
+"""
+Electoral-profile clustering of zones (seccionales, circuits or mesas).
+
+Each zone is described by its vote shares for every (anio, agrupacion)
+pair (see spatial.share_matrix), so zones that voted alike across the
+three elections fall in the same cluster. A sweep fits many models at
+once:
+
+    kmeans        one fit per (k, seed); MiniBatchKMeans on large inputs
+    hierarchical  one Ward tree, cut at every k; on large inputs the tree is
+                  restricted to a k-nearest-neighbour graph so it stays sparse
+    spatial       one Ward tree restricted to contiguity (SpatialWeights),
+                  so every cluster is a connected region
+
+Fits run in a process pool. A sweep is cached by a hash of the profile
+matrix (the data version), the method parameters and the weights, in
+memory and in settings.CLUSTER_CACHE_DIR, so the dashboard reuses the
+fitted assignments across restarts until the processed data changes. Both
+caches keep the settings.CLUSTER_CACHE_ENTRIES most recently used sweeps.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import sklearn
+from scipy import sparse
+from sklearn.cluster import AgglomerativeClustering, KMeans, MiniBatchKMeans
+from sklearn.metrics import calinski_harabasz_score, silhouette_score
+from sklearn.neighbors import kneighbors_graph
+
+from src.analysis.spatial import SpatialWeights, share_matrix
+from src.config import settings
+
+METHODS = ['kmeans', 'hierarchical', 'spatial']
+KNN_NEIGHBORS = 10  # Neighbours per zone in the hierarchical graph on large inputs
+
+
+def profile_matrix(df, zone: str = 'seccional', years: Optional[Sequence[int]] = None,
+                   backend=None) -> pd.DataFrame:
+    """
+    Vote-share profile of each zone across years.
+
+    Args:
+        df: Results dataframe or path (mesa, circuit or seccional level)
+        zone: Zone column
+        years: Years to include (default: all)
+        backend: Backend name or instance (default: settings.ANALYSIS_BACKEND)
+
+    Returns:
+        Zones x (anio, agrupacion) shares in 0-1; zones missing a year are dropped
+    """
+    profiles = share_matrix(df, zone=zone, backend=backend)
+    if years is not None:
+        profiles = profiles.loc[:, profiles.columns.get_level_values('anio').isin(list(years))]
+    totals = profiles.T.groupby(level='anio').sum().T
+    return profiles[(totals > 0).all(axis=1)]
+
+
+def data_version(profiles: pd.DataFrame) -> str:
+    """Hash of a profile matrix (zones, columns and values)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update('|'.join(map(str, profiles.index)).encode())
+    digest.update('|'.join(map(str, profiles.columns)).encode())
+    digest.update(np.ascontiguousarray(profiles.to_numpy(dtype=float)).tobytes())
+    return digest.hexdigest()
+
+
+# ============================================================================
+# FITTING
+# ============================================================================
+
+def _canonical(labels: np.ndarray) -> np.ndarray:
+    """Relabel clusters 0..k-1 by descending size (ties by first appearance)."""
+    _, first, inverse, counts = np.unique(labels, return_index=True, return_inverse=True, return_counts=True)
+    order = np.lexsort((first, -counts))
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return rank[inverse.ravel()].astype(np.int32)
+
+
+def _cut_tree(children: np.ndarray, n: int, ks: Iterable[int]) -> Dict[int, np.ndarray]:
+    """
+    Labels of a merge tree (sklearn children_) cut at each k.
+
+    The first n - k merges give k clusters; each leaf's root is found by
+    pointer doubling over the parent array.
+    """
+    parent = np.arange(2 * n - 1)
+    parent[children.ravel()] = np.repeat(np.arange(n, 2 * n - 1), 2)
+    cuts = {}
+    for k in ks:
+        merges = n - k
+        top = np.arange(2 * n - 1)
+        top[children[:merges].ravel()] = parent[children[:merges].ravel()]
+        while True:
+            jumped = top[top]
+            if np.array_equal(jumped, top):
+                break
+            top = jumped
+        cuts[k] = _canonical(top[:n])
+    return cuts
+
+
+def _within_ss(x: np.ndarray, labels: np.ndarray) -> float:
+    """Within-cluster sum of squares (k-means inertia) of any labelling."""
+    k = labels.max() + 1
+    counts = np.bincount(labels, minlength=k)
+    sums = np.stack([np.bincount(labels, weights=column, minlength=k) for column in x.T], axis=1)
+    return float((x * x).sum() - (sums * sums / counts[:, None]).sum())
+
+
+def _scores(x: np.ndarray, labels: np.ndarray, seed: int) -> dict:
+    sample = settings.CLUSTER_SILHOUETTE_SAMPLE
+    sample = sample if sample and sample < len(x) else None
+    return {
+        'silhouette': float(silhouette_score(x, labels, sample_size=sample, random_state=seed)),
+        'calinski_harabasz': float(calinski_harabasz_score(x, labels)),
+        'inertia': _within_ss(x, labels),
+    }
+
+
+_worker_state: Dict[str, object] = {}
+
+
+def _init_worker(x: np.ndarray, connectivity: Optional[sparse.csr_matrix]) -> None:
+    _worker_state['x'] = x
+    _worker_state['connectivity'] = connectivity
+
+
+def _fit(method: str, ks: List[int], seed: int) -> List[tuple]:
+    """Fit one task; returns (method, k, seed, labels, scores) per k."""
+    x = _worker_state['x']
+    if method == 'kmeans':
+        fits = []
+        for k in ks:
+            model = (MiniBatchKMeans(n_clusters=k, random_state=seed, n_init=3, batch_size=4096)
+                     if len(x) > settings.CLUSTER_MINIBATCH_ROWS else
+                     KMeans(n_clusters=k, random_state=seed, n_init=1))
+            fits.append((k, _canonical(model.fit_predict(x))))
+    else:
+        if method == 'spatial':
+            connectivity = _worker_state['connectivity']
+        elif len(x) > settings.CLUSTER_MINIBATCH_ROWS:
+            connectivity = kneighbors_graph(x, min(KNN_NEIGHBORS, len(x) - 1), include_self=False)
+        else:
+            connectivity = None
+        model = AgglomerativeClustering(n_clusters=None, distance_threshold=0, linkage='ward',
+                                        connectivity=connectivity, compute_full_tree=True)
+        model.fit(x)
+        fits = list(_cut_tree(model.children_, len(x), ks).items())
+    return [(method, k, seed, labels, _scores(x, labels, seed)) for k, labels in fits]
+
+
+# ============================================================================
+# SWEEPS
+# ============================================================================
+
+@dataclass
+class ClusterSweep:
+    """
+    Fitted clusterings of one profile matrix.
+
+    Attributes:
+        zones: Zone ids, aligned with the label columns
+        scores: One row per fit (method, k, seed, silhouette,
+            calinski_harabasz, inertia)
+        labels: Fits x zones cluster ids (0 = largest cluster)
+        version: data_version of the profiles
+    """
+    zones: pd.Index
+    scores: pd.DataFrame
+    labels: np.ndarray
+    version: str
+
+    def best(self, method: Optional[str] = None, k: Optional[int] = None) -> pd.Series:
+        """Score row of the fit with the highest silhouette (optionally for one method / k)."""
+        candidates = self.scores
+        if method is not None:
+            candidates = candidates[candidates['method'] == method]
+        if k is not None:
+            candidates = candidates[candidates['k'] == k]
+        if candidates.empty:
+            raise KeyError(f"No fit for method={method!r}, k={k!r}")
+        return candidates.loc[candidates['silhouette'].idxmax()]
+
+    def assignments(self, method: Optional[str] = None, k: Optional[int] = None) -> pd.Series:
+        """Cluster of each zone in the best fit (see best)."""
+        fit = self.best(method, k)
+        return pd.Series(self.labels[fit.name], index=self.zones, name='cluster')
+
+    def stability(self, method: str = 'kmeans') -> pd.DataFrame:
+        """Mean adjusted Rand index between seeds, per k (1 = seed-independent)."""
+        from sklearn.metrics import adjusted_rand_score
+
+        rows = []
+        for k, group in self.scores[self.scores['method'] == method].groupby('k'):
+            fits = list(group.index)
+            pairs = [(a, b) for i, a in enumerate(fits) for b in fits[i + 1:]]
+            ari = [adjusted_rand_score(self.labels[a], self.labels[b]) for a, b in pairs]
+            rows.append({'k': k, 'ari': float(np.mean(ari)) if ari else 1.0})
+        return pd.DataFrame(rows)
+
+
+_memory_cache: 'OrderedDict[str, ClusterSweep]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cached(key: str) -> Optional[ClusterSweep]:
+    with _cache_lock:
+        sweep = _memory_cache.get(key)
+        if sweep is not None:
+            _memory_cache.move_to_end(key)
+        return sweep
+
+
+def _remember(key: str, sweep: ClusterSweep) -> None:
+    with _cache_lock:
+        _memory_cache[key] = sweep
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > settings.CLUSTER_CACHE_ENTRIES:
+            _memory_cache.popitem(last=False)
+
+
+def _prune(cache_dir: Path) -> None:
+    """Delete all but the most recently used sweep files (by mtime; loads touch the file)."""
+    files = sorted(Path(cache_dir).glob('*.npz'), key=lambda path: path.stat().st_mtime_ns, reverse=True)
+    for path in files[settings.CLUSTER_CACHE_ENTRIES:]:
+        path.unlink(missing_ok=True)
+
+
+def sweep_key(version: str, methods: Sequence[str], ks: Sequence[int], seeds: Sequence[int],
+              weights: Optional[SpatialWeights]) -> str:
+    """Cache key of a sweep: data version, parameters and contiguity."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{version}|{sklearn.__version__}|{list(methods)}|{list(ks)}|{list(seeds)}'.encode())
+    digest.update(f'{settings.CLUSTER_MINIBATCH_ROWS}|{settings.CLUSTER_SILHOUETTE_SAMPLE}'.encode())
+    if weights is not None:
+        digest.update('|'.join(weights.ids).encode())
+        digest.update(weights.matrix.indptr.tobytes() + weights.matrix.indices.tobytes())
+    return digest.hexdigest()
+
+
+def _save(path: Path, sweep: ClusterSweep) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    scores = sweep.scores
+    np.savez(path, zones=sweep.zones.to_numpy(dtype=str), labels=sweep.labels, version=sweep.version,
+             method=scores['method'].to_numpy(dtype=str),
+             **{column: scores[column].to_numpy() for column in scores.columns if column != 'method'})
+
+
+def _load(path: Path) -> ClusterSweep:
+    with np.load(path) as data:
+        scores = pd.DataFrame({'method': data['method'].astype(object)})
+        for column in ['k', 'seed', 'silhouette', 'calinski_harabasz', 'inertia']:
+            scores[column] = data[column]
+        return ClusterSweep(pd.Index(data['zones'].astype(object)), scores, data['labels'], str(data['version']))
+
+
+def cluster_zones(profiles: pd.DataFrame, methods: Sequence[str] = ('kmeans',),
+                  ks: Sequence[int] = settings.CLUSTER_KS, seeds: Sequence[int] = range(settings.CLUSTER_SEEDS),
+                  weights: Optional[SpatialWeights] = None, workers: Optional[int] = settings.CLUSTER_WORKERS,
+                  cache_dir: Optional[Path] = settings.CLUSTER_CACHE_DIR) -> ClusterSweep:
+    """
+    Fit every method for every k (and seed, for k-means), cached by data version.
+
+    Args:
+        profiles: Zones x features matrix (see profile_matrix)
+        methods: Subset of METHODS
+        ks: Numbers of clusters; values outside 2..n-1 are skipped
+        seeds: Random seeds for k-means
+        weights: Contiguity for the 'spatial' method
+        workers: Processes (default: CPU count; 1 = in-process)
+        cache_dir: Directory for the on-disk cache (None = memory only)
+
+    Returns:
+        ClusterSweep with all fits
+    """
+    unknown = set(methods) - set(METHODS)
+    if unknown:
+        raise ValueError(f"Unknown clustering methods {sorted(unknown)}; use {METHODS}")
+    if 'spatial' in methods and weights is None:
+        raise ValueError("The 'spatial' method needs contiguity weights")
+
+    n = len(profiles)
+    ks = [k for k in ks if 2 <= k < n]
+    seeds = list(seeds)
+    if weights is not None:
+        weights = weights.subset(profiles.index)
+
+    version = data_version(profiles)
+    key = sweep_key(version, methods, ks, seeds, weights if 'spatial' in methods else None)
+    sweep = _cached(key)
+    if sweep is not None:
+        return sweep
+    path = Path(cache_dir) / f'{key}.npz' if cache_dir else None
+    if path is not None and path.exists():
+        sweep = _load(path)
+        path.touch()
+        _remember(key, sweep)
+        return sweep
+
+    tasks = []
+    for method in methods:
+        if method == 'kmeans':
+            tasks.extend(('kmeans', [k], seed) for k in ks for seed in seeds)
+        else:
+            tasks.append((method, ks, 0))
+
+    x = profiles.to_numpy(dtype=float)
+    connectivity = weights.matrix if weights is not None else None
+    workers = max(1, workers if workers is not None else (os.cpu_count() or 1))
+    if workers <= 1 or len(tasks) <= 1:
+        _init_worker(x, connectivity)
+        results = [_fit(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_worker,
+                                 initargs=(x, connectivity)) as pool:
+            results = list(pool.map(_fit, *zip(*tasks)))
+
+    fits = [fit for result in results for fit in result]
+    scores = pd.DataFrame([{'method': method, 'k': k, 'seed': seed, **score}
+                           for method, k, seed, _, score in fits])
+    labels = np.stack([fit[3] for fit in fits]) if fits else np.empty((0, n), dtype=np.int32)
+    sweep = ClusterSweep(profiles.index, scores, labels, version)
+
+    if path is not None:
+        _save(path, sweep)
+        _prune(cache_dir)
+    _remember(key, sweep)
+    return sweep
+
+
+def describe_clusters(profiles: pd.DataFrame, clusters: pd.Series) -> pd.DataFrame:
+    """
+    Mean profile of each cluster, summarised as its leading party per year.
+
+    Returns:
+        One row per cluster: zonas (count), perfil ("2021: X 41% / 2023: ...")
+        and the mean share of every (anio, agrupacion)
+    """
+    means = profiles.groupby(clusters.reindex(profiles.index).to_numpy()).mean()
+    means.index.name = 'cluster'
+    summary = []
+    for _, row in means.iterrows():
+        leaders = row.groupby(level='anio').agg(['idxmax', 'max'])
+        summary.append(' / '.join(f"{anio}: {party[1]} {share:.0%}"
+                                  for anio, (party, share) in leaders.iterrows()))
+    out = pd.DataFrame({'zonas': clusters.value_counts().reindex(means.index).to_numpy(), 'perfil': summary},
+                       index=means.index)
+    means.columns = [f'{anio} {agrupacion}' for anio, agrupacion in means.columns]
+    return out.join(means)
+
+
+def zone_clusters(df, zone: str = 'seccional', method: str = 'kmeans', k: Optional[int] = None,
+                  weights: Optional[SpatialWeights] = None, **options) -> pd.DataFrame:
+    """
+    Cluster and profile of each zone, for maps and tables.
+
+    Runs (or loads) a sweep of one method and keeps the fit with the best
+    silhouette, or the best one for a fixed k.
+
+    Returns:
+        DataFrame with zone, cluster and perfil columns
+    """
+    profiles = profile_matrix(df, zone=zone)
+    sweep = cluster_zones(profiles, methods=[method], weights=weights, **options)
+    clusters = sweep.assignments(method, k)
+    described = describe_clusters(profiles, clusters)
+    return pd.DataFrame({zone: clusters.index, 'cluster': clusters.to_numpy(),
+                         'perfil': described['perfil'].reindex(clusters.to_numpy()).to_numpy()})
+
+
+if __name__ == '__main__':
+    from src.analysis.spatial import load_zones
+
+    profiles = profile_matrix(settings.CLEAN_CSV)
+    weights = SpatialWeights.from_geodataframe(load_zones('seccional'), 'seccional')
+    sweep = cluster_zones(profiles, methods=METHODS, weights=weights)
+
+    print("=== Best fit per method and k (silhouette) ===")
+    best = sweep.scores.loc[sweep.scores.groupby(['method', 'k'])['silhouette'].idxmax()]
+    print(best.to_string(index=False))
+
+    for method in METHODS:
+        clusters = sweep.assignments(method)
+        print(f"\n=== {method}: k={clusters.max() + 1} ===")
+        print(describe_clusters(profiles, clusters)[['zonas', 'perfil']].to_string())
+        print(clusters.groupby(clusters).apply(lambda zones: ', '.join(zones.index)).to_string())
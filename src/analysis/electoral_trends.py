@@ -1,9 +1,14 @@
 """
 Electoral trends analysis module.
+
+Aggregations run on the configured backend (settings.ANALYSIS_BACKEND, or
+the `backend` argument). Without a dataframe the processed CSV is passed
+to the backend as a path, so Polars and DuckDB scan it directly.
 """
 import pandas as pd
 import sqlite3
 from pathlib import Path
+from src.backends import get_backend
 from src.config import settings
 
 
@@ -12,60 +17,54 @@ def load_electoral_data() -> pd.DataFrame:
     return pd.read_csv(settings.CLEAN_CSV)
 
 
-def get_votes_by_year(df: pd.DataFrame = None) -> pd.DataFrame:
+def _source(df: pd.DataFrame = None):
+    """Dataframe if given, else the processed CSV path."""
+    return settings.CLEAN_CSV if df is None else df
+
+
+def get_votes_by_year(df: pd.DataFrame = None, backend=None) -> pd.DataFrame:
     """
     Get total votes by year and party.
 
     Args:
         df: Electoral dataframe (optional, will load if not provided)
+        backend: Backend name or instance (default: settings.ANALYSIS_BACKEND)
 
     Returns:
         DataFrame with votes by year and agrupacion
     """
-    if df is None:
-        df = load_electoral_data()
+    return get_backend(backend).group_totals(_source(df), ['anio', 'agrupacion'])
 
-    return df.groupby(['anio', 'agrupacion'])['votos'].sum().reset_index()
 
-
-def get_votes_by_seccional(df: pd.DataFrame = None, year: int = None) -> pd.DataFrame:
+def get_votes_by_seccional(df: pd.DataFrame = None, year: int = None, backend=None) -> pd.DataFrame:
     """
     Get votes by seccional for a specific year.
 
     Args:
         df: Electoral dataframe (optional)
         year: Year to filter (optional)
+        backend: Backend name or instance (optional)
 
     Returns:
         DataFrame with votes by seccional
     """
-    if df is None:
-        df = load_electoral_data()
-
-    if year:
-        df = df[df['anio'] == year]
-
-    return df.groupby(['seccional', 'agrupacion'])['votos'].sum().reset_index()
+    filters = {'anio': year} if year else None
+    return get_backend(backend).group_totals(_source(df), ['seccional', 'agrupacion'], filters=filters)
 
 
-def calculate_growth_rate(df: pd.DataFrame = None) -> pd.DataFrame:
+def calculate_growth_rate(df: pd.DataFrame = None, backend=None) -> pd.DataFrame:
     """
     Calculate growth rate of votes for each party between elections.
 
     Args:
         df: Electoral dataframe (optional)
+        backend: Backend name or instance (optional)
 
     Returns:
         DataFrame with growth rates
     """
-    if df is None:
-        df = load_electoral_data()
-
-    # Get votes by year and party
-    yearly = df.groupby(['anio', 'agrupacion'])['votos'].sum().reset_index()
-
-    # Pivot to get years as columns
-    pivot = yearly.pivot(index='agrupacion', columns='anio', values='votos').fillna(0)
+    # Votes by party with years as columns
+    pivot = get_backend(backend).pivot(_source(df), index='agrupacion', columns='anio')
 
     # Calculate growth rates
     growth = pd.DataFrame(index=pivot.index)
@@ -79,46 +78,36 @@ def calculate_growth_rate(df: pd.DataFrame = None) -> pd.DataFrame:
     return growth.reset_index()
 
 
-def get_winner_by_seccional(df: pd.DataFrame = None, year: int = 2023) -> pd.DataFrame:
+def get_winner_by_seccional(df: pd.DataFrame = None, year: int = 2023, backend=None) -> pd.DataFrame:
     """
     Get winning party for each seccional in a given year.
 
     Args:
         df: Electoral dataframe (optional)
         year: Year to analyze
+        backend: Backend name or instance (optional)
 
     Returns:
         DataFrame with winner per seccional
     """
-    if df is None:
-        df = load_electoral_data()
-
-    # Filter by year
-    df_year = df[df['anio'] == year].copy()
+    winners = get_backend(backend).winners(_source(df), by=['seccional'], filters={'anio': year})
+    return winners[['seccional', 'agrupacion', 'votos', 'porcentaje']]
 
-    # Get max votes per seccional
-    idx = df_year.groupby('seccional')['votos'].idxmax()
-    winners = df_year.loc[idx, ['seccional', 'agrupacion', 'votos', 'porcentaje']]
 
-    return winners.sort_values('seccional')
-
-
-def get_top_parties(df: pd.DataFrame = None, n: int = 5) -> pd.DataFrame:
+def get_top_parties(df: pd.DataFrame = None, n: int = 5, backend=None) -> pd.DataFrame:
     """
     Get top N parties by total votes across all years.
 
     Args:
         df: Electoral dataframe (optional)
         n: Number of top parties to return
+        backend: Backend name or instance (optional)
 
     Returns:
         DataFrame with top parties
     """
-    if df is None:
-        df = load_electoral_data()
-
-    top = df.groupby('agrupacion')['votos'].sum().sort_values(ascending=False).head(n)
-    return top.reset_index()
+    totals = get_backend(backend).group_totals(_source(df), ['agrupacion'])
+    return totals.sort_values('votos', ascending=False).head(n).reset_index(drop=True)
 
 
 if __name__ == '__main__':
@@ -1,9 +1,17 @@
 """
 Political analysis module - Volatility, competitiveness, clustering.
+
+Vote totals, shares and winners come from the configured backend (see
+src.backends); the indices are computed on those small results.
+Zone clustering by electoral profile is in src.analysis.clustering,
+spatial autocorrelation in src.analysis.spatial and vote-transfer
+(ecological inference) matrices in src.analysis.transfers.
 """
 import pandas as pd
 import numpy as np
 from typing import Dict, Tuple
+from src.backends import get_backend
+from src.backends.base import source_format
 from src.config import settings
 
 
@@ -12,7 +20,23 @@ def load_electoral_data() -> pd.DataFrame:
     return pd.read_csv(settings.CLEAN_CSV)
 
 
-def calculate_pedersen_index(df: pd.DataFrame = None, year_from: int = 2021, year_to: int = 2023) -> float:
+def _source(df: pd.DataFrame = None):
+    """Dataframe if given, else the processed CSV path."""
+    return settings.CLEAN_CSV if df is None else df
+
+
+def _columns(source, columns) -> pd.DataFrame:
+    """Only `columns` of a dataframe or Parquet/CSV source."""
+    kind = source_format(source)
+    if kind == 'parquet':
+        return pd.read_parquet(source, columns=columns)
+    if kind == 'csv':
+        return pd.read_csv(source, usecols=columns)
+    return source[columns]
+
+
+def calculate_pedersen_index(df: pd.DataFrame = None, year_from: int = 2021, year_to: int = 2023,
+                             backend=None) -> float:
     """
     Calculate Pedersen Volatility Index between two elections.
 
@@ -23,16 +47,16 @@ def calculate_pedersen_index(df: pd.DataFrame = None, year_from: int = 2021, yea
         df: Electoral dataframe (optional)
         year_from: Starting year
         year_to: Ending year
+        backend: Backend name or instance (optional)
 
     Returns:
         Volatility index (percentage)
     """
-    if df is None:
-        df = load_electoral_data()
-
     # Get total votes per year per party
-    votes_from = df[df['anio'] == year_from].groupby('agrupacion')['votos'].sum()
-    votes_to = df[df['anio'] == year_to].groupby('agrupacion')['votos'].sum()
+    totals = get_backend(backend).pivot(_source(df), index='agrupacion', columns='anio',
+                                        filters={'anio': [year_from, year_to]})
+    votes_from = totals.get(year_from, pd.Series(dtype=float))
+    votes_to = totals.get(year_to, pd.Series(dtype=float))
 
     # Calculate total votes
     total_from = votes_from.sum()
@@ -53,7 +77,8 @@ def calculate_pedersen_index(df: pd.DataFrame = None, year_from: int = 2021, yea
     return round(volatility, 2)
 
 
-def identify_competitive_seccionales(df: pd.DataFrame = None, year: int = 2023, threshold: float = 5.0) -> pd.DataFrame:
+def identify_competitive_seccionales(df: pd.DataFrame = None, year: int = 2023, threshold: float = 5.0,
+                                    backend=None) -> pd.DataFrame:
     """
     Identify competitive seccionales (small margin between 1st and 2nd place).
 
@@ -61,41 +86,29 @@ def identify_competitive_seccionales(df: pd.DataFrame = None, year: int = 2023,
         df: Electoral dataframe (optional)
         year: Year to analyze
         threshold: Maximum percentage difference to consider competitive
+        backend: Backend name or instance (optional)
 
     Returns:
         DataFrame with competitive seccionales
     """
-    if df is None:
-        df = load_electoral_data()
-
-    # Filter by year
-    df_year = df[df['anio'] == year].copy()
-
-    competitive = []
-
-    for seccional in df_year['seccional'].unique():
-        df_sec = df_year[df_year['seccional'] == seccional].sort_values('votos', ascending=False)
-
-        if len(df_sec) >= 2:
-            first = df_sec.iloc[0]
-            second = df_sec.iloc[1]
-
-            margin = first['porcentaje'] - second['porcentaje']
-
-            if margin <= threshold:
-                competitive.append({
-                    'seccional': seccional,
-                    'winner': first['agrupacion'],
-                    'winner_pct': first['porcentaje'],
-                    'runner_up': second['agrupacion'],
-                    'runner_up_pct': second['porcentaje'],
-                    'margin': round(margin, 2)
-                })
-
-    return pd.DataFrame(competitive)
-
-
-def calculate_concentration_index(df: pd.DataFrame = None, year: int = 2023) -> Dict[str, float]:
+    source = _source(df)
+    winners = get_backend(backend).winners(source, by=['seccional'], filters={'anio': year})
+    winners = winners[winners['segundo'].notna() & (winners['margen_pct'] <= threshold)]
+    # Seccionales in order of first appearance in the source, as listed before the backends
+    order = pd.Index(pd.unique(_columns(source, ['anio', 'seccional']).query('anio == @year')['seccional']))
+    winners = winners.iloc[np.argsort(order.get_indexer(winners['seccional']), kind='stable')]
+
+    return pd.DataFrame({
+        'seccional': winners['seccional'],
+        'winner': winners['agrupacion'],
+        'winner_pct': winners['porcentaje'],
+        'runner_up': winners['segundo'],
+        'runner_up_pct': (winners['porcentaje'] - winners['margen_pct']).round(2),
+        'margin': winners['margen_pct'],
+    }).reset_index(drop=True)
+
+
+def calculate_concentration_index(df: pd.DataFrame = None, year: int = 2023, backend=None) -> Dict[str, float]:
     """
     Calculate Herfindahl-Hirschman Index (HHI) for electoral concentration.
 
@@ -104,29 +117,20 @@ def calculate_concentration_index(df: pd.DataFrame = None, year: int = 2023) ->
     Args:
         df: Electoral dataframe (optional)
         year: Year to analyze
+        backend: Backend name or instance (optional)
 
     Returns:
         Dictionary with HHI per seccional
     """
-    if df is None:
-        df = load_electoral_data()
-
-    # Filter by year
-    df_year = df[df['anio'] == year].copy()
-
-    hhi_dict = {}
-
-    for seccional in df_year['seccional'].unique():
-        df_sec = df_year[df_year['seccional'] == seccional]
+    shares = get_backend(backend).shares(_source(df), by=['seccional'], filters={'anio': year})
 
-        # Calculate HHI: sum of squared market shares
-        hhi = (df_sec['porcentaje'] ** 2).sum()
-        hhi_dict[seccional] = round(hhi, 2)
+    # Calculate HHI: sum of squared market shares
+    hhi = (shares['porcentaje'] ** 2).groupby(shares['seccional']).sum().round(2)
+    return hhi.to_dict()
 
-    return hhi_dict
 
-
-def analyze_vote_swing(df: pd.DataFrame = None, year_from: int = 2021, year_to: int = 2023) -> pd.DataFrame:
+def analyze_vote_swing(df: pd.DataFrame = None, year_from: int = 2021, year_to: int = 2023,
+                       backend=None) -> pd.DataFrame:
     """
     Analyze vote swing by seccional between two elections.
 
@@ -134,33 +138,24 @@ def analyze_vote_swing(df: pd.DataFrame = None, year_from: int = 2021, year_to:
         df: Electoral dataframe (optional)
         year_from: Starting year
         year_to: Ending year
+        backend: Backend name or instance (optional)
 
     Returns:
         DataFrame with swing analysis
     """
-    if df is None:
-        df = load_electoral_data()
-
-    # Get data for both years
-    df_from = df[df['anio'] == year_from].copy()
-    df_to = df[df['anio'] == year_to].copy()
-
-    swing_results = []
-
-    for seccional in sorted(df['seccional'].unique()):
-        # Get winner in each year
-        winner_from = df_from[df_from['seccional'] == seccional].sort_values('votos', ascending=False).iloc[0] if len(df_from[df_from['seccional'] == seccional]) > 0 else None
-        winner_to = df_to[df_to['seccional'] == seccional].sort_values('votos', ascending=False).iloc[0] if len(df_to[df_to['seccional'] == seccional]) > 0 else None
-
-        if winner_from is not None and winner_to is not None:
-            swing_results.append({
-                'seccional': seccional,
-                f'winner_{year_from}': winner_from['agrupacion'],
-                f'winner_{year_to}': winner_to['agrupacion'],
-                'flipped': winner_from['agrupacion'] != winner_to['agrupacion']
-            })
-
-    return pd.DataFrame(swing_results)
+    # Winner per seccional in each year (seccionales present in both)
+    winners = get_backend(backend).winners(_source(df), by=['anio', 'seccional'],
+                                           filters={'anio': [year_from, year_to]})
+    pivot = winners.pivot(index='seccional', columns='anio', values='agrupacion')
+    pivot = pivot.reindex(columns=[year_from, year_to]).dropna()
+
+    swing = pd.DataFrame({
+        'seccional': pivot.index,
+        f'winner_{year_from}': pivot[year_from].values,
+        f'winner_{year_to}': pivot[year_to].values,
+    })
+    swing['flipped'] = swing[f'winner_{year_from}'] != swing[f'winner_{year_to}']
+    return swing
 
 
 if __name__ == '__main__':
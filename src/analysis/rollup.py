@@ -0,0 +1,291 @@
+"""
+Hierarchical rollup engine: mesa -> circuito -> seccional -> ciudad.
+
+All levels are computed in a single pass: the leaf rows are sorted once by
+(anio, agrupacion, ciudad, seccional, circuito, mesa), so every coarser
+zone is a contiguous segment of the finer level and is reduced with
+np.add.reduceat. Each level is then indexed by (anio, zone), which makes
+results, winners and drill-downs dictionary lookups instead of groupbys.
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import settings
+
+LEVELS = ['mesa', 'circuito', 'seccional', 'ciudad']
+
+
+class ZoneHierarchy:
+    """
+    Zone tree taken from the circuit GeoJSON properties.
+
+    Circuito -> Seccional -> Secnom (the city). Circuits with an empty
+    `Circuito` property get their code from the `Nombre` property
+    ("Seccional 13 Circuito G" -> "13G").
+    """
+
+    def __init__(self, circuito_seccional: Dict[str, str], seccional_ciudad: Dict[str, str]):
+        self.parents = {
+            'circuito': dict(circuito_seccional),
+            'seccional': dict(seccional_ciudad),
+        }
+        self._children: Dict[str, Dict[str, List[str]]] = {}
+        for level, parents in self.parents.items():
+            parent_level = LEVELS[LEVELS.index(level) + 1]
+            tree = self._children.setdefault(parent_level, {})
+            for zone, parent in parents.items():
+                tree.setdefault(parent, []).append(zone)
+        for tree in self._children.values():
+            for zones in tree.values():
+                zones.sort(key=_zone_sort_key)
+
+    @classmethod
+    def from_geojson(cls, path: Path = settings.GEOJSON_FILE) -> 'ZoneHierarchy':
+        """Build the hierarchy from feature properties (geometry is not parsed)."""
+        with open(path, 'r', encoding='utf-8') as f:
+            features = json.load(f)['features']
+
+        circuito_seccional, seccional_ciudad = {}, {}
+        for feature in features:
+            props = feature['properties']
+            seccional = str(props['Seccional'])
+            circuito_seccional[circuito_code(props)] = seccional
+            seccional_ciudad[seccional] = props.get('Secnom') or 'Capital'
+
+        return cls(circuito_seccional, seccional_ciudad)
+
+    def parent(self, level: str, zone: str) -> Optional[str]:
+        return self.parents.get(level, {}).get(zone)
+
+    def children(self, level: str, zone: str) -> List[str]:
+        return self._children.get(level, {}).get(zone, [])
+
+
+def circuito_code(props: dict) -> str:
+    """Circuit code of a GeoJSON feature ("13G"), from `Circuito` or else `Nombre`."""
+    seccional = str(props['Seccional'])
+    circuito = (props.get('Circuito') or '').strip().upper()
+    if not circuito:
+        match = re.search(r'Circuito\s+(\w+)', props.get('Nombre') or '')
+        circuito = f"{seccional}{match.group(1).upper()}" if match else seccional
+    return circuito
+
+
+def _zone_sort_key(zone: str):
+    match = re.match(r'(\d+)(.*)', zone)
+    return (int(match.group(1)), match.group(2)) if match else (float('inf'), zone)
+
+
+@dataclass
+class LevelTable:
+    """
+    One level of the rollup, sorted by (anio, zone, votos desc).
+
+    `offsets[(anio, zone)]` is the (start, stop) slice of that zone's party
+    rows; `totals[(anio, zone)]` its total votes.
+    """
+    level: str
+    frame: pd.DataFrame
+    offsets: Dict[Tuple[int, str], Tuple[int, int]] = field(default_factory=dict)
+    totals: Dict[Tuple[int, str], int] = field(default_factory=dict)
+
+
+class Rollup:
+    """Results at every level, with O(1) lookups per (level, anio, zone)."""
+
+    def __init__(self, levels: Dict[str, LevelTable], hierarchy: Optional[ZoneHierarchy] = None):
+        self.levels = levels
+        self.hierarchy = hierarchy
+
+        # Children observed in the data, in case the hierarchy is partial
+        self._children: Dict[str, Dict[str, List[str]]] = {}
+        available = [level for level in LEVELS if level in levels]
+        for child, parent in zip(available[:-1], available[1:]):
+            pairs = levels[child].frame[['zone', 'parent']].drop_duplicates()
+            tree: Dict[str, List[str]] = {}
+            for zone, parent_zone in pairs.itertuples(index=False):
+                tree.setdefault(parent_zone, []).append(zone)
+            self._children[parent] = {k: sorted(v, key=_zone_sort_key) for k, v in tree.items()}
+
+    def _table(self, level: str) -> LevelTable:
+        if level not in self.levels:
+            raise KeyError(f"Level '{level}' not available (have: {list(self.levels)})")
+        return self.levels[level]
+
+    def results(self, level: str, anio: int, zone: str) -> pd.DataFrame:
+        """Party results of one zone, sorted by votes descending."""
+        table = self._table(level)
+        start, stop = table.offsets.get((anio, zone), (0, 0))
+        return table.frame.iloc[start:stop][['agrupacion', 'votos', 'porcentaje']]
+
+    def total(self, level: str, anio: int, zone: str) -> int:
+        return self._table(level).totals.get((anio, zone), 0)
+
+    def winner(self, level: str, anio: int, zone: str) -> Optional[dict]:
+        """Winner, runner-up and margin of one zone."""
+        table = self._table(level)
+        if (anio, zone) not in table.offsets:
+            return None
+        start, stop = table.offsets[(anio, zone)]
+        frame = table.frame
+        first = frame.iloc[start]
+        second = frame.iloc[start + 1] if stop - start > 1 else None
+        return {
+            'agrupacion': first['agrupacion'],
+            'votos': int(first['votos']),
+            'porcentaje': float(first['porcentaje']),
+            'segundo': second['agrupacion'] if second is not None else None,
+            'margen_pct': round(float(first['porcentaje'] - (second['porcentaje'] if second is not None else 0)), 2),
+        }
+
+    def children(self, level: str, zone: str) -> List[str]:
+        """Child zones of a zone, from the data or else the hierarchy."""
+        children = self._children.get(level, {}).get(zone)
+        if children is None and self.hierarchy is not None:
+            children = self.hierarchy.children(level, zone)
+        return children or []
+
+    def drilldown(self, level: str, anio: int, zone: str) -> pd.DataFrame:
+        """Total and winner of every child zone of `zone`."""
+        child_level = LEVELS[LEVELS.index(level) - 1]
+        rows = []
+        for child in self.children(level, zone):
+            winner = self.winner(child_level, anio, child)
+            if winner is not None:
+                rows.append({'zone': child, 'total_votos': self.total(child_level, anio, child), **winner})
+        return pd.DataFrame(rows)
+
+    def to_frame(self) -> pd.DataFrame:
+        """All levels stacked in one frame with a `nivel` column."""
+        return pd.concat(
+            [table.frame.assign(nivel=level) for level, table in self.levels.items()],
+            ignore_index=True
+        )
+
+
+def _segment_starts(keys: List[np.ndarray]) -> np.ndarray:
+    """Start index of each run of equal key tuples in sorted arrays."""
+    n = len(keys[0])
+    change = np.zeros(n, dtype=bool)
+    change[0] = True
+    for key in keys:
+        change[1:] |= key[1:] != key[:-1]
+    return np.flatnonzero(change)
+
+
+def _attach_zone_columns(df: pd.DataFrame, hierarchy: Optional[ZoneHierarchy]) -> Tuple[pd.DataFrame, List[str]]:
+    """Fill in missing coarser zone columns and return the levels present."""
+    df = df.copy()
+    if 'circuito' in df.columns:
+        df['circuito'] = df['circuito'].astype(str)
+    if 'mesa' in df.columns:
+        df['mesa'] = df['circuito'] + '/' + df['mesa'].astype(str)
+    if 'seccional' not in df.columns:
+        if hierarchy is None or 'circuito' not in df.columns:
+            raise ValueError("A 'seccional' column or a hierarchy with circuits is required")
+        df['seccional'] = df['circuito'].map(hierarchy.parents['circuito'])
+    df['seccional'] = df['seccional'].astype(str)
+    if 'ciudad' not in df.columns:
+        mapping = hierarchy.parents['seccional'] if hierarchy is not None else {}
+        df['ciudad'] = df['seccional'].map(mapping).fillna('Capital')
+
+    levels = [level for level in LEVELS if level in df.columns]
+    return df, levels
+
+
+def build_rollup(df: pd.DataFrame, hierarchy: Optional[ZoneHierarchy] = None) -> Rollup:
+    """
+    Aggregate leaf results into every coarser level in one sorted pass.
+
+    Args:
+        df: Results with anio, agrupacion, votos and the finest zone column
+            available (mesa + circuito, circuito, or seccional)
+        hierarchy: Zone tree used to derive missing parent zones
+
+    Returns:
+        Rollup holding all levels from the leaf level up to ciudad
+    """
+    df, levels = _attach_zone_columns(df, hierarchy)
+
+    # Integer codes for every key column; one lexsort orders all levels
+    anio = df['anio'].to_numpy(dtype=np.int64)
+    party_codes, parties = pd.factorize(df['agrupacion'], sort=True)
+    zone_codes = {}
+    zone_labels = {}
+    for level in levels:
+        zone_codes[level], zone_labels[level] = pd.factorize(df[level], sort=True)
+
+    coarse_to_fine = list(reversed(levels))
+    sort_keys = [zone_codes[level] for level in levels] + [party_codes, anio]
+    order = np.lexsort(sort_keys)
+
+    votos = df['votos'].to_numpy(dtype=np.int64)[order]
+    keys = {'anio': anio[order], 'party': party_codes[order]}
+    keys.update({level: zone_codes[level][order] for level in levels})
+
+    tables: Dict[str, LevelTable] = {}
+    for depth in range(len(coarse_to_fine), 0, -1):
+        level = coarse_to_fine[depth - 1]
+        group_keys = [keys['anio'], keys['party']] + [keys[lv] for lv in coarse_to_fine[:depth]]
+        starts = _segment_starts(group_keys)
+
+        # Reduce the previous (finer) level's arrays into this level
+        votos = np.add.reduceat(votos, starts)
+        keys = {name: arr[starts] for name, arr in keys.items()}
+
+        parent_level = coarse_to_fine[depth - 2] if depth >= 2 else None
+        tables[level] = _level_table(
+            level, keys, votos, parties, zone_labels,
+            parent_level=parent_level
+        )
+
+    return Rollup({level: tables[level] for level in levels}, hierarchy)
+
+
+def _level_table(level: str, keys: Dict[str, np.ndarray], votos: np.ndarray, parties,
+                 zone_labels: Dict[str, pd.Index], parent_level: Optional[str]) -> LevelTable:
+    """Sort one level by (anio, zone, votos desc) and index its segments."""
+    order = np.lexsort([-votos, keys[level], keys['anio']])
+    anio = keys['anio'][order]
+    zone = keys[level][order]
+    votos = votos[order]
+
+    starts = _segment_starts([anio, zone])
+    stops = np.append(starts[1:], len(votos))
+    segment_totals = np.add.reduceat(votos, starts) if len(votos) else np.array([], dtype=np.int64)
+    row_totals = np.repeat(segment_totals, stops - starts)
+
+    zones = np.asarray(zone_labels[level])[zone]
+    frame = pd.DataFrame({
+        'anio': anio,
+        'zone': zones,
+        'parent': np.asarray(zone_labels[parent_level])[keys[parent_level][order]] if parent_level else None,
+        'agrupacion': np.asarray(parties)[keys['party'][order]],
+        'votos': votos,
+        'total_votos': row_totals,
+        'porcentaje': np.round(votos / np.maximum(row_totals, 1) * 100, 2),
+    })
+
+    segment_keys = list(zip(anio[starts].tolist(), zones[starts].tolist()))
+    offsets = dict(zip(segment_keys, zip(starts.tolist(), stops.tolist())))
+    totals = dict(zip(segment_keys, segment_totals.tolist()))
+    return LevelTable(level, frame, offsets, totals)
+
+
+if __name__ == '__main__':
+    df = pd.read_csv(settings.CLEAN_CSV, dtype={'seccional': str})
+    rollup = build_rollup(df, ZoneHierarchy.from_geojson())
+
+    print("=== Rollup ===\n")
+    for anio in sorted(df['anio'].unique()):
+        anio = int(anio)
+        print(f"{anio} - Capital: {rollup.total('ciudad', anio, 'Capital'):,} votos, "
+              f"ganador {rollup.winner('ciudad', anio, 'Capital')['agrupacion']}")
+    print("\nDrill-down 2023 Capital:")
+    print(rollup.drilldown('ciudad', 2023, 'Capital'))
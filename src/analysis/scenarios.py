@@ -0,0 +1,301 @@
+"""
+What-if scenarios over a preloaded share matrix: coalitions and uniform swing.
+
+ScenarioEngine loads the votes once as a (years, zones, parties) array.
+A scenario is a set of party merges ("what if A and B had run together")
+and swing vectors (+/- points of the vote for some parties, taken from or
+given to the rest in proportion to their shares, in every zone). Applying
+one is a matrix product (merges), a broadcast (swing) and an argmax /
+D'Hondt pass, so winners, margins, zones won and seats of every zone and
+year come out of one vectorized step.
+
+Swing values may be arrays: all of them are evaluated at once along a
+leading scenario axis, which is how parameter sweeps run.
+"""
+from dataclasses import dataclass
+from typing import List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.seats import dhondt
+from src.analysis.transfers import zone_votes
+from src.config import settings
+
+Swing = Mapping[str, Union[float, Sequence[float], np.ndarray]]
+
+
+@dataclass
+class ScenarioResult:
+    """
+    Outcome of one or many scenarios (leading axis) for every year and zone.
+
+    Attributes:
+        years, zones, parties: Axis labels (parties after merges)
+        swing: (scenarios, parties) swing applied, in points
+        shares: (scenarios, years, zones, parties) shares in 0-1
+        winner, runner_up: (scenarios, years, zones) party indices
+        margin: (scenarios, years, zones) first minus second share, in points
+        zones_won: (scenarios, years, parties) zones won
+        seats: (scenarios, years, parties) D'Hondt seats over the citywide vote
+    """
+    years: List[int]
+    zones: List[str]
+    parties: List[str]
+    swing: np.ndarray
+    shares: np.ndarray
+    winner: np.ndarray
+    runner_up: np.ndarray
+    margin: np.ndarray
+    zones_won: np.ndarray
+    seats: np.ndarray
+
+    def winners(self, scenario: int = 0, zone: str = 'seccional') -> pd.DataFrame:
+        """Winner, share, runner-up and margin per (anio, zone)."""
+        y, z = np.meshgrid(np.arange(len(self.years)), np.arange(len(self.zones)), indexing='ij')
+        shares = self.shares[scenario]
+        winner, second = self.winner[scenario], self.runner_up[scenario]
+        parties = np.asarray(self.parties, dtype=object)
+        return pd.DataFrame({
+            'anio': np.asarray(self.years)[y.ravel()],
+            zone: np.asarray(self.zones, dtype=object)[z.ravel()],
+            'agrupacion': parties[winner.ravel()],
+            'porcentaje': np.round(100 * np.take_along_axis(shares, winner[..., None], -1).ravel(), 2),
+            'segundo': parties[second.ravel()],
+            'margen_pct': np.round(self.margin[scenario].ravel(), 2),
+        })
+
+    def totals(self, scenario: int = 0) -> pd.DataFrame:
+        """Zones won and seats per (anio, agrupacion), parties with either only."""
+        y, p = np.meshgrid(np.arange(len(self.years)), np.arange(len(self.parties)), indexing='ij')
+        out = pd.DataFrame({
+            'anio': np.asarray(self.years)[y.ravel()],
+            'agrupacion': np.asarray(self.parties, dtype=object)[p.ravel()],
+            'zonas_ganadas': self.zones_won[scenario].ravel(),
+            'bancas': self.seats[scenario].ravel(),
+        })
+        return out[(out['zonas_ganadas'] > 0) | (out['bancas'] > 0)].reset_index(drop=True)
+
+    def sweep(self) -> pd.DataFrame:
+        """Zones won and seats per scenario, with the swing of every party as columns."""
+        s, y, p = np.meshgrid(*(np.arange(n) for n in self.seats.shape), indexing='ij')
+        out = pd.DataFrame({
+            'escenario': s.ravel(),
+            'anio': np.asarray(self.years)[y.ravel()],
+            'agrupacion': np.asarray(self.parties, dtype=object)[p.ravel()],
+            'zonas_ganadas': self.zones_won.ravel(),
+            'bancas': self.seats.ravel(),
+        })
+        swung = np.flatnonzero(np.any(self.swing != 0, axis=0))
+        for index in swung:
+            out[f'swing {self.parties[index]}'] = self.swing[out['escenario'].to_numpy(), index]
+        return out
+
+
+@dataclass(frozen=True)
+class _ScenarioData:
+    """Votes of every year, zone and party as arrays, with their axis labels."""
+    zone_votes: pd.DataFrame
+    years: List[int]
+    parties: List[str]
+    zones: List[str]
+    seats: Mapping[int, int]
+    votes: np.ndarray  # (years, zones, parties)
+    turnout: np.ndarray  # (years, zones)
+    index: Mapping[str, int]  # party -> position in parties
+
+    @classmethod
+    def build(cls, votes: pd.DataFrame, seats: Optional[Mapping[int, int]]) -> '_ScenarioData':
+        years = sorted(votes.columns.get_level_values('anio').unique().tolist())
+        parties = sorted(votes.columns.get_level_values('agrupacion').unique().tolist())
+        zones = [str(zone) for zone in votes.index]
+        full = votes.reindex(columns=pd.MultiIndex.from_product([years, parties]), fill_value=0)
+        array = full.to_numpy(float).reshape(len(zones), len(years), len(parties)).transpose(1, 0, 2)
+        return cls(votes, years, parties, zones,
+                   {year: (seats or settings.SEATS_BY_YEAR).get(year, 0) for year in years},
+                   array, array.sum(axis=2), {party: i for i, party in enumerate(parties)})
+
+
+class ScenarioEngine:
+    """
+    Vectorized what-if engine over zone x party votes for every year.
+
+    The arrays live in one immutable _ScenarioData that update() replaces
+    as a whole and run() reads once, so a run concurrent with an update
+    sees either the old or the new data, never a mix.
+
+    Args:
+        votes: Zones x (anio, agrupacion) votes (see transfers.zone_votes)
+        seats: Seats per year for the D'Hondt allocation
+        threshold: D'Hondt threshold
+    """
+
+    def __init__(self, votes: pd.DataFrame, seats: Optional[Mapping[int, int]] = None,
+                 threshold: float = settings.DHONDT_THRESHOLD):
+        self._seats = seats
+        self.threshold = threshold
+        self._data = _ScenarioData.build(votes, seats)
+
+    @property
+    def zone_votes(self) -> pd.DataFrame:
+        return self._data.zone_votes
+
+    @property
+    def years(self) -> List[int]:
+        return self._data.years
+
+    @property
+    def parties(self) -> List[str]:
+        return self._data.parties
+
+    @property
+    def zones(self) -> List[str]:
+        return self._data.zones
+
+    @property
+    def seats(self) -> Mapping[int, int]:
+        return self._data.seats
+
+    @property
+    def votes(self) -> np.ndarray:
+        return self._data.votes
+
+    @property
+    def turnout(self) -> np.ndarray:
+        return self._data.turnout
+
+    @classmethod
+    def from_results(cls, df=None, zone: str = 'seccional', backend=None, **options) -> 'ScenarioEngine':
+        """Engine over a results dataframe or path (default: the processed CSV)."""
+        source = settings.CLEAN_CSV if df is None else df
+        return cls(zone_votes(source, zone, min_share=0, backend=backend), **options)
+
+    def update(self, df, zone: str = 'seccional', backend=None) -> None:
+        """
+        Replace the years present in a results dataframe (e.g. a live
+        snapshot), keeping the others. The new data is built aside and
+        published with a single attribute assignment.
+        """
+        votes = zone_votes(df, zone, min_share=0, backend=backend)
+        current = self._data.zone_votes
+        kept = current.loc[:, ~current.columns.get_level_values('anio').isin(
+            votes.columns.get_level_values('anio'))]
+        combined = pd.concat([kept, votes], axis=1).fillna(0).sort_index(axis=1)
+        self._data = _ScenarioData.build(combined, self._seats)
+
+    def parties_with_votes(self, year: int) -> List[str]:
+        """Parties that ran in a year (all parties for a year not loaded)."""
+        data = self._data
+        if year not in data.years:
+            return data.parties
+        ran = data.votes[data.years.index(year)].sum(axis=0) > 0
+        return [data.parties[i] for i in ran.nonzero()[0]]
+
+    def merge_matrix(self, merges: Optional[Mapping[str, Sequence[str]]] = None,
+                     data: Optional[_ScenarioData] = None):
+        """One-hot (parties x merged parties) matrix and the merged party names."""
+        data = data or self._data
+        merges = merges or {}
+        target = {}
+        for name, members in merges.items():
+            for party in members:
+                if party not in data.index:
+                    raise KeyError(f"Unknown party: {party}")
+                target[party] = name
+        names = sorted({target.get(party, party) for party in data.parties})
+        column = {name: i for i, name in enumerate(names)}
+        matrix = np.zeros((len(data.parties), len(names)))
+        matrix[np.arange(len(data.parties)), [column[target.get(party, party)] for party in data.parties]] = 1
+        return matrix, names
+
+    def run(self, merges: Optional[Mapping[str, Sequence[str]]] = None, swing: Optional[Swing] = None,
+            years: Optional[Sequence[int]] = None) -> ScenarioResult:
+        """
+        Evaluate a scenario, or a sweep when swing values are arrays.
+
+        Args:
+            merges: {new list name: [parties]} run together (votes added)
+            swing: {party (after merges): points} added to that party's share
+                in every zone where it ran; the difference is taken from (or given to) the
+                other parties in proportion to their shares. Array values
+                define one scenario per element (all arrays the same length)
+            years: Years to evaluate (default: all)
+
+        Returns:
+            ScenarioResult with a leading scenario axis
+        """
+        data = self._data
+        matrix, parties = self.merge_matrix(merges, data)
+        year_index = [data.years.index(year) for year in years] if years else list(range(len(data.years)))
+        votes = data.votes[year_index] @ matrix
+        turnout = data.turnout[year_index]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            shares = np.nan_to_num(votes / turnout[..., None])
+
+        # (scenarios, parties) swing in share units
+        column = {party: i for i, party in enumerate(parties)}
+        swing = dict(swing or {})
+        unknown = set(swing) - set(column)
+        if unknown:
+            raise KeyError(f"Unknown parties in swing: {sorted(unknown)}")
+        lengths = {np.size(value) for value in swing.values()} or {1}
+        scenarios = max(lengths)
+        if lengths - {1, scenarios}:
+            raise ValueError("Swing arrays must all have the same length")
+        delta = np.zeros((scenarios, len(parties)))
+        for party, value in swing.items():
+            delta[:, column[party]] = np.broadcast_to(np.asarray(value, dtype=float).ravel(), (scenarios,)) / 100
+
+        shares = self._apply_swing(shares, delta)
+        winner, runner_up, margin = self._rank(shares)
+        zones_won = (winner[..., None] == np.arange(len(parties))).sum(axis=2)
+
+        city = np.einsum('syzp,yz->syp', shares, turnout)
+        seats = np.stack([dhondt(city[:, i], data.seats[data.years[y]], self.threshold)
+                          for i, y in enumerate(year_index)], axis=1)
+        return ScenarioResult([data.years[y] for y in year_index], data.zones, parties, delta * 100,
+                              shares, winner, runner_up, margin * 100, zones_won, seats)
+
+    @staticmethod
+    def _apply_swing(shares: np.ndarray, delta: np.ndarray) -> np.ndarray:
+        """(scenarios, years, zones, parties) shares after a proportional uniform swing."""
+        swung = delta != 0
+        if not swung.any():
+            return shares[None]
+        shares = shares[None]
+        # Parties only swing where they ran
+        delta = np.where(shares > 0, delta[:, None, None, :], 0.0)
+        moved = swung[:, None, None, :]
+        rest = np.where(moved, 0.0, shares)
+        rest_total = rest.sum(axis=-1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            taken = np.where(rest_total > 0, rest / rest_total, 0.0) * delta.sum(axis=-1, keepdims=True)
+        out = np.clip(shares + delta - taken, 0.0, None)
+        total = out.sum(axis=-1, keepdims=True)
+        return np.divide(out, total, out=np.zeros_like(out), where=total > 0)
+
+    @staticmethod
+    def _rank(shares: np.ndarray):
+        """Winner and runner-up indices and their share difference."""
+        order = np.argpartition(-shares, min(1, shares.shape[-1] - 1), axis=-1)[..., :2]
+        top = np.take_along_axis(shares, order, -1)
+        flip = top[..., 1] > top[..., 0]
+        winner = np.where(flip, order[..., 1], order[..., 0])
+        runner_up = np.where(flip, order[..., 0], order[..., 1])
+        margin = np.abs(top[..., 0] - top[..., 1])
+        return winner, runner_up, margin
+
+
+if __name__ == '__main__':
+    engine = ScenarioEngine.from_results()
+
+    print("=== Observado ===")
+    print(engine.run().totals().to_string(index=False))
+
+    coalition = {'HACEMOS + JUNTOS': ['HACEMOS POR CÓRDOBA', 'JUNTOS POR EL CAMBIO']}
+    print("\n=== Hacemos por Córdoba + Juntos por el Cambio juntos ===")
+    print(engine.run(coalition, years=[2023]).totals().to_string(index=False))
+
+    print("\n=== Barrido de swing para LA LIBERTAD AVANZA (2023) ===")
+    sweep = engine.run(swing={'LA LIBERTAD AVANZA': np.arange(-6, 7, 2)}, years=[2023]).sweep()
+    print(sweep[sweep['agrupacion'] == 'LA LIBERTAD AVANZA'].to_string(index=False))
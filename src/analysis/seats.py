@@ -0,0 +1,246 @@
+"""
+D'Hondt seat allocation and Monte Carlo seat simulation.
+
+dhondt() allocates seats for any number of vote vectors at once: the
+quotients votes / 1..S of every party form a (scenarios, parties, S) array
+and the S largest per scenario win, found with one argpartition, so 100k
+scenarios are a handful of array operations.
+
+simulate_seats() draws perturbed elections around an observed one. Each
+zone's shares are scaled by log-normal noise (a citywide component per
+party plus a smaller zone component), summed to citywide votes with the
+zone turnouts fixed, and allocated with dhondt(). The noise scale is
+calibrated so the expected Pedersen index between the observed and the
+simulated citywide result equals the historical volatility
+(calculate_pedersen_index between consecutive elections). Chunks of
+simulations run in a process pool.
+
+The data covers Córdoba Capital only, so the allocation treats the city as
+the district, and the legal threshold (3% of the electoral roll) is
+approximated with 3% of the valid votes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.political_analysis import calculate_pedersen_index
+from src.analysis.transfers import zone_votes
+from src.config import settings
+
+CALIBRATION_DRAWS = 512  # Simulations used to calibrate the noise scale
+
+
+def dhondt(votes, seats: int, threshold: float = settings.DHONDT_THRESHOLD) -> np.ndarray:
+    """
+    D'Hondt allocation for one or many vote vectors.
+
+    Args:
+        votes: (..., parties) votes or shares
+        seats: Seats to allocate
+        threshold: Minimum share of the scenario's total votes to take part
+
+    Returns:
+        (..., parties) integer seats; equal quotients go to the party with
+        more votes
+    """
+    votes = np.asarray(votes, dtype=float)
+    shape = votes.shape
+    votes = votes.reshape(-1, shape[-1])
+    scenarios, parties = votes.shape
+
+    eligible = votes >= threshold * votes.sum(axis=1, keepdims=True)
+    votes = np.where(eligible, votes, 0.0)
+
+    # Equal quotients go to the party with more votes: the nudge is ~1e-12 of
+    # a quotient, far below the gap between distinct quotients
+    quotients = votes[:, :, None] / np.arange(1, seats + 1)
+    keys = (quotients + 1e-12 * votes[:, :, None]).reshape(scenarios, -1)
+
+    top = np.argpartition(-keys, seats - 1, axis=1)[:, :seats] if seats < keys.shape[1] else \
+        np.broadcast_to(np.arange(keys.shape[1]), (scenarios, keys.shape[1]))
+    winners = top // seats + parties * np.arange(scenarios)[:, None]
+    allocated = np.bincount(winners.ravel(), minlength=scenarios * parties).reshape(scenarios, parties)
+    allocated[~eligible] = 0
+    return allocated.reshape(shape).astype(np.int32)
+
+
+def historical_volatility(df=None, years: Sequence[int] = settings.YEARS, backend=None) -> float:
+    """
+    Mean Pedersen index between consecutive elections.
+
+    Pairs with no party in common (100: every list was renamed, as with the
+    2025 alliances) measure relabelling rather than vote shifts and are
+    skipped.
+    """
+    values = [calculate_pedersen_index(df, a, b, backend=backend) for a, b in zip(years[:-1], years[1:])]
+    values = [value for value in values if value < 100]
+    if not values:
+        raise ValueError("No pair of consecutive elections shares any party")
+    return float(np.mean(values))
+
+
+# ============================================================================
+# SIMULATION
+# ============================================================================
+
+def _citywide_votes(shares: np.ndarray, turnout: np.ndarray, sigma: float, zone_ratio: float,
+                    rng: np.random.Generator, draws: int) -> np.ndarray:
+    """(draws, parties) citywide votes with log-normal noise on every zone's shares."""
+    zones, parties = shares.shape
+    city = rng.standard_normal((draws, 1, parties))
+    local = rng.standard_normal((draws, zones, parties))
+    perturbed = shares * np.exp(sigma * (city + zone_ratio * local))
+    perturbed /= perturbed.sum(axis=2, keepdims=True)
+    return np.einsum('dzp,z->dp', perturbed, turnout)
+
+
+def _pedersen(base: np.ndarray, votes: np.ndarray) -> np.ndarray:
+    shares = votes / votes.sum(axis=-1, keepdims=True)
+    return 50 * np.abs(shares - base / base.sum()).sum(axis=-1)
+
+
+def calibrate_sigma(shares: np.ndarray, turnout: np.ndarray, volatility: float, zone_ratio: float,
+                    seed: int = 0) -> float:
+    """Noise scale whose expected Pedersen index (points) equals `volatility` (bisection)."""
+    base = shares.T @ turnout
+    low, high = 0.0, 1.0
+    while True:
+        rng = np.random.default_rng(seed)
+        if _pedersen(base, _citywide_votes(shares, turnout, high, zone_ratio, rng, CALIBRATION_DRAWS)).mean() \
+                >= volatility or high > 64:
+            break
+        low, high = high, high * 2
+    for _ in range(40):
+        middle = (low + high) / 2
+        rng = np.random.default_rng(seed)
+        mean = _pedersen(base, _citywide_votes(shares, turnout, middle, zone_ratio, rng, CALIBRATION_DRAWS)).mean()
+        low, high = (middle, high) if mean < volatility else (low, middle)
+    return (low + high) / 2
+
+
+_worker_state: Dict[str, object] = {}
+
+
+def _init_worker(shares: np.ndarray, turnout: np.ndarray, sigma: float, zone_ratio: float,
+                 seats: int, threshold: float) -> None:
+    _worker_state.update(shares=shares, turnout=turnout, sigma=sigma, zone_ratio=zone_ratio,
+                         seats=seats, threshold=threshold)
+
+
+def _simulate_chunk(seed: int, draws: int) -> np.ndarray:
+    state = _worker_state
+    rng = np.random.default_rng(seed)
+    # Bound the (draws, zones, parties) noise array to ~64 MB per step
+    step = max(1, 8_000_000 // state['shares'].size)
+    seats = [dhondt(_citywide_votes(state['shares'], state['turnout'], state['sigma'], state['zone_ratio'],
+                                    rng, min(step, draws - start)), state['seats'], state['threshold'])
+             for start in range(0, draws, step)]
+    return np.concatenate(seats).astype(np.int16)
+
+
+@dataclass
+class SeatSimulation:
+    """
+    Simulated seat outcomes of one election.
+
+    Attributes:
+        year: Election year
+        parties: Party names, aligned with the seat columns
+        observed: Seats of the observed result
+        seats: (simulations, parties) simulated seats
+        volatility: Target Pedersen index (points)
+        sigma: Calibrated noise scale
+    """
+    year: int
+    parties: List[str]
+    observed: np.ndarray
+    seats: np.ndarray
+    volatility: float
+    sigma: float
+
+    def summary(self) -> pd.DataFrame:
+        """Observed, mean and 5-50-95% seats and P(at least one seat) per party."""
+        p05, p50, p95 = np.percentile(self.seats, [5, 50, 95], axis=0)
+        out = pd.DataFrame({
+            'agrupacion': self.parties,
+            'bancas_observadas': self.observed,
+            'bancas_media': self.seats.mean(axis=0),
+            'p05': p05.astype(int),
+            'p50': p50.astype(int),
+            'p95': p95.astype(int),
+            'prob_alguna': (self.seats > 0).mean(axis=0),
+        })
+        return out.sort_values(['bancas_media', 'agrupacion'], ascending=[False, True]).reset_index(drop=True)
+
+    def distribution(self) -> pd.DataFrame:
+        """Probability of each seat count (columns) per party (rows)."""
+        total = int(self.seats.max()) + 1
+        counts = np.stack([np.bincount(column, minlength=total) for column in self.seats.T.astype(np.int64)])
+        return pd.DataFrame(counts / len(self.seats), index=pd.Index(self.parties, name='agrupacion'),
+                            columns=pd.Index(range(total), name='bancas'))
+
+
+def simulate_seats(df=None, year: int = max(settings.YEARS), seats: Optional[int] = None,
+                   simulations: int = settings.SEAT_SIMULATIONS, volatility: Optional[float] = None,
+                   zone: str = 'seccional', zone_ratio: float = settings.SEAT_ZONE_NOISE,
+                   threshold: float = settings.DHONDT_THRESHOLD, workers: Optional[int] = settings.SEAT_WORKERS,
+                   seed: int = 0, backend=None) -> SeatSimulation:
+    """
+    Monte Carlo seat distribution around an observed election.
+
+    Args:
+        df: Results dataframe or path (default: the processed CSV)
+        year: Election to perturb
+        seats: Seats at stake (default: settings.SEATS_BY_YEAR)
+        simulations: Simulated elections
+        volatility: Expected Pedersen index of the perturbations in points
+            (default: historical_volatility)
+        zone: Zone column whose shares are perturbed
+        zone_ratio: Zone noise relative to the citywide noise
+        threshold: See dhondt
+        workers: Processes (default: CPU count; 1 = in-process)
+        seed: Random seed
+        backend: Backend name or instance
+
+    Returns:
+        SeatSimulation
+    """
+    source = settings.CLEAN_CSV if df is None else df
+    seats = seats or settings.SEATS_BY_YEAR[year]
+    volatility = historical_volatility(source, backend=backend) if volatility is None else volatility
+
+    votes = zone_votes(source, zone, min_share=0, backend=backend)[year]
+    votes = votes.loc[votes.sum(axis=1) > 0, votes.sum(axis=0) > 0]
+    turnout = votes.sum(axis=1).to_numpy(float)
+    shares = votes.to_numpy(float) / turnout[:, None]
+
+    observed = dhondt(votes.sum(axis=0).to_numpy(float), seats, threshold)
+    sigma = calibrate_sigma(shares, turnout, volatility, zone_ratio, seed)
+
+    chunk = settings.SEAT_SIM_CHUNK
+    counts = np.diff(np.r_[np.arange(0, simulations, chunk), simulations])
+    seeds = np.random.SeedSequence([seed, year]).generate_state(len(counts))
+    state = (shares, turnout, sigma, zone_ratio, seats, threshold)
+    workers = max(1, workers if workers is not None else (os.cpu_count() or 1))
+    if workers <= 1 or len(counts) <= 1:
+        _init_worker(*state)
+        chunks = [_simulate_chunk(s, c) for s, c in zip(seeds, counts)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(counts)), initializer=_init_worker,
+                                 initargs=state) as pool:
+            chunks = list(pool.map(_simulate_chunk, seeds, counts))
+
+    return SeatSimulation(year, list(votes.columns), observed, np.concatenate(chunks), volatility, sigma)
+
+
+if __name__ == '__main__':
+    for year in settings.YEARS:
+        simulation = simulate_seats(year=year)
+        print(f"\n=== {year}: {settings.SEATS_BY_YEAR[year]} bancas, {len(simulation.seats):,} simulaciones, "
+              f"volatilidad {simulation.volatility:.1f} pts (sigma {simulation.sigma:.3f}) ===")
+        summary = simulation.summary()
+        print(summary[summary['bancas_media'] > 0].to_string(index=False))
@@ -0,0 +1,368 @@
+"""
+Spatial autocorrelation of party shares: contiguity weights, Moran's I and
+Getis-Ord hot spots.
+
+Contiguity is found with an STRtree over the zone polygons (seccionales,
+circuits or any other coverage) and stored as a sparse matrix. Vote shares
+are laid out as one zones x (anio, agrupacion) matrix, so every statistic
+is computed for all parties and years at once with sparse matrix products:
+
+    global Moran's I   I = n / S0 * sum(z * Wz) / sum(z^2)      per column
+    local Moran's I    I_i = z_i * (Wz)_i / m2                  per zone/column
+    Getis-Ord Gi*      z-score of the neighbourhood sum (self included)
+
+Permutation tests reuse the same products on shuffled rows (global) or on
+random neighbour sets shared by all zones (local, conditional) and are split
+into chunks that run in a process pool.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from scipy import sparse
+
+from src.analysis.rollup import circuito_code
+from src.backends import get_backend
+from src.config import settings
+
+QUADRANTS = np.array(['HH', 'LH', 'LL', 'HL'])
+HOTSPOT_LEVELS = [(2.576, 'hot 99%'), (1.960, 'hot 95%'), (1.645, 'hot 90%')]
+PERMUTATION_CHUNK = 100  # Global Moran permutations per task
+
+
+# ============================================================================
+# WEIGHTS
+# ============================================================================
+
+@dataclass
+class SpatialWeights:
+    """
+    Sparse binary contiguity between zones.
+
+    Attributes:
+        ids: Zone ids, aligned with the matrix rows and columns
+        matrix: Symmetric CSR matrix, 1 where two zones are neighbours
+        kind: 'queen' (shared point or edge) or 'rook' (shared edge)
+    """
+    ids: pd.Index
+    matrix: sparse.csr_matrix
+    kind: str = 'queen'
+
+    @classmethod
+    def from_geodataframe(cls, gdf: gpd.GeoDataFrame, id_column: str, kind: str = 'queen',
+                          tolerance: float = 0.0) -> 'SpatialWeights':
+        """
+        Contiguity weights from polygons.
+
+        Args:
+            gdf: One polygon per zone
+            id_column: Zone id column
+            kind: 'queen' or 'rook'
+            tolerance: Distance (CRS units) under which polygons count as
+                touching; closes small gaps in coverages that are not clean
+
+        Returns:
+            SpatialWeights ordered like gdf
+        """
+        if kind not in ('queen', 'rook'):
+            raise ValueError("kind must be 'queen' or 'rook'")
+
+        geometries = np.asarray(gdf.geometry.values)
+        tree = shapely.STRtree(geometries)
+        if tolerance > 0:
+            left, right = tree.query(geometries, predicate='dwithin', distance=tolerance)
+        else:
+            left, right = tree.query(geometries, predicate='intersects')
+        keep = left < right
+        left, right = left[keep], right[keep]
+
+        if kind == 'rook' and len(left):
+            # Neighbours must share a boundary segment, not just a corner
+            boundaries = shapely.boundary(geometries)
+            near = shapely.buffer(boundaries[right], tolerance) if tolerance > 0 else boundaries[right]
+            shared = shapely.length(shapely.intersection(boundaries[left], near))
+            edge = shared > max(2 * tolerance, 1e-12)
+            left, right = left[edge], right[edge]
+
+        n = len(geometries)
+        data = np.ones(2 * len(left))
+        matrix = sparse.csr_matrix((data, (np.r_[left, right], np.r_[right, left])), shape=(n, n))
+        return cls(pd.Index(gdf[id_column].astype(str), name=id_column), matrix, kind)
+
+    @property
+    def n(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def cardinalities(self) -> np.ndarray:
+        return np.asarray(self.matrix.sum(axis=1)).ravel()
+
+    @property
+    def islands(self) -> list:
+        """Zones without neighbours."""
+        return list(self.ids[self.cardinalities == 0])
+
+    def neighbors(self, zone) -> list:
+        row = self.ids.get_loc(str(zone))
+        return list(self.ids[self.matrix.indices[self.matrix.indptr[row]:self.matrix.indptr[row + 1]]])
+
+    def row_standardized(self) -> sparse.csr_matrix:
+        """W with rows summing to 1 (islands stay all-zero)."""
+        card = self.cardinalities
+        scale = np.divide(1.0, card, out=np.zeros_like(card, dtype=float), where=card > 0)
+        return sparse.diags(scale) @ self.matrix
+
+    def subset(self, ids: Sequence) -> 'SpatialWeights':
+        """Weights restricted (and reordered) to `ids`."""
+        positions = self.ids.get_indexer(pd.Index(ids).astype(str))
+        if (positions < 0).any():
+            missing = list(pd.Index(ids)[positions < 0])
+            raise KeyError(f"Zones without geometry: {missing}")
+        return SpatialWeights(self.ids[positions], self.matrix[positions][:, positions].tocsr(), self.kind)
+
+
+# ============================================================================
+# SHARES
+# ============================================================================
+
+def share_matrix(df, zone: str = 'seccional', backend=None) -> pd.DataFrame:
+    """
+    Vote shares (0-1) per zone, one column per (anio, agrupacion).
+
+    Args:
+        df: Results dataframe or path (mesa, circuit or seccional level)
+        zone: Zone column to aggregate to
+        backend: Backend name or instance (default: settings.ANALYSIS_BACKEND)
+
+    Returns:
+        DataFrame indexed by zone (str) with (anio, agrupacion) columns;
+        parties absent from a zone have share 0
+    """
+    shares = get_backend(backend).shares(df, by=['anio', zone])
+    shares[zone] = shares[zone].astype(str)
+    matrix = shares.pivot_table(index=zone, columns=['anio', 'agrupacion'], values='porcentaje',
+                                aggfunc='sum', fill_value=0.0) / 100
+    return matrix.sort_index(axis=1)
+
+
+# ============================================================================
+# STATISTICS
+# ============================================================================
+
+def _center(x: np.ndarray) -> np.ndarray:
+    return x - x.mean(axis=0)
+
+
+def _moran_global(w: sparse.csr_matrix, z: np.ndarray) -> np.ndarray:
+    """Moran's I for every column of centered z (NaN for constant columns)."""
+    n, s0 = z.shape[0], w.sum()
+    denominator = (z * z).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return n / s0 * (z * (w @ z)).sum(axis=0) / denominator
+
+
+def _pseudo_p(observed: np.ndarray, simulated: np.ndarray) -> np.ndarray:
+    """Folded permutation p-value: share of simulations at least as extreme on the observed side."""
+    permutations = simulated.shape[0]
+    larger = (simulated >= observed).sum(axis=0)
+    larger = np.minimum(larger, permutations - larger)
+    return (larger + 1) / (permutations + 1)
+
+
+_worker_state: Dict[str, object] = {}
+
+
+def _init_worker(w: sparse.csr_matrix, z: np.ndarray, draws: Optional[np.ndarray] = None) -> None:
+    _worker_state['w'] = w
+    _worker_state['z'] = z
+    _worker_state['draws'] = draws
+
+
+def _global_chunk(seed: int, permutations: int) -> np.ndarray:
+    w, z = _worker_state['w'], _worker_state['z']
+    rng = np.random.default_rng(seed)
+    return np.stack([_moran_global(w, z[rng.permutation(z.shape[0])]) for _ in range(permutations)])
+
+
+def _neighbor_draws(n: int, k: int, permutations: int, seed) -> np.ndarray:
+    """
+    Random sets of k distinct positions among n - 1 (one row per permutation).
+
+    Shared by all zones, as in conditional randomization: position j stands
+    for zone j when j < i and zone j + 1 otherwise, so zone i is never its
+    own neighbour.
+    """
+    rng = np.random.default_rng(seed)
+    k = min(k, n - 1)
+    return np.stack([rng.choice(n - 1, k, replace=False) for _ in range(permutations)])
+
+
+def _local_chunk(rows: np.ndarray) -> np.ndarray:
+    """Local Moran of each zone in `rows` under the shared neighbour draws."""
+    w, z, draws = _worker_state['w'], _worker_state['z'], _worker_state['draws']
+    m2 = (z * z).sum(axis=0) / z.shape[0]
+    out = np.full((draws.shape[0], len(rows), z.shape[1]), np.nan)
+    for k, i in enumerate(rows):
+        weights = w.data[w.indptr[i]:w.indptr[i + 1]]
+        if len(weights) == 0:
+            continue
+        neighbors = draws[:, :len(weights)]
+        neighbors = neighbors + (neighbors >= i)
+        lag = np.einsum('k,pkc->pc', weights, z[neighbors])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[:, k] = z[i] * lag / m2
+    return out
+
+
+def _run_chunks(fn, tasks, workers: int, *state):
+    if workers <= 1 or len(tasks) <= 1:
+        _init_worker(*state)
+        return [fn(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=state) as pool:
+        return list(pool.map(fn, *zip(*tasks)))
+
+
+def _workers(workers: Optional[int]) -> int:
+    return max(1, workers if workers is not None else (os.cpu_count() or 1))
+
+
+class SpatialAnalysis:
+    """
+    Moran's I and Getis-Ord statistics of a share matrix over weights.
+
+    Args:
+        shares: Zones x (anio, agrupacion) matrix (see share_matrix)
+        weights: Contiguity weights; restricted to the zones in `shares`
+        permutations: Random permutations for the pseudo p-values (0 = none)
+        workers: Processes for the permutations (default: CPU count)
+        seed: Random seed
+    """
+
+    def __init__(self, shares: pd.DataFrame, weights: SpatialWeights,
+                 permutations: int = settings.SPATIAL_PERMUTATIONS,
+                 workers: Optional[int] = settings.SPATIAL_WORKERS, seed: int = 0):
+        self.shares = shares
+        self.weights = weights.subset(shares.index)
+        self.permutations = permutations
+        self.workers = _workers(workers)
+        self.seed = seed
+
+        self.x = shares.to_numpy(dtype=float)
+        self.z = _center(self.x)
+        self.w = self.weights.row_standardized()
+
+    def _seeds(self, count: int, stream: int) -> np.ndarray:
+        return np.random.SeedSequence([self.seed, stream]).generate_state(count)
+
+    def global_moran(self) -> pd.DataFrame:
+        """Global Moran's I per (anio, agrupacion), with a permutation p-value."""
+        observed = _moran_global(self.w, self.z)
+        result = pd.DataFrame({'moran_i': observed, 'expected_i': -1.0 / (self.weights.n - 1)},
+                              index=self.shares.columns)
+        if self.permutations > 0:
+            # Fixed-size chunks, so results do not depend on the number of workers
+            counts = np.diff(np.r_[np.arange(0, self.permutations, PERMUTATION_CHUNK), self.permutations])
+            seeds = self._seeds(len(counts), 0)
+            simulated = np.concatenate(_run_chunks(
+                _global_chunk, list(zip(seeds, counts)), self.workers, self.w, self.z))
+            result['z_sim'] = (observed - simulated.mean(axis=0)) / simulated.std(axis=0)
+            result['p_sim'] = _pseudo_p(observed, simulated)
+        return result.reset_index()
+
+    def local_moran(self) -> pd.DataFrame:
+        """Local Moran's I (LISA) per zone and (anio, agrupacion), with quadrant and p-value."""
+        n = self.weights.n
+        lag = self.w @ self.z
+        m2 = (self.z * self.z).sum(axis=0) / n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            local = self.z * lag / m2
+
+        # 1 HH, 2 LH, 3 LL, 4 HL (as in GeoDa), from the signs of z and its spatial lag
+        high, lag_high = self.z > 0, lag > 0
+        quadrant = np.where(high & lag_high, 0, np.where(~high & lag_high, 1, np.where(~high & ~lag_high, 2, 3)))
+        frame = {'local_i': local, 'quadrant': QUADRANTS[quadrant]}
+
+        if self.permutations > 0:
+            draws = _neighbor_draws(n, int(self.weights.cardinalities.max()), self.permutations,
+                                    self._seeds(1, 1)[0])
+            rows = np.array_split(np.arange(n), min(self.workers, n))
+            chunks = _run_chunks(_local_chunk, [(r,) for r in rows], self.workers, self.w, self.z, draws)
+            simulated = np.concatenate(chunks, axis=1)
+            frame['p_sim'] = _pseudo_p(local, simulated)
+
+        return self._tidy(frame)
+
+    def getis_ord(self) -> pd.DataFrame:
+        """Getis-Ord Gi* z-scores (self included) and hot/cold spot classes."""
+        n = self.weights.n
+        binary = self.weights.matrix + sparse.identity(n, format='csr')
+        w_sum = np.asarray(binary.sum(axis=1)).ravel()[:, None]
+        w_sq = np.asarray(binary.multiply(binary).sum(axis=1)).ravel()[:, None]
+        mean = self.x.mean(axis=0)
+        std = np.sqrt((self.x ** 2).mean(axis=0) - mean ** 2)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            gi = (binary @ self.x - mean * w_sum) / (std * np.sqrt((n * w_sq - w_sum ** 2) / (n - 1)))
+
+        spot = np.full(gi.shape, 'not significant', dtype=object)
+        for threshold, label in reversed(HOTSPOT_LEVELS):
+            spot[gi >= threshold] = label
+            spot[gi <= -threshold] = label.replace('hot', 'cold')
+        return self._tidy({'gi_z': gi, 'hotspot': spot})
+
+    def _tidy(self, columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """Long frame: one row per (zone, anio, agrupacion)."""
+        zones = self.shares.index
+        keys = self.shares.columns.to_frame(index=False)
+        out = pd.DataFrame({
+            zones.name or 'zone': np.repeat(zones.to_numpy(), len(keys)),
+            'anio': np.tile(keys['anio'].to_numpy(), len(zones)),
+            'agrupacion': np.tile(keys['agrupacion'].to_numpy(), len(zones)),
+            'share': self.x.ravel(),
+        })
+        for name, values in columns.items():
+            out[name] = np.asarray(values).ravel()
+        return out
+
+    def local_statistics(self) -> pd.DataFrame:
+        """Local Moran and Getis-Ord results side by side."""
+        local = self.local_moran()
+        return local.join(self.getis_ord()[['gi_z', 'hotspot']])
+
+
+def load_zones(level: str = 'seccional', path: Optional[Path] = None) -> gpd.GeoDataFrame:
+    """
+    Zone polygons with a string id column named after the level.
+
+    Args:
+        level: 'seccional' (processed seccionales GeoJSON) or 'circuito'
+            (raw circuit GeoJSON, ids as in the mesa results, e.g. "13G")
+        path: GeoJSON file (default: the one for the level)
+    """
+    if level == 'seccional':
+        gdf = gpd.read_file(path or settings.SECCIONALES_GEOJSON)
+        return gdf.assign(seccional=gdf['seccional'].astype(str))[['seccional', 'geometry']]
+    if level == 'circuito':
+        gdf = gpd.read_file(path or settings.GEOJSON_FILE)
+        codes = [circuito_code(props) for props in gdf.drop(columns='geometry').to_dict('records')]
+        return gdf.assign(circuito=codes)[['circuito', 'geometry']]
+    raise ValueError("level must be 'seccional' or 'circuito'")
+
+
+if __name__ == '__main__':
+    shares = share_matrix(settings.CLEAN_CSV)
+    weights = SpatialWeights.from_geodataframe(load_zones('seccional'), 'seccional', 'queen')
+    analysis = SpatialAnalysis(shares, weights, permutations=999)
+
+    print("=== Global Moran's I (seccionales, queen contiguity) ===")
+    print(analysis.global_moran().sort_values('p_sim').to_string(index=False))
+
+    print("\n=== Significant Getis-Ord hot/cold spots ===")
+    spots = analysis.getis_ord()
+    print(spots[spots['hotspot'] != 'not significant'].to_string(index=False))
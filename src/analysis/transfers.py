@@ -0,0 +1,341 @@
+"""
+Vote-transfer (ecological inference) matrices between consecutive elections.
+
+For each zone i the vote shares of the later election are modelled as a
+mix of the shares of the earlier one:
+
+    y_i ≈ x_i B        B[p, q] = share of party p's voters that went to q
+
+with every row of B on the simplex (non-negative, summing to 1). B is fitted
+by vote-weighted least squares over all zones, with a small ridge towards
+the citywide shares so the estimate is unique. The loss only depends on the
+zones through two small matrices,
+
+    G = X' W X   (parties_from x parties_from)
+    C = X' W Y   (parties_from x parties_to)
+
+so one pass over the zones reduces the problem to party dimensions, and
+the projected-gradient solver (FISTA with a row-wise simplex projection)
+costs the same at seccional, circuit or mesa level. Bootstrap replicates
+resample zones (multinomial weights); their G and C are built with one
+batched product per chunk, and all replicates of a chunk are solved
+together. Chunks run in a process pool.
+
+Estimates are cached per year pair by a hash of the inputs, in memory and
+in settings.TRANSFER_CACHE_DIR. Abstention is not modelled: the results
+only hold valid votes, so B describes how each party's share of the valid
+vote was redistributed.
+"""
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.backends import get_backend
+from src.config import settings
+
+OTHERS = 'OTROS'
+BOOTSTRAP_CHUNK = 50  # Replicates solved together per task
+
+
+# ============================================================================
+# DATA
+# ============================================================================
+
+def zone_votes(df, zone: str = 'seccional', min_share: float = settings.TRANSFER_MIN_SHARE,
+               backend=None) -> pd.DataFrame:
+    """
+    Votes per zone, one column per (anio, agrupacion).
+
+    Parties below min_share of a year's total vote are merged into OTROS,
+    which keeps the transfer matrices small and well determined.
+
+    Args:
+        df: Results dataframe or path (mesa, circuit or seccional level)
+        zone: Zone column
+        min_share: Citywide share (0-1) under which a party becomes OTROS
+        backend: Backend name or instance (default: settings.ANALYSIS_BACKEND)
+    """
+    totals = get_backend(backend).group_totals(df, ['anio', zone, 'agrupacion'])
+    totals[zone] = totals[zone].astype(str)
+
+    party = totals.groupby(['anio', 'agrupacion'])['votos'].transform('sum')
+    year = totals.groupby('anio')['votos'].transform('sum')
+    totals['agrupacion'] = totals['agrupacion'].where(party >= min_share * year, OTHERS)
+
+    votes = totals.pivot_table(index=zone, columns=['anio', 'agrupacion'], values='votos',
+                               aggfunc='sum', fill_value=0)
+    return votes.sort_index(axis=1)
+
+
+# ============================================================================
+# SOLVER
+# ============================================================================
+
+def project_simplex(v: np.ndarray) -> np.ndarray:
+    """Euclidean projection of every row (last axis) onto the probability simplex."""
+    u = -np.sort(-v, axis=-1)
+    cumulative = np.cumsum(u, axis=-1) - 1
+    index = np.arange(1, v.shape[-1] + 1)
+    support = (u - cumulative / index > 0).sum(axis=-1, keepdims=True)
+    theta = np.take_along_axis(cumulative, support - 1, axis=-1) / support
+    return np.maximum(v - theta, 0)
+
+
+def solve_transfers(gram: np.ndarray, cross: np.ndarray, max_iter: int = settings.TRANSFER_MAX_ITER,
+                    tol: float = 1e-9) -> np.ndarray:
+    """
+    Minimise ||W^1/2 (X B - Y)||^2 with simplex rows, given G = X'WX and C = X'WY.
+
+    Args:
+        gram: (..., P, P) Gram matrices (a leading batch axis solves many problems at once)
+        cross: (..., P, Q) cross products
+        max_iter: FISTA iterations
+        tol: Stop when no entry of B moves more than this
+
+    Returns:
+        (..., P, Q) transfer matrices
+    """
+    # Step 1/L, with L the largest eigenvalue of each G (gradient Lipschitz constant)
+    lipschitz = np.linalg.eigvalsh(gram)[..., -1][..., None, None]
+    step = 1.0 / np.where(lipschitz > 0, lipschitz, 1.0)
+
+    b = np.full(cross.shape, 1.0 / cross.shape[-1])
+    momentum, t = b, np.ones(step.shape)
+    for _ in range(max_iter):
+        gradient = gram @ momentum - cross
+        updated = project_simplex(momentum - step * gradient)
+        if np.abs(updated - b).max() < tol:
+            return updated
+        # Adaptive restart: drop the momentum of problems where it points uphill
+        restart = ((gradient * (updated - b)).sum(axis=(-2, -1), keepdims=True) > 0)
+        t = np.where(restart, 1.0, t)
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        momentum = updated + (t - 1) / t_next * (updated - b)
+        b, t = updated, t_next
+    return b
+
+
+def _normal_equations(x: np.ndarray, y: np.ndarray, weights: np.ndarray,
+                      ridge: float = settings.TRANSFER_RIDGE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    G and C for one or a batch (rows of `weights`) of zone weightings.
+
+    The ridge term pulls B towards the citywide destination shares (every
+    origin party splitting like the whole electorate). It makes the
+    minimiser unique when zones are few or party shares collinear, and
+    keeps the solver well conditioned.
+    """
+    batch = weights.ndim > 1
+    w = weights if batch else weights[None]
+    gram = np.einsum('bn,np,nq->bpq', w, x, x)
+    cross = np.einsum('bn,np,nq->bpq', w, x, y)
+    if ridge:
+        p = x.shape[1]
+        penalty = ridge * np.trace(gram, axis1=1, axis2=2)[:, None, None] / p
+        prior = (w @ y) / w.sum(axis=1, keepdims=True)
+        gram = gram + penalty * np.eye(p)
+        cross = cross + penalty * prior[:, None, :]
+    return (gram, cross) if batch else (gram[0], cross[0])
+
+
+_worker_state: Dict[str, np.ndarray] = {}
+
+
+def _init_worker(x: np.ndarray, y: np.ndarray, weights: np.ndarray) -> None:
+    _worker_state['x'] = x
+    _worker_state['y'] = y
+    _worker_state['weights'] = weights
+
+
+def _bootstrap_chunk(seed: int, replicates: int) -> np.ndarray:
+    """Transfer matrices of `replicates` zone resamples."""
+    x, y, weights = _worker_state['x'], _worker_state['y'], _worker_state['weights']
+    rng = np.random.default_rng(seed)
+    n = len(x)
+    counts = rng.multinomial(n, np.full(n, 1.0 / n), size=replicates)
+    gram, cross = _normal_equations(x, y, counts * weights)
+    return solve_transfers(gram, cross)
+
+
+# ============================================================================
+# ESTIMATES
+# ============================================================================
+
+@dataclass
+class TransferMatrix:
+    """
+    Estimated transfers from one election to the next.
+
+    Attributes:
+        year_from, year_to: Election years
+        parties_from, parties_to: Row and column parties
+        estimate: Rows = origin party, columns = destination, rows sum to 1
+        lower, upper: Percentile bootstrap bounds (NaN without bootstrap)
+        votes_from: Valid votes of each origin party (all zones)
+        zones: Zones used (present in both elections)
+        rmse: Vote-weighted RMSE of the fitted zone shares
+        replicates: Bootstrap replicates
+    """
+    year_from: int
+    year_to: int
+    parties_from: List[str]
+    parties_to: List[str]
+    estimate: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    votes_from: np.ndarray
+    zones: int
+    rmse: float
+    replicates: int
+
+    def matrix(self) -> pd.DataFrame:
+        """Estimate as a parties_from x parties_to DataFrame."""
+        return pd.DataFrame(self.estimate, index=pd.Index(self.parties_from, name=f'origen {self.year_from}'),
+                            columns=pd.Index(self.parties_to, name=f'destino {self.year_to}'))
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per (origen, destino) with proportion, bounds and implied votes."""
+        p, q = self.estimate.shape
+        return pd.DataFrame({
+            'anio_origen': self.year_from,
+            'anio_destino': self.year_to,
+            'origen': np.repeat(self.parties_from, q),
+            'destino': np.tile(self.parties_to, p),
+            'proporcion': self.estimate.ravel(),
+            'ci_inferior': self.lower.ravel(),
+            'ci_superior': self.upper.ravel(),
+            'votos': np.round(self.estimate * self.votes_from[:, None]).ravel().astype(np.int64),
+        })
+
+
+_memory_cache: Dict[str, TransferMatrix] = {}
+
+
+def transfer_key(x: np.ndarray, y: np.ndarray, weights: np.ndarray, labels: Sequence, params: Sequence) -> str:
+    """Hash of the zone shares, weights, party labels and parameters of one estimate."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((list(labels), list(params))).encode())
+    for array in (x, y, weights):
+        digest.update(np.ascontiguousarray(array, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def _save(path: Path, result: TransferMatrix) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(path, years=[result.year_from, result.year_to], parties_from=np.array(result.parties_from, dtype=str),
+             parties_to=np.array(result.parties_to, dtype=str), estimate=result.estimate, lower=result.lower,
+             upper=result.upper, votes_from=result.votes_from,
+             stats=[result.zones, result.rmse, result.replicates])
+
+
+def _load(path: Path) -> TransferMatrix:
+    with np.load(path) as data:
+        zones, rmse, replicates = data['stats']
+        return TransferMatrix(int(data['years'][0]), int(data['years'][1]), data['parties_from'].tolist(),
+                              data['parties_to'].tolist(), data['estimate'], data['lower'], data['upper'],
+                              data['votes_from'], int(zones), float(rmse), int(replicates))
+
+
+def estimate_transfers(votes: pd.DataFrame, year_from: int, year_to: int,
+                       bootstrap: int = settings.TRANSFER_BOOTSTRAP, confidence: float = 0.95,
+                       workers: Optional[int] = settings.TRANSFER_WORKERS, seed: int = 0,
+                       cache_dir: Optional[Path] = settings.TRANSFER_CACHE_DIR) -> TransferMatrix:
+    """
+    Transfer matrix between two elections, with bootstrap intervals.
+
+    Args:
+        votes: Zone x (anio, agrupacion) votes (see zone_votes)
+        year_from, year_to: Election years
+        bootstrap: Zone-resampling replicates (0 = point estimate only)
+        confidence: Coverage of the percentile intervals
+        workers: Processes for the bootstrap (default: CPU count)
+        seed: Random seed
+        cache_dir: Directory for the on-disk cache (None = memory only)
+
+    Returns:
+        TransferMatrix
+    """
+    before, after = votes[year_from], votes[year_to]
+    totals_from, totals_to = before.sum(axis=1).to_numpy(float), after.sum(axis=1).to_numpy(float)
+    keep = (totals_from > 0) & (totals_to > 0)
+    if keep.sum() < 2:
+        raise ValueError(f"Need at least two zones with votes in {year_from} and {year_to}")
+
+    x = before.to_numpy(float)[keep] / totals_from[keep, None]
+    y = after.to_numpy(float)[keep] / totals_to[keep, None]
+    weights = totals_from[keep]
+    parties_from, parties_to = list(before.columns), list(after.columns)
+
+    key = transfer_key(x, y, weights, parties_from + ['|'] + parties_to,
+                       [year_from, year_to, bootstrap, confidence, seed, settings.TRANSFER_RIDGE,
+                        settings.TRANSFER_MAX_ITER])
+    if key in _memory_cache:
+        return _memory_cache[key]
+    path = Path(cache_dir) / f'{key}.npz' if cache_dir else None
+    if path is not None and path.exists():
+        result = _memory_cache[key] = _load(path)
+        return result
+
+    estimate = solve_transfers(*_normal_equations(x, y, weights))
+    residual = x @ estimate - y
+    rmse = float(np.sqrt((weights[:, None] * residual ** 2).sum() / (weights.sum() * y.shape[1])))
+
+    lower = upper = np.full(estimate.shape, np.nan)
+    if bootstrap > 0:
+        counts = np.diff(np.r_[np.arange(0, bootstrap, BOOTSTRAP_CHUNK), bootstrap])
+        seeds = np.random.SeedSequence(seed).generate_state(len(counts))
+        workers = max(1, workers if workers is not None else (os.cpu_count() or 1))
+        if workers <= 1 or len(counts) <= 1:
+            _init_worker(x, y, weights)
+            chunks = [_bootstrap_chunk(s, c) for s, c in zip(seeds, counts)]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(counts)), initializer=_init_worker,
+                                     initargs=(x, y, weights)) as pool:
+                chunks = list(pool.map(_bootstrap_chunk, seeds, counts))
+        replicates = np.concatenate(chunks)
+        alpha = (1 - confidence) / 2
+        lower, upper = np.quantile(replicates, [alpha, 1 - alpha], axis=0)
+
+    result = TransferMatrix(year_from, year_to, parties_from, parties_to, estimate, lower, upper,
+                            before.sum(axis=0).to_numpy(float), int(keep.sum()), rmse, bootstrap)
+    if path is not None:
+        _save(path, result)
+    _memory_cache[key] = result
+    return result
+
+
+def transfer_chain(df=None, years: Sequence[int] = settings.YEARS, zone: str = 'seccional',
+                   min_share: float = settings.TRANSFER_MIN_SHARE, backend=None,
+                   **options) -> Dict[Tuple[int, int], TransferMatrix]:
+    """
+    Transfer matrices for every pair of consecutive years (2021→2023→2025).
+
+    Args:
+        df: Results dataframe or path (default: the processed CSV)
+        years: Election years, in order
+        zone: Zone column (seccional, circuito or mesa-level id)
+        min_share: See zone_votes
+        backend: Backend name or instance
+        **options: Passed to estimate_transfers
+
+    Returns:
+        {(year_from, year_to): TransferMatrix}
+    """
+    votes = zone_votes(settings.CLEAN_CSV if df is None else df, zone, min_share, backend)
+    available = set(votes.columns.get_level_values('anio'))
+    years = [year for year in years if year in available]
+    return {(a, b): estimate_transfers(votes, a, b, **options) for a, b in zip(years[:-1], years[1:])}
+
+
+if __name__ == '__main__':
+    pd.set_option('display.width', 200)
+    for (year_from, year_to), result in transfer_chain().items():
+        print(f"\n=== Transferencias {year_from} → {year_to} "
+              f"({result.zones} seccionales, RMSE {result.rmse:.4f}, {result.replicates} bootstrap) ===")
+        print((result.matrix() * 100).round(1).to_string())
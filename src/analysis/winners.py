@@ -0,0 +1,305 @@
+"""
+Incrementally maintained winners per zone: vote counts and an ordered top-k.
+
+WinnerIndex keeps, for every key (by default (anio, seccional)), the votes
+of each party and a tournament tree over the party columns: every node
+holds the top-k party codes of the leaves below it, so the root holds the
+winner, runner-up, ... of the key. Changing the votes of one party only
+re-merges the nodes on its leaf-to-root path, O(k log p), and winner,
+runner-up and margin are read from the root in O(1). Batches of updates
+are applied level by level over all touched paths at once with numpy.
+
+This replaces `df.loc[df.groupby(['anio', 'seccional'])['votos'].idxmax()]`
+wherever winners must follow changing votes (live counts, swapped years):
+the index is built once from the long results and then updated in place.
+Ties go to the party seen first, as with idxmax over the results order.
+"""
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+ZONE_KEYS = ('anio', 'seccional')
+
+
+class LabelCodes:
+    """Append-only label <-> integer code mapping."""
+
+    def __init__(self, labels=()):
+        self.labels: List[Hashable] = []
+        self._index: Dict[Hashable, int] = {}
+        self.encode(_objects(list(labels)))
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def get(self, label) -> Optional[int]:
+        return self._index.get(label)
+
+    def encode(self, values) -> np.ndarray:
+        """Codes of `values`, adding the labels not seen yet."""
+        inverse, uniques = pd.factorize(_objects(values))
+        for label in uniques:
+            if label not in self._index:
+                self._index[label] = len(self.labels)
+                self.labels.append(label)
+        codes = np.fromiter((self._index[label] for label in uniques), dtype=np.int64, count=len(uniques))
+        return codes[inverse]
+
+
+def _objects(values) -> np.ndarray:
+    """1-D object array of `values` (tuples stay whole)."""
+    if isinstance(values, np.ndarray) and values.ndim == 1:
+        return values.astype(object, copy=False)
+    out = np.empty(len(values), dtype=object)
+    out[:] = list(values)
+    return out
+
+
+def _capacity(parties: int) -> int:
+    """Leaves of the tournament tree: a power of two, at least 2."""
+    return max(2, 1 << (max(parties, 1) - 1).bit_length())
+
+
+class WinnerIndex:
+    """
+    Votes per (key, party) with an ordered top-k per key.
+
+    Args:
+        by: Names of the key columns (anio and zone)
+        k: Ranked parties kept per key (2: winner and runner-up)
+    """
+
+    def __init__(self, by: Sequence[str] = ZONE_KEYS, k: int = 2):
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        self.by = tuple(by)
+        self.k = k
+        self.keys = LabelCodes()
+        self.parties = LabelCodes()
+        self.votes = np.zeros((0, _capacity(0)), dtype=np.int64)
+        self.total = np.zeros(0, dtype=np.int64)
+        # tree[row, node] = top-k party codes below node (-1: none); root 1, leaves cap..2cap-1
+        self.tree = np.full((0, 2 * _capacity(0), k), -1, dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, by: Sequence[str] = ZONE_KEYS, k: int = 2) -> 'WinnerIndex':
+        """Index of long results (by columns, agrupacion, votos); repeated rows are summed."""
+        index = cls(by, k)
+        rows = index._frame_rows(df)
+        columns = index.parties.encode(df['agrupacion'].to_numpy(dtype=object))
+        index._reserve(len(index.keys), len(index.parties))
+        np.add.at(index.votes, (rows, columns), df['votos'].to_numpy(dtype=np.int64))
+        index.total = index.votes.sum(axis=1)
+        index._rebuild()
+        return index
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def key_codes(self, keys) -> np.ndarray:
+        """Row codes of `keys`, adding rows for the new ones."""
+        rows = self.keys.encode(keys)
+        self._reserve(len(self.keys), len(self.parties))
+        return rows
+
+    def party_codes(self, parties) -> np.ndarray:
+        """Column codes of `parties`, adding columns for the new ones."""
+        columns = self.parties.encode(parties)
+        self._reserve(len(self.keys), len(self.parties))
+        return columns
+
+    def set_codes(self, rows: np.ndarray, columns: np.ndarray, votes: np.ndarray) -> np.ndarray:
+        """Set the votes of (row, column) cells (the last value of a repeated cell wins). Returns touched rows."""
+        rows, columns = np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int64)
+        cells = rows * self.votes.shape[1] + columns
+        last = len(cells) - 1 - np.unique(cells[::-1], return_index=True)[1]
+        rows, columns = rows[last], columns[last]
+        delta = np.asarray(votes, dtype=np.int64)[last] - self.votes[rows, columns]
+        changed = delta != 0
+        return self.add_codes(rows[changed], columns[changed], delta[changed])
+
+    def add_codes(self, rows: np.ndarray, columns: np.ndarray, delta: np.ndarray) -> np.ndarray:
+        """Add vote changes to (row, column) cells. Returns touched rows."""
+        rows, columns = np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int64)
+        delta = np.asarray(delta, dtype=np.int64)
+        np.add.at(self.votes, (rows, columns), delta)
+        np.add.at(self.total, rows, delta)
+        if (self.votes[rows, columns] < 0).any():
+            raise ValueError("Votes cannot be negative")
+        self._refresh(rows, columns)
+        return np.unique(rows)
+
+    def update(self, key, party: str, votes: int) -> None:
+        """Set the votes of one party in one key."""
+        self.set_codes(self.key_codes(_objects([key])), self.party_codes(_objects([party])), np.array([votes]))
+
+    def update_frame(self, df: pd.DataFrame) -> list:
+        """Set the votes of every (key, party) row of `df`. Returns the keys whose votes changed."""
+        rows = self._frame_rows(df)
+        columns = self.party_codes(df['agrupacion'].to_numpy(dtype=object))
+        touched = self.set_codes(rows, columns, df['votos'].to_numpy(dtype=np.int64))
+        return [self.keys.labels[row] for row in touched]
+
+    def replace(self, df: pd.DataFrame) -> list:
+        """
+        Make `df` the full results of the first key column values it holds
+        (e.g. the years it covers): its cells are set and every other cell
+        of those years is zeroed. Only cells that changed are re-ranked.
+
+        Returns:
+            The keys whose votes changed
+        """
+        rows = self._frame_rows(df)
+        columns = self.party_codes(df['agrupacion'].to_numpy(dtype=object))
+        scope = set(df[self.by[0]].unique())
+        stale = [row for row, key in enumerate(self.keys.labels) if self._scope(key) in scope]
+        block = np.union1d(rows, stale).astype(np.int64)
+
+        new = np.zeros((len(block), len(self.parties)), dtype=np.int64)
+        np.add.at(new, (np.searchsorted(block, rows), columns), df['votos'].to_numpy(dtype=np.int64))
+        delta = new - self.votes[block, :len(self.parties)]
+        cell, column = np.nonzero(delta)
+        touched = self.add_codes(block[cell], column, delta[cell, column])
+        return [self.keys.labels[row] for row in touched]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def top(self, key) -> List[Tuple[str, int]]:
+        """Ranked (party, votes) of a key, up to k."""
+        row = self._row(key)
+        return [(self.parties.labels[column], int(self.votes[row, column]))
+                for column in self.tree[row, 1] if column >= 0]
+
+    def winner(self, key) -> Optional[str]:
+        """Party with most votes in a key (None without votes)."""
+        column = self.tree[self._row(key), 1, 0]
+        return self.parties.labels[column] if column >= 0 else None
+
+    def runner_up(self, key) -> Optional[str]:
+        if self.k < 2:
+            raise ValueError("runner_up needs k >= 2")
+        column = self.tree[self._row(key), 1, 1]
+        return self.parties.labels[column] if column >= 0 else None
+
+    def margin(self, key) -> float:
+        """Winner minus runner-up share of a key, in points."""
+        return float(self.rankings(np.array([self._row(key)]))[2][0])
+
+    def rankings(self, rows: Optional[np.ndarray] = None):
+        """Winner and runner-up columns (-1 when none) and the margin in points, per row."""
+        rows = np.arange(len(self.keys)) if rows is None else np.asarray(rows, dtype=np.int64)
+        winner = self.tree[rows, 1, 0]
+        runner_up = self.tree[rows, 1, 1] if self.k > 1 else np.full(len(rows), -1)
+        first = np.where(winner >= 0, self.votes[rows, np.maximum(winner, 0)], 0)
+        second = np.where(runner_up >= 0, self.votes[rows, np.maximum(runner_up, 0)], 0)
+        total = self.total[rows]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            margin = np.where(total > 0, (first - second) / total * 100, 0.0)
+        return winner, runner_up, margin
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Winner row per key with votes: the key columns, agrupacion, votos,
+        total_votos, porcentaje, segundo and margen_pct, sorted by key.
+        """
+        winner, runner_up, margin = self.rankings()
+        rows = np.flatnonzero(winner >= 0)
+        winner, runner_up, margin = winner[rows], runner_up[rows], margin[rows]
+        names = np.asarray(self.parties.labels + [None], dtype=object)
+        votes = self.votes[rows, winner]
+        total = self.total[rows]
+
+        keys = [self.keys.labels[row] for row in rows]
+        columns = list(zip(*keys)) if len(self.by) > 1 else [keys]
+        out = pd.DataFrame({name: list(values) for name, values in zip(self.by, columns)} if keys
+                           else {name: [] for name in self.by})
+        out['agrupacion'] = names[winner]
+        out['votos'] = votes
+        out['total_votos'] = total
+        out['porcentaje'] = np.round(votes / np.maximum(total, 1) * 100, 2)
+        out['segundo'] = names[runner_up]
+        out['margen_pct'] = np.round(margin, 2)
+        return out.sort_values(list(self.by), ignore_index=True)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _frame_rows(self, df: pd.DataFrame) -> np.ndarray:
+        """Row codes of the keys of `df`, adding the new ones (one tuple per distinct key)."""
+        if len(self.by) == 1:
+            return self.key_codes(df[self.by[0]].to_numpy(dtype=object))
+        codes, labels = zip(*(pd.factorize(df[name]) for name in self.by))
+        shape = [len(values) for values in labels]
+        inverse, uniques = pd.factorize(np.ravel_multi_index(codes, shape))
+        parts = np.unravel_index(uniques, shape)
+        keys = zip(*(np.asarray(values, dtype=object)[part] for values, part in zip(labels, parts)))
+        return self.key_codes(_objects(list(keys)))[inverse]
+
+    def _scope(self, key):
+        return key[0] if len(self.by) > 1 else key
+
+    def _row(self, key) -> int:
+        row = self.keys.get(key)
+        if row is None:
+            raise KeyError(key)
+        return row
+
+    def _reserve(self, rows: int, parties: int) -> None:
+        """Grow the arrays to hold `rows` keys (doubling) and `parties` leaves (next power of two)."""
+        have, cap = self.votes.shape
+        if rows > have:
+            grown = max(rows, 2 * have)
+            self.votes = np.vstack([self.votes, np.zeros((grown - have, cap), dtype=np.int64)])
+            self.total = np.concatenate([self.total, np.zeros(grown - have, dtype=np.int64)])
+            self.tree = np.concatenate([self.tree, np.full((grown - have,) + self.tree.shape[1:], -1)])
+        if parties > cap:
+            self.votes = np.pad(self.votes, ((0, 0), (0, _capacity(parties) - cap)))
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        """Tournament trees of every row from the votes, one level at a time."""
+        rows, cap = self.votes.shape
+        self.tree = np.full((rows, 2 * cap, self.k), -1, dtype=np.int64)
+        self.tree[:, cap:, 0] = np.where(self.votes > 0, np.arange(cap), -1)
+        every = np.arange(rows)[:, None]
+        level = cap // 2
+        while level:
+            nodes = np.arange(level, 2 * level)
+            self.tree[:, nodes] = self._merge(every, self.tree[:, 2 * nodes], self.tree[:, 2 * nodes + 1])
+            level //= 2
+
+    def _refresh(self, rows: np.ndarray, columns: np.ndarray) -> None:
+        """Re-merge the leaf-to-root paths of changed cells."""
+        cap = self.votes.shape[1]
+        if not len(rows):
+            return
+        self.tree[rows, cap + columns, 0] = np.where(self.votes[rows, columns] > 0, columns, -1)
+        nodes = cap + columns
+        for _ in range(cap.bit_length() - 1):
+            # Several changed leaves of a row share their upper nodes: merge each once
+            rows, nodes = np.divmod(np.unique(rows * 2 * cap + nodes // 2), 2 * cap)
+            self.tree[rows, nodes] = self._merge(rows, self.tree[rows, 2 * nodes], self.tree[rows, 2 * nodes + 1])
+
+    def _merge(self, rows: np.ndarray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Top-k party codes of two children (..., k): most votes first, lower code on ties."""
+        both = np.concatenate([left, right], axis=-1)
+        rows = np.broadcast_to(rows, both.shape[:-1])[..., None]
+        votes = np.where(both >= 0, self.votes[rows, np.maximum(both, 0)], -1)
+        order = np.lexsort((both, -votes))[..., :self.k]
+        return np.take_along_axis(both, order, -1)
+
+
+if __name__ == '__main__':
+    from src.config import settings
+
+    results = pd.read_csv(settings.CLEAN_CSV)
+    index = WinnerIndex.from_frame(results)
+    print(index.frame().to_string(index=False))
@@ -0,0 +1,12 @@
+"""
+Read API over the processed SQLite electoral database.
+"""
+from .queries import ElectoralQueries, ReadOnlyConnectionPool
+from .server import ElectoralReadService, serve
+
+__all__ = [
+    'ElectoralQueries',
+    'ReadOnlyConnectionPool',
+    'ElectoralReadService',
+    'serve',
+]
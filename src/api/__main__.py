@@ -0,0 +1,28 @@
+"""
+Run the electoral read API.
+Run with: python -m src.api [--host HOST] [--port PORT]
+"""
+import argparse
+import asyncio
+from pathlib import Path
+
+from src.config import settings
+from .server import serve
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Electoral database read API')
+    parser.add_argument('--host', default=settings.API_HOST)
+    parser.add_argument('--port', type=int, default=settings.API_PORT)
+    parser.add_argument('--database', type=Path, default=settings.DATABASE_FILE)
+    parser.add_argument('--pool-size', type=int, default=settings.API_POOL_SIZE)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.database, args.pool_size))
+    except KeyboardInterrupt:
+        print("\n[API] Stopped")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+"""
+Query layer over the SQLite electoral database.
+
+Connections are opened read-only and kept in a fixed-size pool. Every query
+is one of the SQL templates below expanded with one of a few fixed WHERE
+clauses, so each pooled connection prepares a statement once and reuses it
+from sqlite3's statement cache.
+"""
+import queue
+import sqlite3
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import shapely
+from shapely.geometry import box
+
+from src.config import settings
+
+# ============================================================================
+# SQL
+# ============================================================================
+
+WINNERS_SQL = """
+    SELECT t.anio, t.seccional_id AS seccional, g.nombre AS agrupacion, g.color,
+           t.ganador_votos AS votos, t.total_votos,
+           ROUND(100.0 * t.ganador_votos / t.total_votos, 2) AS porcentaje,
+           s.nombre AS segundo, t.segundo_votos, t.margen_votos, t.margen_pct
+    FROM totales_seccional t
+    JOIN agrupaciones g ON g.id = t.ganador_id
+    LEFT JOIN agrupaciones s ON s.id = t.segundo_id
+    {where}
+    ORDER BY t.anio, t.seccional_id
+    LIMIT :limit OFFSET :offset
+"""
+
+SECCIONAL_TOTALS_SQL = """
+    SELECT t.anio, t.seccional_id AS seccional, t.total_votos, t.agrupaciones
+    FROM totales_seccional t
+    {where}
+    ORDER BY t.anio, t.seccional_id
+    LIMIT :limit OFFSET :offset
+"""
+
+SECCIONAL_COUNT_SQL = """
+    SELECT COUNT(*) FROM totales_seccional t
+    {where}
+"""
+
+PARTY_TOTALS_SQL = """
+    SELECT t.anio, a.nombre AS agrupacion, a.color, t.votos, t.porcentaje, t.seccionales_ganadas
+    FROM totales_agrupacion t
+    JOIN agrupaciones a ON a.id = t.agrupacion_id
+    {where}
+    ORDER BY t.anio, t.votos DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+PARTY_TOTALS_COUNT_SQL = """
+    SELECT COUNT(*) FROM totales_agrupacion t
+    {where}
+"""
+
+SHARES_SQL = """
+    SELECT r.anio, r.seccional_id AS seccional, a.nombre AS agrupacion, a.color, r.votos,
+           ROUND(100.0 * r.votos / SUM(r.votos) OVER (PARTITION BY r.anio, r.seccional_id), 2) AS porcentaje
+    FROM resultados r
+    JOIN agrupaciones a ON a.id = r.agrupacion_id
+    {where_r}
+    ORDER BY r.anio, r.seccional_id, r.votos DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+SHARES_COUNT_SQL = """
+    SELECT COUNT(*) FROM resultados t
+    {where}
+"""
+
+SECCIONALES_BBOX_SQL = """
+    SELECT s.id AS seccional, s.nombre, s.minx, s.miny, s.maxx, s.maxy,
+           s.centroid_x, s.centroid_y, s.area_m2, s.geometry
+    FROM seccionales_rtree i
+    JOIN seccionales s ON s.id = i.id
+    WHERE i.minx <= :maxx AND i.maxx >= :minx
+      AND i.miny <= :maxy AND i.maxy >= :miny
+    ORDER BY s.id
+"""
+
+YEARS_SQL = "SELECT DISTINCT anio FROM totales_seccional ORDER BY anio"
+
+# Tables the queries above read besides resultados/agrupaciones/seccionales
+READ_TABLES = {'totales_seccional', 'totales_agrupacion', 'seccionales_rtree'}
+
+
+def _where(alias: str, **filters) -> str:
+    """
+    WHERE clause for the filters that are set.
+
+    Only a handful of distinct clauses exist, so each combination maps to one
+    prepared statement that the planner resolves against the summary table
+    primary keys or the covering (anio, seccional_id) index on resultados.
+    """
+    columns = {'anio': 'anio', 'seccional': 'seccional_id'}
+    clauses = [f"{alias}.{columns[name]} = :{name}" for name, value in filters.items() if value is not None]
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+# ============================================================================
+# CONNECTION POOL
+# ============================================================================
+
+class ReadOnlyConnectionPool:
+    """
+    Fixed-size pool of read-only SQLite connections.
+
+    Connections are created with check_same_thread=False so they can be
+    handed to worker threads; a connection is only ever used by the thread
+    that checked it out.
+
+    A database written before the summary tables and the R*Tree existed is
+    upgraded once, on open (see src.etl.load.upgrade_read_schema).
+    """
+
+    def __init__(self, database: Path = settings.DATABASE_FILE, size: int = settings.API_POOL_SIZE):
+        self.database = Path(database)
+        if not self.database.exists():
+            raise FileNotFoundError(f"Database not found: {self.database}")
+        self._ensure_schema()
+
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self._pool.put(self._connect())
+
+    def _ensure_schema(self) -> None:
+        with closing(self._connect()) as conn:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if READ_TABLES <= tables:
+            return
+
+        from src.etl.load import upgrade_read_schema
+        print(f"[API] Adding {sorted(READ_TABLES - tables)} to {self.database}...")
+        try:
+            with closing(sqlite3.connect(self.database)) as conn:
+                upgrade_read_schema(conn)
+        except sqlite3.Error as e:
+            raise FileNotFoundError(f"Cannot upgrade {self.database} ({e}); run python -m src.etl") from e
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"{self.database.resolve().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=64,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+# ============================================================================
+# QUERIES
+# ============================================================================
+
+def _page(limit: Optional[int], offset: Optional[int]) -> Dict[str, int]:
+    limit = settings.API_DEFAULT_PAGE_SIZE if limit is None else int(limit)
+    offset = 0 if offset is None else int(offset)
+    if limit < 1 or offset < 0:
+        raise ValueError("limit must be >= 1 and offset >= 0")
+    return {'limit': min(limit, settings.API_MAX_PAGE_SIZE), 'offset': offset}
+
+
+class ElectoralQueries:
+    """
+    Synchronous query layer shared by the API service and the dashboards.
+
+    Every method returns a JSON-serializable dict with `data` rows and,
+    for list endpoints, a `pagination` block.
+    """
+
+    def __init__(self, pool: ReadOnlyConnectionPool):
+        self.pool = pool
+
+    def _fetch(self, sql: str, params: dict) -> List[dict]:
+        with self.pool.connection() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def _scalar(self, sql: str, params: dict):
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).fetchone()[0]
+
+    def _paginated(self, sql: str, count_sql: str, params: dict, limit, offset) -> dict:
+        page = _page(limit, offset)
+        clauses = {'where': _where('t', **params), 'where_r': _where('r', **params)}
+        params = {k: v for k, v in params.items() if v is not None}
+        rows = self._fetch(sql.format(**clauses), {**params, **page})
+        total = self._scalar(count_sql.format(**clauses), params)
+        return {'data': rows, 'pagination': {**page, 'total': total}}
+
+    def seccionales_in_bbox(self, minx: float, miny: float, maxx: float, maxy: float,
+                            exact: bool = True, geometry: bool = False) -> dict:
+        """
+        Seccionales whose polygon intersects a lon/lat viewport.
+
+        The R*Tree narrows the search to bounding-box candidates inside
+        SQLite; with exact=True only those candidates' WKB is parsed for the
+        precise intersection test.
+
+        Args:
+            minx, miny, maxx, maxy: Viewport in EPSG:4326
+            exact: Test the real polygon, not just its bounding box
+            geometry: Include the polygon as GeoJSON geometry
+        """
+        if minx > maxx or miny > maxy:
+            raise ValueError("bbox must satisfy minx <= maxx and miny <= maxy")
+
+        rows = self._fetch(SECCIONALES_BBOX_SQL, {'minx': minx, 'miny': miny, 'maxx': maxx, 'maxy': maxy})
+        if exact or geometry:
+            geoms = shapely.from_wkb([row['geometry'] for row in rows])
+            if exact:
+                hits = shapely.intersects(geoms, box(minx, miny, maxx, maxy))
+                rows = [row for row, hit in zip(rows, hits) if hit]
+                geoms = geoms[hits]
+            for row, geom in zip(rows, geoms):
+                row['geometry'] = geom.__geo_interface__ if geometry else None
+        for row in rows:
+            if not geometry:
+                del row['geometry']
+        return {'data': rows}
+
+    def years(self) -> dict:
+        return {'data': [row['anio'] for row in self._fetch(YEARS_SQL, {})]}
+
+    def winners(self, anio: Optional[int] = None, seccional: Optional[int] = None,
+                limit: Optional[int] = None, offset: Optional[int] = None) -> dict:
+        """Winner, runner-up and margin per (anio, seccional)."""
+        params = {'anio': anio, 'seccional': seccional}
+        return self._paginated(WINNERS_SQL, SECCIONAL_COUNT_SQL, params, limit, offset)
+
+    def seccional_totals(self, anio: Optional[int] = None, seccional: Optional[int] = None,
+                         limit: Optional[int] = None, offset: Optional[int] = None) -> dict:
+        """Total votes per (anio, seccional)."""
+        params = {'anio': anio, 'seccional': seccional}
+        return self._paginated(SECCIONAL_TOTALS_SQL, SECCIONAL_COUNT_SQL, params, limit, offset)
+
+    def party_totals(self, anio: Optional[int] = None,
+                     limit: Optional[int] = None, offset: Optional[int] = None) -> dict:
+        """Total votes, city-wide share and seccionales won per (anio, agrupacion)."""
+        params = {'anio': anio}
+        return self._paginated(PARTY_TOTALS_SQL, PARTY_TOTALS_COUNT_SQL, params, limit, offset)
+
+    def shares(self, anio: Optional[int] = None, seccional: Optional[int] = None,
+               limit: Optional[int] = None, offset: Optional[int] = None) -> dict:
+        """Votes and share of every party per (anio, seccional)."""
+        params = {'anio': anio, 'seccional': seccional}
+        return self._paginated(SHARES_SQL, SHARES_COUNT_SQL, params, limit, offset)
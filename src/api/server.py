@@ -0,0 +1,200 @@
+"""
+Async HTTP read API over the SQLite electoral database.
+
+The event loop only parses requests and writes responses; SQLite work runs
+in a thread pool sized to the read-only connection pool, so slow queries
+never block other clients.
+
+Endpoints (all GET, JSON):
+    /years
+    /winners?anio=&seccional=&limit=&offset=
+    /totals/seccionales?anio=&seccional=&limit=&offset=
+    /totals/agrupaciones?anio=&limit=&offset=
+    /shares?anio=&seccional=&limit=&offset=
+    /seccionales?minx=&miny=&maxx=&maxy=&exact=&geometry=
+    /query?sql=&limit=        ad hoc read-only SQL (see src.api.sql)
+    /health
+"""
+import asyncio
+import json
+import sqlite3
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Dict, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from src.config import settings
+from .queries import ElectoralQueries, ReadOnlyConnectionPool
+
+PAGINATED = {'anio': int, 'seccional': int, 'limit': int, 'offset': int}
+
+ROUTES = {
+    '/years': ('years', {}),
+    '/winners': ('winners', PAGINATED),
+    '/totals/seccionales': ('seccional_totals', PAGINATED),
+    '/totals/agrupaciones': ('party_totals', {'anio': int, 'limit': int, 'offset': int}),
+    '/shares': ('shares', PAGINATED),
+    '/seccionales': ('seccionales_in_bbox', {'minx': float, 'miny': float, 'maxx': float, 'maxy': float,
+                                             'exact': bool, 'geometry': bool}),
+}
+
+QUERY_ROUTE = '/query'
+QUERY_PARAMS = {'sql': str, 'limit': int}
+
+MAX_HEADER_BYTES = 16 * 1024
+
+
+class ElectoralReadService:
+    """Runs ElectoralQueries methods on a thread pool from async code."""
+
+    def __init__(self, database: Path = settings.DATABASE_FILE, pool_size: int = settings.API_POOL_SIZE):
+        self.pool = ReadOnlyConnectionPool(database, pool_size)
+        self.queries = ElectoralQueries(self.pool)
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='sqlite-read')
+        self._sql_engine = None
+
+    async def call(self, method: str, **params) -> dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(getattr(self.queries, method), **params))
+
+    @property
+    def sql_engine(self):
+        """DuckDB QueryEngine, created on the first /query request."""
+        if self._sql_engine is None:
+            from .sql import QueryEngine
+            self._sql_engine = QueryEngine(database=self.pool.database)
+        return self._sql_engine
+
+    async def sql(self, sql: str = '', limit: int = None) -> dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(self.sql_engine.execute, sql, limit))
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+        self.pool.close()
+        if self._sql_engine is not None:
+            self._sql_engine.close()
+
+
+def _parse_params(query: str, allowed: Dict[str, type]) -> Dict[str, Any]:
+    """Parse typed query parameters, rejecting unknown names."""
+    raw = parse_qs(query, keep_blank_values=False)
+    unknown = set(raw) - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {sorted(unknown)}")
+    params = {}
+    for name, values in raw.items():
+        kind, value = allowed[name], values[-1]
+        if kind is bool:
+            params[name] = value.lower() in ('1', 'true', 'yes')
+            continue
+        try:
+            params[name] = kind(value)
+        except ValueError:
+            raise ValueError(f"Parameter '{name}' must be {'an integer' if kind is int else 'a number'}")
+    return params
+
+
+async def handle_request(service: ElectoralReadService, method: str, target: str) -> Tuple[HTTPStatus, dict]:
+    """Route one request and return (status, JSON body)."""
+    if method != 'GET':
+        return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'Only GET is supported'}
+
+    url = urlsplit(target)
+    path = url.path.rstrip('/') or '/'
+    if path == '/health':
+        return HTTPStatus.OK, {'status': 'ok'}
+    if path == QUERY_ROUTE:
+        try:
+            return HTTPStatus.OK, await service.sql(**_parse_params(url.query, QUERY_PARAMS))
+        except ImportError as e:
+            return HTTPStatus.NOT_IMPLEMENTED, {'error': str(e)}
+        except (TypeError, ValueError) as e:
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        except Exception as e:
+            return _error_response(e)
+    if path not in ROUTES:
+        return HTTPStatus.NOT_FOUND, {'error': f'Unknown endpoint: {path}', 'endpoints': sorted([*ROUTES, QUERY_ROUTE])}
+
+    query_method, allowed = ROUTES[path]
+    try:
+        params = _parse_params(url.query, allowed)
+        return HTTPStatus.OK, await service.call(query_method, **params)
+    except (TypeError, ValueError) as e:
+        return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+    except Exception as e:
+        return _error_response(e)
+
+
+def _error_response(error: Exception) -> Tuple[HTTPStatus, dict]:
+    """503 when the data is missing or unreadable, 500 for anything else."""
+    if isinstance(error, (sqlite3.OperationalError, FileNotFoundError)):
+        return HTTPStatus.SERVICE_UNAVAILABLE, {'error': f'Data unavailable: {error}'}
+    traceback.print_exception(error)
+    return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'Internal server error'}
+
+
+def _response(status: HTTPStatus, body: dict, keep_alive: bool) -> bytes:
+    payload = json.dumps(body, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    headers = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        "Content-Type: application/json; charset=utf-8",
+        f"Content-Length: {len(payload)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        "Access-Control-Allow-Origin: *",
+    ]
+    return ("\r\n".join(headers) + "\r\n\r\n").encode('latin-1') + payload
+
+
+async def _serve_connection(service: ElectoralReadService,
+                            reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+            if len(head) > MAX_HEADER_BYTES:
+                return
+
+            lines = head.decode('latin-1').split("\r\n")
+            try:
+                method, target, version = lines[0].split(" ", 2)
+            except ValueError:
+                writer.write(_response(HTTPStatus.BAD_REQUEST, {'error': 'Malformed request line'}, False))
+                await writer.drain()
+                return
+
+            headers = {}
+            for line in lines[1:]:
+                if ':' in line:
+                    name, value = line.split(':', 1)
+                    headers[name.strip().lower()] = value.strip().lower()
+            keep_alive = (version == 'HTTP/1.1' and headers.get('connection') != 'close') \
+                or headers.get('connection') == 'keep-alive'
+
+            status, body = await handle_request(service, method, target)
+            writer.write(_response(status, body, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                return
+    finally:
+        writer.close()
+
+
+async def serve(host: str = settings.API_HOST, port: int = settings.API_PORT,
+                database: Path = settings.DATABASE_FILE, pool_size: int = settings.API_POOL_SIZE) -> None:
+    """Start the API server and run until cancelled."""
+    service = ElectoralReadService(database, pool_size)
+    server = await asyncio.start_server(
+        partial(_serve_connection, service), host, port, limit=MAX_HEADER_BYTES
+    )
+    print(f"[API] Serving {database} on http://{host}:{port}/")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
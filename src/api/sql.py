@@ -0,0 +1,401 @@
+"""
+Ad hoc SQL over the processed outputs with embedded DuckDB.
+
+Replaces one-off investigation scripts (debug_2025_lla.py, test_filter.py,
+verify_all_parties_all_years.py, ...) that reload the CSV and filter it by
+hand: the same question is one query against registered views.
+
+Views:
+    resultados       Seccional-level results (processed CSV, or a Parquet
+                     file with the same name when present)
+    resultados_mesa  Mesa-level results (settings.MESA_PARQUET, if built)
+    totals           City-wide votes and share per (anio, agrupacion)
+    winners          Winner, runner-up and margin per (anio, seccional)
+    geometry         Seccional centroid, bbox, area and WKT
+    db.<table>       Tables and views of the SQLite database
+
+Only single read statements (SELECT, WITH, DESCRIBE, SHOW, SUMMARIZE,
+FROM, EXPLAIN, PIVOT ... IN (values) ...) are accepted, and file access is
+limited to the sources above. A PIVOT without an IN list is rejected:
+DuckDB runs it as a CREATE TYPE of the pivoted values plus the query. Results are cached until a source file changes.
+
+Usage:
+    python -m src.api.sql "SELECT * FROM totals WHERE agrupacion LIKE '%LIBERTAD%'"
+    python -m src.api.sql            # interactive prompt
+"""
+import argparse
+import datetime
+import decimal
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from src.config import settings
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - optional dependency
+    duckdb = None
+
+AREA_CRS = 'EPSG:32720'  # UTM 20S, metric CRS for Córdoba
+
+# Statement types of read queries (DESCRIBE, SHOW, SUMMARIZE and PIVOT ... IN parse as SELECT)
+READ_STATEMENTS = {'SELECT', 'EXPLAIN'}
+
+VIEWS_SQL = {
+    'totals': """
+        SELECT anio, agrupacion, CAST(sum(votos) AS BIGINT) AS votos,
+               CAST(sum(sum(votos)) OVER (PARTITION BY anio) AS BIGINT) AS total_votos,
+               round(sum(votos) * 100.0 / sum(sum(votos)) OVER (PARTITION BY anio), 2) AS porcentaje,
+               CAST(count(DISTINCT seccional) AS BIGINT) AS seccionales
+        FROM resultados
+        GROUP BY anio, agrupacion
+    """,
+    'winners': """
+        WITH ranked AS (
+            SELECT anio, seccional, agrupacion, votos,
+                   sum(votos) OVER (PARTITION BY anio, seccional) AS total_votos,
+                   row_number() OVER (PARTITION BY anio, seccional ORDER BY votos DESC, agrupacion) AS puesto
+            FROM resultados
+        )
+        SELECT f.anio, f.seccional, f.agrupacion, f.votos, CAST(f.total_votos AS BIGINT) AS total_votos,
+               round(f.votos * 100.0 / f.total_votos, 2) AS porcentaje,
+               s.agrupacion AS segundo, s.votos AS segundo_votos,
+               round((f.votos - coalesce(s.votos, 0)) * 100.0 / f.total_votos, 2) AS margen_pct
+        FROM ranked f
+        LEFT JOIN ranked s ON s.anio = f.anio AND s.seccional = f.seccional AND s.puesto = 2
+        WHERE f.puesto = 1
+    """,
+}
+
+
+class QueryError(ValueError):
+    """Rejected or failed ad hoc query."""
+
+
+def _jsonable(value):
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return value
+
+
+def _quote(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class QueryEngine:
+    """
+    DuckDB connection with the processed outputs registered as views.
+
+    Thread-safe: each query runs on its own cursor, taken under the lock.
+    When any source file changes, the views are rebuilt on a fresh
+    connection and the result cache is dropped; the previous connection is
+    not closed, so queries already running on it finish, and it is freed
+    with its last cursor.
+
+    Args:
+        csv: Processed seccional-level results
+        mesa_parquet: Mesa-level results (optional)
+        geojson: Dissolved seccional polygons (optional)
+        database: SQLite database exposed as schema `db` (optional)
+        cache_size: Cached results (0 = no cache)
+        max_rows: Row cap for execute() results
+    """
+
+    def __init__(self, csv: Path = settings.CLEAN_CSV, mesa_parquet: Path = settings.MESA_PARQUET,
+                 geojson: Path = settings.SECCIONALES_GEOJSON, database: Path = settings.DATABASE_FILE,
+                 cache_size: int = settings.QUERY_CACHE_SIZE, max_rows: int = settings.QUERY_MAX_ROWS):
+        if duckdb is None:
+            raise ImportError("The query engine requires duckdb: pip install duckdb")
+        self.csv = Path(csv)
+        self.mesa_parquet = Path(mesa_parquet)
+        self.geojson = Path(geojson)
+        self.database = Path(database)
+        self.cache_size = cache_size
+        self.max_rows = max_rows
+
+        self._cache: "OrderedDict[Tuple, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._signature = None
+        self.conn = None
+        self.hits = self.misses = 0
+        self._ensure_fresh()
+
+    # ------------------------------------------------------------------
+    # Sources and views
+    # ------------------------------------------------------------------
+
+    @property
+    def results_source(self) -> Path:
+        parquet = self.csv.with_suffix('.parquet')
+        return parquet if parquet.exists() else self.csv
+
+    def _sources(self) -> List[Path]:
+        return [self.results_source, self.mesa_parquet, self.geojson, self.database]
+
+    def _current_signature(self) -> Tuple:
+        return tuple((str(p), p.stat().st_mtime_ns if p.exists() else None) for p in self._sources())
+
+    def _ensure_fresh(self) -> None:
+        signature = self._current_signature()
+        if signature == self._signature:
+            return
+        with self._lock:
+            if signature == self._signature:
+                return
+            self.conn = self._connect()
+            self._signature = signature
+            self._cache.clear()
+
+    def _cursor(self) -> Tuple['duckdb.DuckDBPyConnection', Tuple]:
+        """Cursor on the current connection, with the source signature it reads."""
+        self._ensure_fresh()
+        with self._lock:
+            return self.conn.cursor(), self._signature
+
+    def _connect(self) -> 'duckdb.DuckDBPyConnection':
+        results = self.results_source
+        if not results.exists():
+            raise FileNotFoundError(f"Processed results not found: {results} (run python -m src.etl)")
+
+        conn = duckdb.connect()
+        reader = 'read_parquet' if results.suffix == '.parquet' else 'read_csv_auto'
+        allowed = [results.resolve()]
+        conn.execute(f'CREATE VIEW resultados AS SELECT * FROM {reader}({_quote(results.resolve())})')
+        if self.mesa_parquet.exists():
+            allowed.append(self.mesa_parquet.resolve())
+            conn.execute(f'CREATE VIEW resultados_mesa AS '
+                         f'SELECT * FROM read_parquet({_quote(self.mesa_parquet.resolve())})')
+        for name, sql in VIEWS_SQL.items():
+            conn.execute(f'CREATE VIEW {name} AS {sql}')
+        if self.geojson.exists():
+            conn.register('_geometry', self._geometry_frame())
+            conn.execute('CREATE TABLE geometry AS SELECT * FROM _geometry')
+            conn.unregister('_geometry')
+        if self.database.exists() and self._attach_database(conn):
+            allowed.append(self.database.resolve())
+
+        # From here on user queries can only read the sources registered above
+        conn.execute(f"SET allowed_paths = [{', '.join(_quote(p) for p in allowed)}]")
+        conn.execute('SET enable_external_access = false')
+        conn.execute('SET lock_configuration = true')
+        return conn
+
+    def _geometry_frame(self) -> pd.DataFrame:
+        import geopandas as gpd
+
+        gdf = gpd.read_file(self.geojson)
+        centroids = gdf.to_crs(AREA_CRS).centroid.to_crs(gdf.crs)
+        bounds = gdf.bounds
+        return pd.DataFrame({
+            'seccional': pd.to_numeric(gdf['seccional'], errors='coerce').astype('Int64'),
+            'centroid_lon': centroids.x,
+            'centroid_lat': centroids.y,
+            'minx': bounds['minx'], 'miny': bounds['miny'], 'maxx': bounds['maxx'], 'maxy': bounds['maxy'],
+            'area_km2': (gdf.to_crs(AREA_CRS).area / 1e6).round(4),
+            'geometry_wkt': gdf.geometry.to_wkt(),
+        })
+
+    def _attach_database(self, conn) -> bool:
+        """
+        Expose the SQLite database as `db`: attached in place when DuckDB's
+        sqlite extension is available (returns True), else copied.
+        """
+        try:
+            conn.execute(f'ATTACH {_quote(self.database.resolve())} AS db (TYPE sqlite, READ_ONLY)')
+            return True
+        except duckdb.Error:
+            pass
+
+        conn.execute('CREATE SCHEMA db')
+        with sqlite3.connect(f'{self.database.resolve().as_uri()}?mode=ro', uri=True) as source:
+            names = [row[0] for row in source.execute(
+                "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') "
+                "AND name NOT LIKE 'sqlite_%' AND sql NOT LIKE 'CREATE VIRTUAL TABLE%'")]
+            for name in names:
+                try:
+                    frame = pd.read_sql_query(f'SELECT * FROM "{name}"', source)
+                except (sqlite3.Error, pd.errors.DatabaseError):
+                    continue  # e.g. R*Tree shadow tables
+                conn.register('_table', frame)
+                conn.execute(f'CREATE TABLE db."{name}" AS SELECT * FROM _table')
+                conn.unregister('_table')
+        return False
+
+    def views(self) -> List[str]:
+        """Queryable relation names."""
+        cursor, _ = self._cursor()
+        rows = cursor.execute("""
+            SELECT CASE WHEN database = 'db' THEN 'db.' || name
+                        WHEN schema = 'main' THEN name
+                        ELSE schema || '.' || name END AS relation
+            FROM (SHOW ALL TABLES) ORDER BY relation
+        """).fetchall()
+        return [row[0] for row in rows]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def check(sql: str) -> str:
+        """Validate that `sql` is a single read statement; returns it stripped."""
+        sql = sql.strip().rstrip(';').strip()
+        if not sql:
+            raise QueryError("Empty query")
+        try:
+            statements = duckdb.extract_statements(sql)
+        except duckdb.Error as e:
+            raise QueryError(str(e).splitlines()[0])
+        if statements[0].type.name == 'CREATE' and 'PIVOT' in sql.upper():
+            raise QueryError("PIVOT needs an explicit list of values: ON column IN (...)")
+        if len(statements) != 1:
+            raise QueryError("Only one statement per query is allowed")
+        if statements[0].type.name not in READ_STATEMENTS:
+            raise QueryError(f"Only read queries are allowed (got {statements[0].type.name})")
+        return sql
+
+    def query(self, sql: str) -> pd.DataFrame:
+        """Run a read query and return all rows as a DataFrame (uncached)."""
+        sql = self.check(sql)
+        cursor, _ = self._cursor()
+        try:
+            return cursor.execute(sql).df()
+        except duckdb.Error as e:
+            raise QueryError(str(e).splitlines()[0])
+
+    def execute(self, sql: str, limit: Optional[int] = None) -> dict:
+        """
+        Run a read query and return a JSON-serializable result (cached).
+
+        Returns:
+            {'columns', 'rows', 'row_count', 'truncated', 'elapsed_ms', 'cached'};
+            at most `limit` (default and cap: max_rows) rows are returned
+        """
+        sql = self.check(sql)
+        limit = self.max_rows if limit is None else min(int(limit), self.max_rows)
+        if limit < 1:
+            raise QueryError("limit must be >= 1")
+        cursor, signature = self._cursor()
+
+        key = (sql, limit)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return {**self._cache[key], 'cached': True}
+            self.misses += 1
+
+        start = time.perf_counter()
+        try:
+            cursor.execute(sql)
+            rows = cursor.fetchmany(limit + 1)
+        except duckdb.Error as e:
+            raise QueryError(str(e).splitlines()[0])
+        result = {
+            'columns': [column[0] for column in cursor.description],
+            'rows': [[_jsonable(value) for value in row] for row in rows[:limit]],
+            'row_count': min(len(rows), limit),
+            'truncated': len(rows) > limit,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 2),
+        }
+
+        if self.cache_size > 0:
+            with self._lock:
+                # Not cached if the sources changed while it ran
+                if signature == self._signature:
+                    self._cache[key] = result
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        return {**result, 'cached': False}
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+
+
+# ============================================================================
+# CLI / REPL
+# ============================================================================
+
+def _print_frame(df: pd.DataFrame, fmt: str) -> None:
+    if fmt == 'csv':
+        df.to_csv(sys.stdout, index=False)
+    elif fmt == 'json':
+        print(df.to_json(orient='records', force_ascii=False, indent=2))
+    else:
+        with pd.option_context('display.max_rows', 200, 'display.max_columns', None, 'display.width', 200):
+            print(df.to_string(index=False) if len(df) else '(no rows)')
+
+
+def repl(engine: QueryEngine, fmt: str = 'table') -> None:
+    """Interactive prompt; statements end with ';'. Commands: .views, .schema NAME, .quit"""
+    print(f"Views: {', '.join(engine.views())}")
+    print("End statements with ';'. Commands: .views  .schema NAME  .quit")
+    buffer = []
+    while True:
+        try:
+            line = input('sql> ' if not buffer else '...> ')
+        except (EOFError, KeyboardInterrupt):
+            print()
+            return
+        command = line.strip()
+        if not buffer and command.startswith('.'):
+            name, _, arg = command.partition(' ')
+            if name in ('.quit', '.exit'):
+                return
+            if name == '.views':
+                print('\n'.join(engine.views()))
+            elif name == '.schema' and arg:
+                _run(engine, f'DESCRIBE {arg}', fmt)
+            else:
+                print("Commands: .views  .schema NAME  .quit")
+            continue
+        buffer.append(line)
+        if command.endswith(';'):
+            _run(engine, '\n'.join(buffer), fmt)
+            buffer = []
+
+
+def _run(engine: QueryEngine, sql: str, fmt: str) -> bool:
+    start = time.perf_counter()
+    try:
+        df = engine.query(sql)
+    except QueryError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return False
+    _print_frame(df, fmt)
+    if fmt == 'table':
+        print(f"({len(df)} rows, {(time.perf_counter() - start) * 1000:.1f} ms)", file=sys.stderr)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ad hoc SQL over the processed electoral data')
+    parser.add_argument('sql', nargs='?', help='Query to run (omit for an interactive prompt)')
+    parser.add_argument('--format', choices=['table', 'csv', 'json'], default='table')
+    parser.add_argument('--csv', type=Path, default=settings.CLEAN_CSV, help='Processed results file')
+    parser.add_argument('--database', type=Path, default=settings.DATABASE_FILE)
+    args = parser.parse_args()
+
+    engine = QueryEngine(csv=args.csv, database=args.database, cache_size=0)
+    try:
+        if args.sql:
+            sys.exit(0 if _run(engine, args.sql, args.format) else 1)
+        repl(engine, args.format)
+    finally:
+        engine.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Execution backends for the analysis queries.
+
+The same operations (normalize, group totals, shares, winners, pivots)
+run on pandas (default, in memory), Polars (lazy, multi-threaded) or
+DuckDB (out-of-core SQL over Parquet/CSV). The backend is chosen with
+settings.ANALYSIS_BACKEND (env ANALYSIS_BACKEND) or per call:
+
+    from src.backends import get_backend
+    get_backend('duckdb').winners(settings.MESA_PARQUET)
+
+The ETL transforms (src.etl.transform) stay on pandas: the workbooks are
+read into memory anyway, and the streaming path normalizes bounded chunks.
+Backend.normalize applies the same rules as normalize_results_chunk to a
+whole raw file, e.g. to turn a large mesa-level CSV into Parquet for the
+Polars or DuckDB queries.
+
+Polars and DuckDB are optional dependencies, imported on first use.
+"""
+from importlib import import_module
+from typing import Dict, Optional
+
+from src.config import settings
+from .base import Backend, Source, ZONE_KEYS, WINNER_COLUMNS
+
+BACKENDS = {
+    'pandas': ('.pandas_backend', 'PandasBackend'),
+    'polars': ('.polars_backend', 'PolarsBackend'),
+    'duckdb': ('.duckdb_backend', 'DuckDBBackend'),
+}
+
+_instances: Dict[str, Backend] = {}
+
+
+def get_backend(backend=None, **options) -> Backend:
+    """
+    Backend instance by name (default: settings.ANALYSIS_BACKEND).
+
+    Instances without options are shared; passing a Backend returns it
+    unchanged, so functions can accept either a name or an instance.
+    """
+    if isinstance(backend, Backend):
+        return backend
+    name = (backend or settings.ANALYSIS_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}' (choose from {', '.join(BACKENDS)})")
+
+    if options or name not in _instances:
+        module, cls = BACKENDS[name]
+        instance = getattr(import_module(module, __name__), cls)(**options)
+        if options:
+            return instance
+        _instances[name] = instance
+    return _instances[name]
+
+
+__all__ = ['Backend', 'BACKENDS', 'Source', 'WINNER_COLUMNS', 'ZONE_KEYS', 'get_backend']
@@ -0,0 +1,105 @@
+"""
+Backend contract for the common electoral operations.
+
+Every backend takes a `source` that is either a pandas DataFrame or a path
+to a Parquet/CSV file, and returns small results as pandas DataFrames, so
+callers never depend on the engine that ran the query. Paths let Polars
+and DuckDB scan the file lazily instead of materializing it in pandas.
+"""
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Union
+
+import pandas as pd
+
+from src.etl.utils import COLUMN_MAPPING, get_party_normalization, get_seccional_mapping
+
+Source = Union[pd.DataFrame, str, Path]
+Filters = Optional[Dict[str, object]]
+
+ZONE_KEYS = ('anio', 'seccional')
+RESULT_COLUMNS = ['anio', 'cargo', 'seccional', 'agrupacion', 'votos']
+MESA_COLUMNS = ['anio', 'cargo', 'seccional', 'circuito', 'mesa', 'agrupacion', 'votos']
+
+WINNER_COLUMNS = ['agrupacion', 'votos', 'total_votos', 'porcentaje', 'segundo', 'segundo_votos', 'margen_pct']
+
+
+def source_format(source: Source) -> str:
+    """'frame', 'parquet' or 'csv'."""
+    if isinstance(source, pd.DataFrame):
+        return 'frame'
+    suffix = Path(source).suffix.lower()
+    if suffix in ('.parquet', '.pq'):
+        return 'parquet'
+    if suffix == '.csv':
+        return 'csv'
+    raise ValueError(f"Unsupported source: {source} (expected a DataFrame, .parquet or .csv)")
+
+
+def normalized_column_names(columns: Iterable[str]) -> Dict[str, str]:
+    """Rename map from raw to normalized names (same rules as utils.normalize_columns)."""
+    rename = {}
+    for col in columns:
+        name = str(col).strip()
+        if name in COLUMN_MAPPING:
+            rename[col] = COLUMN_MAPPING[name]
+        elif 'a' in name and 'o' in name:  # Likely año with encoding issues
+            rename[col] = 'anio'
+    return rename
+
+
+def filter_items(filters: Filters):
+    """(column, values, is_list) triples for a filter dict, skipping None values."""
+    for column, value in (filters or {}).items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            yield column, list(value), True
+        else:
+            yield column, value, False
+
+
+class Backend(ABC):
+    """
+    Engine-neutral operations used by the analysis.
+
+    Subclasses implement the five operations; all return pandas objects
+    sorted by their key columns.
+    """
+
+    name = ''
+
+    def mappings(self, seccional_mapping=None, party_mapping=None):
+        """Default normalization mappings from data/mappings."""
+        return (
+            get_seccional_mapping() if seccional_mapping is None else seccional_mapping,
+            get_party_normalization() if party_mapping is None else party_mapping,
+        )
+
+    @abstractmethod
+    def normalize(self, source: Source, seccional_mapping=None, party_mapping=None,
+                  output: Optional[Path] = None) -> Union[pd.DataFrame, Path]:
+        """
+        Normalize raw results (columns, seccional names, party names, votes).
+
+        Same rules as transform.normalize_results_chunk. With `output`, the
+        result is written there as Parquet and the path is returned.
+        """
+
+    @abstractmethod
+    def group_totals(self, source: Source, by: Sequence[str], value: str = 'votos',
+                     filters: Filters = None) -> pd.DataFrame:
+        """Sum of `value` per `by` group."""
+
+    @abstractmethod
+    def shares(self, source: Source, by: Sequence[str] = ZONE_KEYS, filters: Filters = None) -> pd.DataFrame:
+        """Votes, group total and percentage per (`by`, agrupacion), by votes descending."""
+
+    @abstractmethod
+    def winners(self, source: Source, by: Sequence[str] = ZONE_KEYS, filters: Filters = None) -> pd.DataFrame:
+        """Winner, runner-up and margin per `by` group (`by` + WINNER_COLUMNS)."""
+
+    @abstractmethod
+    def pivot(self, source: Source, index: str, columns: str, value: str = 'votos',
+              filters: Filters = None) -> pd.DataFrame:
+        """Sum of `value` with `index` rows and one column per `columns` value (missing = 0)."""
@@ -0,0 +1,192 @@
+"""
+DuckDB backend: out-of-core SQL over Parquet and CSV files.
+
+Path sources are queried in place with read_parquet / read_csv_auto, and
+aggregations spill to disk when they exceed memory_limit, so the results
+can be much larger than RAM. DataFrame sources are registered as views
+(zero-copy through Arrow). Requires `duckdb` (optional dependency).
+"""
+import itertools
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+from src.config import settings
+from .base import ZONE_KEYS, WINNER_COLUMNS, Backend, Source, filter_items, normalized_column_names, source_format
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - optional dependency
+    duckdb = None
+
+_view_ids = itertools.count()
+
+
+def _ident(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _columns(names) -> str:
+    return ', '.join(_ident(name) for name in names)
+
+
+class DuckDBBackend(Backend):
+    """
+    Args:
+        database: DuckDB database file (default: in-memory)
+        memory_limit: e.g. '2GB'; larger aggregations spill to temp_directory
+        temp_directory: Spill directory for out-of-core operators
+        threads: Worker threads (default: all cores)
+    """
+
+    name = 'duckdb'
+
+    def __init__(self, database: str = ':memory:', memory_limit: Optional[str] = settings.DUCKDB_MEMORY_LIMIT,
+                 temp_directory: Optional[Path] = settings.DUCKDB_TEMP_DIR, threads: Optional[int] = None):
+        if duckdb is None:
+            raise ImportError("The duckdb backend requires duckdb: pip install duckdb")
+        self.conn = duckdb.connect(database)
+        if memory_limit:
+            self.conn.execute(f"SET memory_limit = '{memory_limit}'")
+        if temp_directory:
+            self.conn.execute(f"SET temp_directory = '{Path(temp_directory)}'")
+        if threads:
+            self.conn.execute(f'SET threads = {int(threads)}')
+
+    @contextmanager
+    def relation(self, source: Source) -> Iterator[str]:
+        """SQL table expression for a source; DataFrames are registered for the block."""
+        kind = source_format(source)
+        if kind == 'parquet':
+            yield f"read_parquet('{Path(source)}')"
+        elif kind == 'csv':
+            yield f"read_csv_auto('{Path(source)}')"
+        else:
+            view = f'_source_{next(_view_ids)}'
+            self.conn.register(view, source)
+            try:
+                yield view
+            finally:
+                self.conn.unregister(view)
+
+    def _where(self, filters) -> tuple:
+        clauses, params = [], []
+        for column, value, is_list in filter_items(filters):
+            if is_list:
+                clauses.append(f"{_ident(column)} IN ({', '.join('?' * len(value))})")
+                params.extend(value)
+            else:
+                clauses.append(f'{_ident(column)} = ?')
+                params.append(value)
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def query(self, sql: str, params: Optional[List] = None) -> pd.DataFrame:
+        return self.conn.execute(sql, params or []).df()
+
+    def normalize(self, source, seccional_mapping=None, party_mapping=None, output: Optional[Path] = None):
+        seccional_mapping, party_mapping = self.mappings(seccional_mapping, party_mapping)
+        self.conn.register('_seccional_mapping', pd.DataFrame(
+            {'name': list(seccional_mapping), 'seccional': list(seccional_mapping.values())}, dtype=object))
+        self.conn.register('_party_mapping', pd.DataFrame(
+            {'name': list(party_mapping), 'agrupacion': list(party_mapping.values())}, dtype=object))
+
+        with self.relation(source) as rel:
+            names = [row[0] for row in self.conn.execute(f'DESCRIBE SELECT * FROM {rel}').fetchall()]
+            rename = normalized_column_names(names)
+            col = {rename.get(name, name): _ident(name) for name in names}
+            mesa_level = 'mesa' in col
+
+            required = ['anio', 'cargo', 'seccional', 'agrupacion', 'votos'] + (['circuito', 'mesa'] if mesa_level else [])
+            missing = [name for name in required if name not in col]
+            if missing:
+                raise ValueError(f"Missing columns {missing} in results source")
+
+            mesa_select = (
+                f"upper(trim(coalesce(CAST(r.{col['circuito']} AS VARCHAR), ''))) AS circuito, "
+                f"trim(coalesce(CAST(r.{col['mesa']} AS VARCHAR), '')) AS mesa, "
+                if mesa_level else ''
+            )
+            sql = f"""
+                WITH r AS (
+                    SELECT *, trim(CAST({col['seccional']} AS VARCHAR)) AS _seccional,
+                              trim(CAST({col['agrupacion']} AS VARCHAR)) AS _agrupacion
+                    FROM {rel}
+                )
+                SELECT TRY_CAST(r.{col['anio']} AS BIGINT) AS anio,
+                       trim(CAST(r.{col['cargo']} AS VARCHAR)) AS cargo,
+                       coalesce(s.seccional, CASE WHEN regexp_full_match(r._seccional, '\\d+')
+                                                  THEN ltrim(r._seccional, '0') END) AS seccional,
+                       {mesa_select}
+                       coalesce(p.agrupacion, r._agrupacion) AS agrupacion,
+                       TRY_CAST(TRY_CAST(r.{col['votos']} AS DOUBLE) AS BIGINT) AS votos
+                FROM r
+                LEFT JOIN _seccional_mapping s ON s.name = r._seccional
+                LEFT JOIN _party_mapping p ON p.name = r._agrupacion
+            """
+            sql = f'SELECT * FROM ({sql}) WHERE anio IS NOT NULL AND seccional IS NOT NULL AND votos IS NOT NULL'
+
+            if output is None:
+                return self.query(sql)
+            output = Path(output)
+            output.parent.mkdir(parents=True, exist_ok=True)
+            self.conn.execute(f"COPY ({sql}) TO '{output}' (FORMAT PARQUET)")
+            return output
+
+    def _sum(self, rel: str, value: str) -> str:
+        # sum() of integers is HUGEINT, which pandas would receive as float
+        kind = self.conn.execute(f'SELECT typeof({_ident(value)}) FROM {rel} LIMIT 1').fetchone()
+        total = f'sum({_ident(value)})'
+        return f'CAST({total} AS BIGINT)' if kind and 'INT' in kind[0] else total
+
+    def group_totals(self, source, by, value='votos', filters=None):
+        where, params = self._where(filters)
+        keys = _columns(by)
+        with self.relation(source) as rel:
+            return self.query(
+                f'SELECT {keys}, {self._sum(rel, value)} AS {_ident(value)} FROM {rel}{where} '
+                f'GROUP BY {keys} ORDER BY {keys}', params)
+
+    def _shares_sql(self, rel: str, by, where: str) -> str:
+        keys = _columns(by)
+        return f"""
+            SELECT {keys}, agrupacion, votos, total_votos,
+                   round(votos * 100.0 / total_votos, 2) AS porcentaje,
+                   row_number() OVER (PARTITION BY {keys} ORDER BY votos DESC, agrupacion) - 1 AS _rank
+            FROM (
+                SELECT {keys}, agrupacion, CAST(sum(votos) AS BIGINT) AS votos,
+                       CAST(sum(sum(votos)) OVER (PARTITION BY {keys}) AS BIGINT) AS total_votos
+                FROM {rel}{where}
+                GROUP BY {keys}, agrupacion
+            )
+        """
+
+    def shares(self, source, by=ZONE_KEYS, filters=None):
+        where, params = self._where(filters)
+        with self.relation(source) as rel:
+            df = self.query(
+                f'SELECT * EXCLUDE (_rank) FROM ({self._shares_sql(rel, by, where)}) '
+                f'ORDER BY {_columns(by)}, votos DESC, agrupacion', params)
+        return df
+
+    def winners(self, source, by=ZONE_KEYS, filters=None):
+        where, params = self._where(filters)
+        keys = ', '.join(f'f.{_ident(name)}' for name in by)
+        on = ' AND '.join(f's.{_ident(name)} = f.{_ident(name)}' for name in by)
+        with self.relation(source) as rel:
+            df = self.query(f"""
+                WITH ranked AS ({self._shares_sql(rel, by, where)})
+                SELECT {keys}, f.agrupacion, f.votos, f.total_votos, f.porcentaje,
+                       s.agrupacion AS segundo, s.votos AS segundo_votos,
+                       round(f.porcentaje - coalesce(s.porcentaje, 0), 2) AS margen_pct
+                FROM ranked f
+                LEFT JOIN ranked s ON {on} AND s._rank = 1
+                WHERE f._rank = 0
+                ORDER BY {keys}
+            """, params)
+        return df[list(by) + WINNER_COLUMNS]
+
+    def pivot(self, source, index, columns, value='votos', filters=None):
+        totals = self.group_totals(source, [index, columns], value, filters)
+        return totals.pivot(index=index, columns=columns, values=value).fillna(0)
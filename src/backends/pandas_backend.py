@@ -0,0 +1,73 @@
+"""
+In-memory pandas backend (the default).
+"""
+from pathlib import Path
+from typing import Optional, Sequence
+
+import pandas as pd
+
+from .base import ZONE_KEYS, WINNER_COLUMNS, Backend, Filters, Source, filter_items, source_format
+
+
+def winners_from_shares(shares: pd.DataFrame, by: Sequence[str]) -> pd.DataFrame:
+    """Winner and runner-up rows of a shares() result (sorted by votes descending)."""
+    by = list(by)
+    ranked = shares.assign(_rank=shares.groupby(by, sort=False).cumcount())
+    first = ranked[ranked['_rank'] == 0]
+    second = ranked.loc[ranked['_rank'] == 1, by + ['agrupacion', 'votos', 'porcentaje']].rename(
+        columns={'agrupacion': 'segundo', 'votos': 'segundo_votos', 'porcentaje': '_segundo_pct'})
+
+    out = first.merge(second, on=by, how='left')
+    out['margen_pct'] = (out['porcentaje'] - out['_segundo_pct'].fillna(0)).round(2)
+    return out[by + WINNER_COLUMNS].sort_values(by).reset_index(drop=True)
+
+
+class PandasBackend(Backend):
+    """Reads sources fully into memory and uses pandas groupby."""
+
+    name = 'pandas'
+
+    def frame(self, source: Source, filters: Filters = None) -> pd.DataFrame:
+        kind = source_format(source)
+        if kind == 'parquet':
+            df = pd.read_parquet(source)
+        elif kind == 'csv':
+            df = pd.read_csv(source)
+        else:
+            df = source
+
+        for column, value, is_list in filter_items(filters):
+            df = df[df[column].isin(value)] if is_list else df[df[column] == value]
+        return df
+
+    def normalize(self, source, seccional_mapping=None, party_mapping=None, output: Optional[Path] = None):
+        from src.etl.transform import normalize_results_chunk
+
+        seccional_mapping, party_mapping = self.mappings(seccional_mapping, party_mapping)
+        df = normalize_results_chunk(self.frame(source).copy(), seccional_mapping, party_mapping)
+        df = df.reset_index(drop=True)
+        if output is None:
+            return df
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(output, index=False)
+        return output
+
+    def group_totals(self, source, by, value='votos', filters=None):
+        df = self.frame(source, filters)
+        return df.groupby(list(by), sort=True)[value].sum().reset_index()
+
+    def shares(self, source, by=ZONE_KEYS, filters=None):
+        by = list(by)
+        out = self.group_totals(source, by + ['agrupacion'], filters=filters)
+        out['total_votos'] = out.groupby(by)['votos'].transform('sum')
+        out['porcentaje'] = (out['votos'] / out['total_votos'] * 100).round(2)
+        return out.sort_values(by + ['votos', 'agrupacion'], ascending=[True] * len(by) + [False, True],
+                               kind='stable').reset_index(drop=True)
+
+    def winners(self, source, by=ZONE_KEYS, filters=None):
+        return winners_from_shares(self.shares(source, by, filters), by)
+
+    def pivot(self, source, index, columns, value='votos', filters=None):
+        totals = self.group_totals(source, [index, columns], value, filters)
+        return totals.pivot(index=index, columns=columns, values=value).fillna(0)
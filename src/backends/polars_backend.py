@@ -0,0 +1,128 @@
+"""
+Polars backend: lazy, multi-threaded queries.
+
+Path sources are scanned lazily (scan_parquet / scan_csv), so filters and
+column selection are pushed down into the reader and only the aggregated
+result is materialized. Polars uses all cores by default; set
+POLARS_MAX_THREADS to limit it. Requires `polars` (optional dependency).
+"""
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from .base import ZONE_KEYS, WINNER_COLUMNS, Backend, Source, filter_items, normalized_column_names, source_format
+
+try:
+    import polars as pl
+except ImportError:  # pragma: no cover - optional dependency
+    pl = None
+
+
+class PolarsBackend(Backend):
+    """
+    Args:
+        streaming: Run queries on the streaming engine (bounded memory for
+            sources larger than RAM) instead of the in-memory one
+    """
+
+    name = 'polars'
+
+    def __init__(self, streaming: bool = True):
+        if pl is None:
+            raise ImportError("The polars backend requires polars: pip install polars")
+        self.streaming = streaming
+
+    def scan(self, source: Source, filters=None) -> 'pl.LazyFrame':
+        kind = source_format(source)
+        if kind == 'parquet':
+            lf = pl.scan_parquet(source)
+        elif kind == 'csv':
+            lf = pl.scan_csv(source)
+        else:
+            lf = pl.from_pandas(source).lazy()
+
+        for column, value, is_list in filter_items(filters):
+            lf = lf.filter(pl.col(column).is_in(value) if is_list else pl.col(column) == value)
+        return lf
+
+    def collect(self, lf: 'pl.LazyFrame') -> pd.DataFrame:
+        return lf.collect(engine='streaming' if self.streaming else 'auto').to_pandas()
+
+    def normalize(self, source, seccional_mapping=None, party_mapping=None, output: Optional[Path] = None):
+        seccional_mapping, party_mapping = self.mappings(seccional_mapping, party_mapping)
+        lf = self.scan(source)
+        lf = lf.rename(normalized_column_names(lf.collect_schema().names()))
+        names = lf.collect_schema().names()
+        mesa_level = 'mesa' in names
+
+        columns = ['anio', 'cargo', 'seccional'] + (['circuito', 'mesa'] if mesa_level else []) + ['agrupacion', 'votos']
+        missing = [col for col in columns if col not in names]
+        if missing:
+            raise ValueError(f"Missing columns {missing} in results source")
+
+        seccional = pl.col('seccional').cast(pl.Utf8).str.strip_chars()
+        numeric = pl.when(seccional.str.contains(r'^\d+$')).then(seccional.str.strip_chars_start('0'))
+        mapped = seccional.replace_strict(seccional_mapping, default=None, return_dtype=pl.Utf8)
+        agrupacion = pl.col('agrupacion').cast(pl.Utf8).str.strip_chars()
+
+        exprs = [
+            pl.col('anio').cast(pl.Int64, strict=False),
+            pl.col('cargo').cast(pl.Utf8).str.strip_chars(),
+            pl.coalesce(mapped, numeric).alias('seccional'),
+        ]
+        if mesa_level:
+            exprs += [
+                pl.col('circuito').cast(pl.Utf8).fill_null('').str.strip_chars().str.to_uppercase(),
+                pl.col('mesa').cast(pl.Utf8).fill_null('').str.strip_chars(),
+            ]
+        exprs += [
+            agrupacion.replace(party_mapping).alias('agrupacion'),
+            pl.col('votos').cast(pl.Float64, strict=False).cast(pl.Int64, strict=False),
+        ]
+        lf = lf.select(exprs).drop_nulls(['anio', 'seccional', 'votos'])
+
+        if output is None:
+            return self.collect(lf)
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        lf.sink_parquet(output)
+        return output
+
+    def _totals(self, source, by, value='votos', filters=None) -> 'pl.LazyFrame':
+        return self.scan(source, filters).group_by(list(by)).agg(pl.col(value).sum())
+
+    def group_totals(self, source, by, value='votos', filters=None):
+        return self.collect(self._totals(source, by, value, filters).sort(list(by)))
+
+    def _shares(self, source, by, filters) -> 'pl.LazyFrame':
+        by = list(by)
+        return (
+            self._totals(source, by + ['agrupacion'], filters=filters)
+            .with_columns(pl.col('votos').sum().over(by).alias('total_votos'))
+            .with_columns((pl.col('votos') / pl.col('total_votos') * 100).round(2).alias('porcentaje'))
+            .sort(by + ['votos', 'agrupacion'], descending=[False] * len(by) + [True, False])
+        )
+
+    def shares(self, source, by=ZONE_KEYS, filters=None):
+        return self.collect(self._shares(source, by, filters))
+
+    def winners(self, source, by=ZONE_KEYS, filters=None):
+        by = list(by)
+        ranked = self._shares(source, by, filters).with_columns(
+            pl.int_range(pl.len()).over(by).alias('_rank'))
+        first = ranked.filter(pl.col('_rank') == 0)
+        second = ranked.filter(pl.col('_rank') == 1).select(
+            by + [pl.col('agrupacion').alias('segundo'), pl.col('votos').alias('segundo_votos'),
+                  pl.col('porcentaje').alias('_segundo_pct')])
+        out = (
+            first.join(second, on=by, how='left')
+            .with_columns((pl.col('porcentaje') - pl.col('_segundo_pct').fill_null(0)).round(2).alias('margen_pct'))
+            .select(by + WINNER_COLUMNS)
+            .sort(by)
+        )
+        return self.collect(out)
+
+    def pivot(self, source, index, columns, value='votos', filters=None):
+        totals = self.group_totals(source, [index, columns], value, filters)
+        return totals.pivot(index=index, columns=columns, values=value).fillna(0)
@@ -18,6 +18,7 @@ OUTPUT_DIR = BASE_DIR / 'outputs'
 MAPS_DIR = OUTPUT_DIR / 'maps'
 REPORTS_DIR = OUTPUT_DIR / 'reports'
 FIGURES_DIR = OUTPUT_DIR / 'figures'
+ANALYSIS_DIR = OUTPUT_DIR / 'analysis'
 
 # Ensure output directories exist
 MAPS_DIR.mkdir(parents=True, exist_ok=True)
@@ -34,6 +35,9 @@ GEOJSON_FILE = RAW_DATA_DIR / 'Seccionales_Circuitos.geojson'
 CLEAN_CSV = PROCESSED_DATA_DIR / 'electoral_data_clean.csv'
 SECCIONALES_GEOJSON = PROCESSED_DATA_DIR / 'seccionales_geo.geojson'
 DATABASE_FILE = PROCESSED_DATA_DIR / 'electoral_database.db'
+SECCIONALES_TOPOJSON = PROCESSED_DATA_DIR / 'seccionales_geo.topojson'
+SECCIONALES_FLATGEOBUF = PROCESSED_DATA_DIR / 'seccionales_geo.fgb'
+MESA_PARQUET = PROCESSED_DATA_DIR / 'resultados_mesa.parquet'
 
 # Mapping files
 SECCIONAL_MAPPING_FILE = MAPPINGS_DIR / 'seccional_names.json'
@@ -44,8 +48,83 @@ PARTY_NORMALIZATION_FILE = MAPPINGS_DIR / 'party_normalization.json'
 CORDOBA_CENTER = [-31.4201, -64.1888]
 DEFAULT_ZOOM = 12
 
+# Geometry encoding settings
+GEOJSON_PRECISION = 6  # Decimals kept in GeoJSON output (None = full precision)
+TOPOJSON_QUANTIZATION = 100_000  # Grid size per axis for TopoJSON output
+GEOMETRY_ENCODINGS = ['geojson', 'topojson']  # Also: 'flatgeobuf'
+COVERAGE_GAP_WIDTH = 1e-5  # Gaps between circuits narrower than this (degrees, ~1 m) are closed
+COVERAGE_CACHE_DIR = PROCESSED_DATA_DIR / '.coverage_cache'  # Repaired circuit coverages by hash
+
+# Streaming ingestion settings
+STREAM_CHUNK_ROWS = 50_000  # Rows per chunk when reading mesa-level sources
+
+# Execution backend for transforms and analysis: 'pandas', 'polars' or 'duckdb'
+ANALYSIS_BACKEND = os.environ.get('ANALYSIS_BACKEND', 'pandas')
+DUCKDB_MEMORY_LIMIT = os.environ.get('DUCKDB_MEMORY_LIMIT')  # e.g. '2GB' (None = DuckDB default)
+DUCKDB_TEMP_DIR = PROCESSED_DATA_DIR / '.duckdb_tmp'  # Spill directory for out-of-core queries
+
+# Spatial statistics (src/analysis/spatial.py)
+SPATIAL_PERMUTATIONS = 999  # Random permutations for Moran's I pseudo p-values
+SPATIAL_WORKERS = None  # Processes for permutation tests (None = CPU count)
+
+# Zone clustering (src/analysis/clustering.py)
+CLUSTER_KS = list(range(2, 9))  # Numbers of clusters tried in a sweep
+CLUSTER_SEEDS = 5  # k-means restarts (seeds) per k
+CLUSTER_WORKERS = None  # Processes for the sweep (None = CPU count)
+CLUSTER_MINIBATCH_ROWS = 10_000  # Above this many zones: MiniBatchKMeans and a k-NN Ward graph
+CLUSTER_SILHOUETTE_SAMPLE = 2_000  # Zones sampled for the silhouette score
+CLUSTER_CACHE_DIR = PROCESSED_DATA_DIR / '.cluster_cache'  # Fitted sweeps by data version
+CLUSTER_CACHE_ENTRIES = 8  # Sweeps kept in memory and on disk (least recently used dropped)
+
+# Vote transfers / ecological inference (src/analysis/transfers.py)
+TRANSFER_MIN_SHARE = 0.02  # Parties under this share of a year's vote are merged into OTROS
+TRANSFER_RIDGE = 1e-3  # Shrinkage towards citywide shares (relative to the mean zone weight)
+TRANSFER_BOOTSTRAP = 500  # Zone-resampling replicates for the confidence intervals
+TRANSFER_MAX_ITER = 5_000  # Solver iterations
+TRANSFER_WORKERS = None  # Processes for the bootstrap (None = CPU count)
+TRANSFER_CACHE_DIR = PROCESSED_DATA_DIR / '.transfer_cache'  # Estimates by input hash
+
+# Seat allocation and simulation (src/analysis/seats.py)
+SEATS_BY_YEAR = {2021: 9, 2023: 9, 2025: 9}  # Diputados nacionales elected by Córdoba
+DHONDT_THRESHOLD = 0.03  # Minimum share of the valid vote to win seats
+SEAT_SIMULATIONS = 100_000  # Monte Carlo elections per run
+SEAT_SIM_CHUNK = 10_000  # Simulations per worker task
+SEAT_ZONE_NOISE = 0.5  # Zone-level noise relative to the citywide noise
+SEAT_WORKERS = None  # Processes for the simulation (None = CPU count)
+
 # Electoral years
 YEARS = [2021, 2023, 2025]
 
+# Live election-night ingestion (src/etl/live.py)
+LIVE_DIR = PROCESSED_DATA_DIR / 'live'  # Published snapshot, state file and checkpoints
+LIVE_YEAR = int(os.environ.get('LIVE_YEAR', max(YEARS)))  # Election being counted
+LIVE_CARGO = 'DIPUTADOS NACIONALES'
+LIVE_POLL_SECONDS = 1.0  # Drop directory / endpoint polling interval
+LIVE_CHECKPOINT_SECONDS = 30.0  # Minimum time between checkpoints (also written on exit)
+LIVE_MAX_MESA_VOTES = 1_000  # Batches with a mesa above this total are rejected
+LIVE_ENABLED = os.environ.get('LIVE_ENABLED', 'false').lower() == 'true'  # Dashboards push live updates
+LIVE_STREAM_PATH = '/live/stream'  # Server-Sent Events route on the dashboard server
+LIVE_PUSH_HEARTBEAT = 15.0  # Seconds between keep-alive comments on idle streams
+LIVE_PUSH_HISTORY = 64  # Messages kept for streams catching up (older: full snapshot)
+
 # Database settings
 DB_ECHO = False  # Set to True for SQL debugging
+
+# Read API settings
+API_HOST = os.environ.get('API_HOST', '127.0.0.1')
+API_PORT = int(os.environ.get('API_PORT', 8060))
+API_POOL_SIZE = 4  # Read-only SQLite connections (and worker threads)
+API_DEFAULT_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+
+# Ad hoc SQL settings (src.api.sql, /query endpoint)
+QUERY_CACHE_SIZE = 128  # Cached query results
+QUERY_MAX_ROWS = 10_000  # Row cap per /query response
+
+# Dashboard instrumentation settings
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_PATH = '/metrics'  # Prometheus text exposition endpoint
+METRICS_JSON_LOGS = os.environ.get('METRICS_JSON_LOGS', 'false').lower() == 'true'
+PROFILE_SLOW_MS = float(os.environ.get('PROFILE_SLOW_MS', 0))  # 0 = profiler off
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0.1))  # Share of requests profiled
+PROFILES_DIR = OUTPUT_DIR / 'profiles'
@@ -1,17 +1,31 @@
 """
 Main ETL pipeline execution.
 Run with: python -m src.etl
+Stream mesa-level sources with: python -m src.etl --stream FILE [FILE ...]
+Profile stages with: python -m src.etl --report [PATH] [--flamegraph PATH]
 """
+import argparse
 import sys
 import io
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
 
 # Fix encoding for Windows console
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-from .extract import extract_all
-from .transform import transform_electoral_data, transform_geojson, calculate_percentages
-from .load import load_all
+import pandas as pd
+
+from src.config import settings
+from src.monitoring.pipeline import PipelineRun, stage
+from .extract import extract_all, extract_geojson, iter_result_chunks
+from .transform import (
+    transform_electoral_data, transform_geojson, calculate_percentages,
+    normalize_results_chunk, StreamingAggregator,
+)
+from .load import load_all, load_to_csv, load_to_database, MesaResultsWriter
+from .utils import get_seccional_mapping, get_party_normalization
 
 
 def run_etl_pipeline():
@@ -22,17 +36,23 @@ def run_etl_pipeline():
 
     # Extract
     print("\n[1/3] EXTRACT")
-    electoral_dfs, geo_df = extract_all()
+    with stage('extract'):
+        electoral_dfs, geo_df = extract_all()
 
     # Transform
     print("\n[2/3] TRANSFORM")
-    clean_df = transform_electoral_data(electoral_dfs)
-    clean_df = calculate_percentages(clean_df)
-    geo_seccionales = transform_geojson(geo_df)
+    with stage('transform'):
+        with stage('electoral', rows=sum(len(df) for df in electoral_dfs)):
+            clean_df = transform_electoral_data(electoral_dfs)
+        with stage('percentages', rows=len(clean_df)):
+            clean_df = calculate_percentages(clean_df)
+        with stage('geometry', rows=len(geo_df)):
+            geo_seccionales = transform_geojson(geo_df)
 
     # Load
     print("\n[3/3] LOAD")
-    load_all(clean_df, geo_seccionales)
+    with stage('load', rows=len(clean_df)):
+        load_all(clean_df, geo_seccionales)
 
     print("\n" + "=" * 60)
     print("ETL Pipeline Completed Successfully!")
@@ -50,5 +70,121 @@ def run_etl_pipeline():
         print(f"  - {party}: {votes:,} votos")
 
 
+def run_streaming_pipeline(paths: List[Path], chunksize: int = settings.STREAM_CHUNK_ROWS) -> pd.DataFrame:
+    """
+    Ingest large mesa- or seccional-level result files in bounded memory.
+
+    Every chunk is normalized, appended to resultados_mesa (SQLite) and the
+    Parquet store when it is mesa-level, and folded into running circuit
+    and seccional totals. The seccional totals then replace the streamed
+    years in the regular CSV and database outputs.
+
+    Args:
+        paths: Result files (.csv, .xlsx, .xls)
+        chunksize: Rows per chunk
+
+    Returns:
+        Seccional-level results for the streamed years
+    """
+    print("=" * 60)
+    print("Starting Streaming ETL Pipeline")
+    print("=" * 60)
+
+    seccional_mapping = get_seccional_mapping()
+    party_mapping = get_party_normalization()
+    aggregator = StreamingAggregator()
+
+    print("\n[1/3] STREAM")
+    with stage('stream') as stream_stage, MesaResultsWriter() as writer:
+        for path in paths:
+            print(f"  Reading {path}...")
+            with stage(Path(path).name) as file_stage:
+                start_rows = aggregator.rows
+                for raw in iter_result_chunks(path, chunksize):
+                    chunk = normalize_results_chunk(raw, seccional_mapping, party_mapping)
+                    if 'mesa' in chunk.columns:
+                        writer.write(chunk)
+                    aggregator.update(chunk)
+                    print(f"    {aggregator.rows:,} rows", end='\r')
+                file_stage.rows = aggregator.rows - start_rows
+            print()
+        with stage('circuit_totals'):
+            writer.write_circuit_totals(aggregator.circuito_results())
+        stream_stage.rows = aggregator.rows
+    print(f"[OK] Streamed {aggregator.rows:,} rows ({writer.rows_written:,} mesa rows stored)")
+
+    print("\n[2/3] TRANSFORM")
+    with stage('transform'):
+        streamed = calculate_percentages(aggregator.seccional_results())
+
+    # Keep the years that were not part of this stream
+    if settings.CLEAN_CSV.exists():
+        existing = pd.read_csv(settings.CLEAN_CSV, dtype={'seccional': str})
+        existing = existing[~existing['anio'].isin(streamed['anio'].unique())]
+        combined = pd.concat([existing, streamed], ignore_index=True)
+    else:
+        combined = streamed
+
+    print("\n[3/3] LOAD")
+    with stage('load', rows=len(streamed)):
+        load_to_csv(combined)
+        with stage('geometry'):
+            geo_seccionales = transform_geojson(extract_geojson())
+        with stage('database'):
+            load_to_database(streamed, geo_seccionales)
+
+    print("\n" + "=" * 60)
+    print("Streaming ETL Pipeline Completed Successfully!")
+    print("=" * 60)
+
+    return streamed
+
+
+def run_profiled(pipeline, *args, report: Optional[Path] = None,
+                 flamegraph: Optional[Path] = None, **kwargs):
+    """
+    Run a pipeline function inside a PipelineRun and write its JSON report.
+
+    Args:
+        pipeline: run_etl_pipeline or run_streaming_pipeline
+        report: JSON report path (default: timestamped file in REPORTS_DIR)
+        flamegraph: Optional profile of the whole run (speedscope JSON with
+            pyinstrument, cProfile .prof otherwise)
+
+    Returns:
+        Whatever the pipeline returns
+    """
+    if report is None:
+        report = settings.REPORTS_DIR / f"etl_run_{datetime.now():%Y%m%d-%H%M%S}.json"
+
+    with PipelineRun(pipeline.__name__, flamegraph=flamegraph) as run:
+        result = pipeline(*args, **kwargs)
+
+    print("\nSTAGE PROFILE:")
+    print(run.summary())
+    print(f"\n[OK] Run report: {run.write_report(report)}")
+    if run.flamegraph:
+        print(f"[OK] Flamegraph: {run.flamegraph}")
+    return result
+
+
 if __name__ == '__main__':
-    run_etl_pipeline()
+    parser = argparse.ArgumentParser(description='Electoral ETL pipeline')
+    parser.add_argument('--stream', type=Path, nargs='+', metavar='FILE',
+                        help='Stream large mesa-level result files instead of the default workbooks')
+    parser.add_argument('--chunksize', type=int, default=settings.STREAM_CHUNK_ROWS,
+                        help='Rows per chunk in streaming mode')
+    parser.add_argument('--report', type=Path, nargs='?', const=True, default=None, metavar='PATH',
+                        help='Record stage timings/memory and write a JSON run report')
+    parser.add_argument('--flamegraph', type=Path, default=None, metavar='PATH',
+                        help='Also profile the run and write a flamegraph (implies --report)')
+    args = parser.parse_args()
+
+    pipeline, pipeline_args = (run_streaming_pipeline, (args.stream, args.chunksize)) if args.stream \
+        else (run_etl_pipeline, ())
+
+    if args.report or args.flamegraph:
+        report = args.report if isinstance(args.report, Path) else None
+        run_profiled(pipeline, *pipeline_args, report=report, flamegraph=args.flamegraph)
+    else:
+        pipeline(*pipeline_args)
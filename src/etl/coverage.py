@@ -0,0 +1,128 @@
+"""
+Coverage-aware dissolve of circuit polygons into seccionales.
+
+The circuits form a polygonal coverage: neighbours share edges and do not
+overlap. A coverage can be merged by dropping the shared edges
+(shapely.coverage_union_all), which is much cheaper than the general
+overlay union behind GeoDataFrame.dissolve. That shortcut needs a *valid*
+coverage, so the input is repaired once first:
+
+    1. invalid polygons are fixed with make_valid (polygonal parts only)
+    2. shapely.coverage_clean (Shapely >= 2.2 / GEOS >= 3.14) snaps nearby
+       vertices, resolves overlaps and closes gaps narrower than gap_width,
+       so the result has identical shared edges and no slivers
+
+Repairing is the expensive step, so its output is cached by a hash of the
+input WKB, both in memory and in settings.COVERAGE_CACHE_DIR. On older
+Shapely versions there is no cleaner; groups whose edges are not matched
+fall back to the general union.
+"""
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+from src.config import settings
+
+HAS_COVERAGE_CLEAN = hasattr(shapely, 'coverage_clean')
+
+_memory_cache: Dict[str, np.ndarray] = {}
+
+
+def coverage_key(geometries: np.ndarray, gap_width: float) -> str:
+    """Hash of the input geometries and repair parameters."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{shapely.geos_version_string}|{HAS_COVERAGE_CLEAN}|{gap_width!r}'.encode())
+    for wkb in shapely.to_wkb(geometries):
+        digest.update(wkb)
+    return digest.hexdigest()
+
+
+def _save(path: Path, geometries: np.ndarray) -> None:
+    blobs = shapely.to_wkb(geometries)
+    offsets = np.cumsum([0] + [len(blob) for blob in blobs])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(path, wkb=np.frombuffer(b''.join(blobs), dtype=np.uint8), offsets=offsets)
+
+
+def _load(path: Path) -> np.ndarray:
+    with np.load(path) as data:
+        buffer, offsets = data['wkb'].tobytes(), data['offsets']
+    return shapely.from_wkb([buffer[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])])
+
+
+def repair_coverage(geometries, gap_width: float = settings.COVERAGE_GAP_WIDTH,
+                    cache_dir: Optional[Path] = settings.COVERAGE_CACHE_DIR) -> np.ndarray:
+    """
+    Make a polygon array a valid coverage (cached by input hash).
+
+    Args:
+        geometries: Polygons of the coverage, in any order
+        gap_width: Gaps narrower than this (CRS units) are merged into a
+            neighbour; 0 keeps all gaps
+        cache_dir: Directory for the on-disk cache (None = memory only)
+
+    Returns:
+        Repaired geometries aligned with the input
+    """
+    geometries = np.asarray(geometries, dtype=object)
+    key = coverage_key(geometries, gap_width)
+    if key in _memory_cache:
+        return _memory_cache[key].copy()
+
+    path = Path(cache_dir) / f'{key}.npz' if cache_dir else None
+    if path is not None and path.exists():
+        repaired = _load(path)
+    else:
+        repaired = geometries.copy()
+        invalid = ~shapely.is_valid(repaired)
+        if invalid.any():
+            repaired[invalid] = shapely.make_valid(repaired[invalid], method='structure', keep_collapsed=False)
+        if HAS_COVERAGE_CLEAN:
+            repaired = shapely.coverage_clean(repaired, gap_width=gap_width)
+        if path is not None:
+            _save(path, repaired)
+
+    _memory_cache[key] = repaired
+    return repaired.copy()
+
+
+def dissolve_coverage(gdf: gpd.GeoDataFrame, by: str, gap_width: float = settings.COVERAGE_GAP_WIDTH,
+                      cache_dir: Optional[Path] = settings.COVERAGE_CACHE_DIR) -> gpd.GeoDataFrame:
+    """
+    Dissolve a polygonal coverage by a key column.
+
+    Equivalent to gdf.dissolve(by=by)[[by, 'geometry']] on a clean
+    coverage, but merges each group with coverage_union_all.
+
+    Args:
+        gdf: Polygons forming a coverage (e.g. circuits)
+        by: Group column (e.g. 'Seccional')
+        gap_width: See repair_coverage
+        cache_dir: See repair_coverage
+
+    Returns:
+        GeoDataFrame with one row per group (columns [by, 'geometry'])
+    """
+    geometries = repair_coverage(gdf.geometry.values, gap_width, cache_dir)
+    keys = gdf[by].to_numpy()
+    groups, codes = np.unique(keys, return_inverse=True)
+
+    # Without the cleaner, only groups whose shared edges match can skip the overlay
+    if HAS_COVERAGE_CLEAN:
+        matched = np.ones(len(groups), dtype=bool)
+    else:
+        bad_edges = ~shapely.is_empty(shapely.coverage_invalid_edges(geometries))
+        matched = np.bincount(codes, weights=bad_edges, minlength=len(groups)) == 0
+
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(groups) + 1))
+    merged = []
+    for i in range(len(groups)):
+        members = geometries[order[bounds[i]:bounds[i + 1]]]
+        merged.append(shapely.coverage_union_all(members) if matched[i] else shapely.union_all(members))
+
+    return gpd.GeoDataFrame({by: groups, 'geometry': merged}, crs=gdf.crs)
@@ -1,11 +1,14 @@
 """
 Extract module - Read raw electoral data files.
 """
+import codecs
+
 import pandas as pd
 import geopandas as gpd
 from pathlib import Path
-from typing import Tuple, List
+from typing import Iterator, Tuple, List
 from src.config import settings
+from src.monitoring.pipeline import stage
 
 
 def extract_electoral_data() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
@@ -17,26 +20,25 @@ def extract_electoral_data() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     print("[EXTRACT] Extracting electoral data...")
 
+    # Engines are inferred from the extension (xlrd for .xls, openpyxl for .xlsx)
+
     # Read 2021 data (XLS format with encoding issues)
     print("  Reading 2021 data...")
-    df_2021 = pd.read_excel(
-        settings.ELECTORAL_2021,
-        engine='xlrd'
-    )
+    with stage('workbook_2021') as s:
+        df_2021 = pd.read_excel(settings.ELECTORAL_2021)
+        s.rows = len(df_2021)
 
     # Read 2023 data (XLSX format)
     print("  Reading 2023 data...")
-    df_2023 = pd.read_excel(
-        settings.ELECTORAL_2023,
-        engine='openpyxl'
-    )
+    with stage('workbook_2023') as s:
+        df_2023 = pd.read_excel(settings.ELECTORAL_2023)
+        s.rows = len(df_2023)
 
     # Read 2025 data (XLSX format)
     print("  Reading 2025 data...")
-    df_2025 = pd.read_excel(
-        settings.ELECTORAL_2025,
-        engine='openpyxl'
-    )
+    with stage('workbook_2025') as s:
+        df_2025 = pd.read_excel(settings.ELECTORAL_2025)
+        s.rows = len(df_2025)
 
     print(f"[OK] Extracted: 2021={len(df_2021)} rows, 2023={len(df_2023)} rows, 2025={len(df_2025)} rows")
 
@@ -52,7 +54,9 @@ def extract_geojson() -> gpd.GeoDataFrame:
     """
     print("[EXTRACT] Extracting geographic data...")
 
-    gdf = gpd.read_file(settings.GEOJSON_FILE, encoding='utf-8')
+    with stage('geojson') as s:
+        gdf = gpd.read_file(settings.GEOJSON_FILE, encoding='utf-8')
+        s.rows = len(gdf)
 
     print(f"[OK] Extracted: {len(gdf)} circuit features")
 
@@ -72,6 +76,108 @@ def extract_all() -> Tuple[List[pd.DataFrame], gpd.GeoDataFrame]:
     return electoral_dfs, geo_df
 
 
+def iter_excel_chunks(path: Path, chunksize: int = settings.STREAM_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Stream an Excel workbook's first sheet in chunks of rows.
+
+    XLSX files are read with openpyxl in read-only mode, which parses the
+    sheet XML incrementally instead of loading the whole workbook. Legacy
+    XLS files have no streaming reader in xlrd and are read whole, then
+    sliced.
+
+    Args:
+        path: Workbook path (.xlsx or .xls)
+        chunksize: Rows per yielded chunk
+
+    Yields:
+        DataFrames with the header row as column names
+    """
+    path = Path(path)
+
+    if path.suffix.lower() == '.xls':
+        df = pd.read_excel(path, engine='xlrd')
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+        return
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(col).strip() if col is not None else '' for col in header]
+
+        batch = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            batch.append(row[:len(columns)])
+            if len(batch) >= chunksize:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        workbook.close()
+
+
+def csv_encoding(path: Path, blocksize: int = 1 << 20) -> str:
+    """
+    Encoding of a CSV file: UTF-8 if the whole file decodes as UTF-8, else Latin-1.
+
+    The file is checked in binary blocks before any row is parsed, so a bad
+    byte deep in the file never switches encodings mid-stream.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(path, 'rb') as f:
+        try:
+            for block in iter(lambda: f.read(blocksize), b''):
+                decoder.decode(block)
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return 'latin-1'
+    return 'utf-8'
+
+
+def iter_csv_chunks(path: Path, chunksize: int = settings.STREAM_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV file in chunks of rows.
+
+    Args:
+        path: CSV path (UTF-8, falls back to Latin-1; see csv_encoding)
+        chunksize: Rows per yielded chunk
+
+    Yields:
+        DataFrames with the CSV header as column names
+    """
+    yield from pd.read_csv(path, chunksize=chunksize, encoding=csv_encoding(path), dtype=str)
+
+
+def iter_result_chunks(path: Path, chunksize: int = settings.STREAM_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Stream a results file (mesa or seccional level) chunk by chunk.
+
+    Args:
+        path: .csv, .xlsx or .xls results file
+        chunksize: Rows per yielded chunk
+
+    Yields:
+        Raw (not yet normalized) DataFrame chunks
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+
+    if suffix == '.csv':
+        yield from iter_csv_chunks(path, chunksize)
+    elif suffix in ('.xlsx', '.xls'):
+        yield from iter_excel_chunks(path, chunksize)
+    else:
+        raise ValueError(f"Unsupported results file: {path}")
+
+
 if __name__ == '__main__':
     # Test extraction
     df_2021, df_2023, df_2025 = extract_electoral_data()
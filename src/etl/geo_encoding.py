@@ -0,0 +1,330 @@
+"""
+Compact geometry encodings for the processed seccional polygons.
+
+Supported outputs:
+- Minified GeoJSON with coordinates rounded to a fixed number of decimals.
+- TopoJSON: coordinates quantized to an integer grid, shared borders stored
+  once as arcs, and arcs delta-encoded (per the TopoJSON spec).
+- FlatGeobuf through GDAL/pyogrio, for workers that read with geopandas.
+
+Run `python -m src.etl.geo_encoding` for a size and parse-time benchmark.
+"""
+import gzip
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import geopandas as gpd
+import numpy as np
+import shapely
+from shapely.geometry import shape
+
+from src.config import settings
+
+Point = Tuple[int, int]
+
+
+def round_geometries(gdf: gpd.GeoDataFrame, precision: int) -> gpd.GeoDataFrame:
+    """
+    Round every coordinate to `precision` decimals and drop repeated points.
+
+    Args:
+        gdf: GeoDataFrame to round
+        precision: Decimals to keep (6 ~ 0.1 m, 5 ~ 1 m)
+
+    Returns:
+        Copy of gdf with rounded geometries
+    """
+    geoms = shapely.transform(gdf.geometry.values, lambda coords: np.round(coords, precision))
+    geoms = shapely.remove_repeated_points(geoms)
+    return gdf.set_geometry(gpd.GeoSeries(geoms, index=gdf.index, crs=gdf.crs))
+
+
+def to_compact_geojson(gdf: gpd.GeoDataFrame, precision: Optional[int] = 6) -> str:
+    """
+    Serialize to GeoJSON without whitespace, optionally rounding coordinates.
+
+    Args:
+        gdf: GeoDataFrame to serialize
+        precision: Decimals to keep, or None to keep full precision
+
+    Returns:
+        GeoJSON text
+    """
+    if precision is not None:
+        gdf = round_geometries(gdf, precision)
+    return json.dumps(json.loads(gdf.to_json(drop_id=True)), separators=(',', ':'), ensure_ascii=False)
+
+
+def _polygon_rings(geometry) -> List[List[np.ndarray]]:
+    """Rings of a Polygon/MultiPolygon, grouped per polygon."""
+    polygons = geometry.geoms if geometry.geom_type == 'MultiPolygon' else [geometry]
+    return [
+        [np.asarray(p.exterior.coords)[:, :2]] + [np.asarray(r.coords)[:, :2] for r in p.interiors]
+        for p in polygons
+    ]
+
+
+def _quantize_ring(coords: np.ndarray, translate: np.ndarray, scale: np.ndarray) -> List[Point]:
+    """Quantize a closed ring and drop consecutive duplicates (returns an open ring)."""
+    q = np.round((coords - translate) / scale).astype(np.int64)
+    keep = np.ones(len(q), dtype=bool)
+    keep[1:] = np.any(q[1:] != q[:-1], axis=1)
+    q = q[keep]
+    if len(q) > 1 and tuple(q[0]) == tuple(q[-1]):
+        q = q[:-1]
+    return [tuple(p) for p in q.tolist()]
+
+
+class _ArcIndex:
+    """Deduplicates arcs, matching arcs traversed in the opposite direction."""
+
+    def __init__(self):
+        self.arcs: List[List[Point]] = []
+        self._index: Dict[tuple, int] = {}
+
+    def add(self, arc: List[Point]) -> int:
+        key = tuple(arc)
+        if key in self._index:
+            return self._index[key]
+        reverse_key = key[::-1]
+        if reverse_key in self._index:
+            return ~self._index[reverse_key]
+        self._index[key] = len(self.arcs)
+        self.arcs.append(arc)
+        return len(self.arcs) - 1
+
+
+def _ring_edges(ring: List[Point]):
+    n = len(ring)
+    for i in range(n):
+        a, b = ring[i], ring[(i + 1) % n]
+        yield (a, b) if a <= b else (b, a)
+
+
+def build_topology(gdf: gpd.GeoDataFrame, quantization: int = 100_000,
+                   object_name: str = 'seccionales') -> dict:
+    """
+    Encode polygons as quantized, delta-encoded TopoJSON with shared arcs.
+
+    A ring is cut into arcs wherever the set of rings sharing the current edge
+    changes, so every border between two seccionales is stored only once.
+
+    Args:
+        gdf: Polygon/MultiPolygon GeoDataFrame
+        quantization: Grid size per axis (1e5 ~ 0.3 m over Córdoba Capital)
+        object_name: Name of the TopoJSON object
+
+    Returns:
+        TopoJSON Topology dict
+    """
+    minx, miny, maxx, maxy = gdf.total_bounds
+    translate = np.array([minx, miny])
+    scale = np.array([
+        (maxx - minx) / (quantization - 1) or 1.0,
+        (maxy - miny) / (quantization - 1) or 1.0,
+    ])
+
+    # Quantize all rings first so edge sharing is detected on the integer grid
+    features = []
+    rings: List[List[Point]] = []
+    for geometry in gdf.geometry:
+        polygons = []
+        for polygon in _polygon_rings(geometry):
+            ring_ids = []
+            for coords in polygon:
+                ring = _quantize_ring(coords, translate, scale)
+                if len(ring) >= 3:
+                    ring_ids.append(len(rings))
+                    rings.append(ring)
+            if ring_ids:
+                polygons.append(ring_ids)
+        features.append(polygons)
+
+    edge_owners: Dict[tuple, set] = {}
+    for ring_id, ring in enumerate(rings):
+        for edge in _ring_edges(ring):
+            edge_owners.setdefault(edge, set()).add(ring_id)
+
+    arc_index = _ArcIndex()
+    ring_arcs: List[List[int]] = []
+    for ring in rings:
+        owners = [frozenset(edge_owners[edge]) for edge in _ring_edges(ring)]
+        n = len(ring)
+        junctions = [i for i in range(n) if owners[i - 1] != owners[i]]
+
+        if not junctions:
+            # Closed arc: rotate to the smallest point so reversed twins match
+            start = ring.index(min(ring))
+            arc = ring[start:] + ring[:start]
+            ring_arcs.append([arc_index.add(arc + [arc[0]])])
+            continue
+
+        rotated = ring[junctions[0]:] + ring[:junctions[0]]
+        cuts = [(j - junctions[0]) % n for j in junctions] + [n]
+        arcs = []
+        for start, end in zip(cuts[:-1], cuts[1:]):
+            arc = [rotated[i % n] for i in range(start, end + 1)]
+            arcs.append(arc_index.add(arc))
+        ring_arcs.append(arcs)
+
+    geometries = []
+    property_columns = [c for c in gdf.columns if c != gdf.geometry.name]
+    for (_, row), polygons in zip(gdf[property_columns].iterrows(), features):
+        arcs = [[ring_arcs[ring_id] for ring_id in polygon] for polygon in polygons]
+        geometry = {
+            'type': 'Polygon' if len(arcs) == 1 else 'MultiPolygon',
+            'arcs': arcs[0] if len(arcs) == 1 else arcs,
+            'properties': {k: (v.item() if hasattr(v, 'item') else v) for k, v in row.items()},
+        }
+        geometries.append(geometry)
+
+    encoded_arcs = []
+    for arc in arc_index.arcs:
+        points = np.asarray(arc, dtype=np.int64)
+        deltas = np.vstack([points[:1], np.diff(points, axis=0)])
+        encoded_arcs.append(deltas.tolist())
+
+    return {
+        'type': 'Topology',
+        'bbox': [float(minx), float(miny), float(maxx), float(maxy)],
+        'transform': {'scale': scale.tolist(), 'translate': translate.tolist()},
+        'objects': {object_name: {'type': 'GeometryCollection', 'geometries': geometries}},
+        'arcs': encoded_arcs,
+    }
+
+
+def to_topojson(gdf: gpd.GeoDataFrame, quantization: int = 100_000) -> str:
+    """Serialize a GeoDataFrame as minified TopoJSON text."""
+    return json.dumps(build_topology(gdf, quantization), separators=(',', ':'), ensure_ascii=False)
+
+
+def topology_to_geojson(topology: dict, object_name: Optional[str] = None) -> dict:
+    """
+    Decode a quantized TopoJSON object back into a GeoJSON FeatureCollection.
+
+    Args:
+        topology: TopoJSON Topology dict
+        object_name: Object to decode (default: the first one)
+
+    Returns:
+        GeoJSON FeatureCollection dict
+    """
+    scale = np.asarray(topology['transform']['scale'])
+    translate = np.asarray(topology['transform']['translate'])
+    arcs = [np.cumsum(np.asarray(arc, dtype=np.float64), axis=0) * scale + translate
+            for arc in topology['arcs']]
+
+    def ring_coords(arc_ids):
+        parts = []
+        for k, arc_id in enumerate(arc_ids):
+            points = arcs[arc_id] if arc_id >= 0 else arcs[~arc_id][::-1]
+            parts.append(points if k == 0 else points[1:])
+        return np.vstack(parts).tolist()
+
+    name = object_name or next(iter(topology['objects']))
+    features = []
+    for geometry in topology['objects'][name]['geometries']:
+        if geometry['type'] == 'Polygon':
+            coordinates = [ring_coords(ring) for ring in geometry['arcs']]
+        else:
+            coordinates = [[ring_coords(ring) for ring in polygon] for polygon in geometry['arcs']]
+        features.append({
+            'type': 'Feature',
+            'properties': geometry.get('properties', {}),
+            'geometry': {'type': geometry['type'], 'coordinates': coordinates},
+        })
+
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def read_topojson(path: Path) -> gpd.GeoDataFrame:
+    """
+    Read a TopoJSON file written by to_topojson into a GeoDataFrame.
+
+    Snapping to the quantization grid can make nearly-touching vertices
+    self-intersect, so invalid polygons are repaired with make_valid.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        collection = topology_to_geojson(json.load(f))
+    gdf = gpd.GeoDataFrame.from_features(collection['features'], crs='EPSG:4326')
+    invalid = ~gdf.is_valid
+    if invalid.any():
+        gdf.loc[invalid, 'geometry'] = gdf.loc[invalid, 'geometry'].make_valid()
+    return gdf
+
+
+def benchmark_encodings(gdf: gpd.GeoDataFrame, output_dir: Path, precision: int = 6,
+                        quantization: int = 100_000, repeat: int = 20) -> List[dict]:
+    """
+    Compare size and parse time of the available geometry encodings.
+
+    Args:
+        gdf: Seccional polygons
+        output_dir: Directory for the encoded files
+        precision: Decimals for compact GeoJSON
+        quantization: Grid size for TopoJSON
+        repeat: Parse repetitions (best time is reported)
+
+    Returns:
+        One dict per encoding with bytes, gzip bytes and parse milliseconds
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    def best_ms(fn):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best * 1000
+
+    pretty = output_dir / 'seccionales.geojson'
+    gdf.to_file(pretty, driver='GeoJSON')
+    compact = output_dir / 'seccionales.min.geojson'
+    compact.write_text(to_compact_geojson(gdf, precision), encoding='utf-8')
+    topo = output_dir / 'seccionales.topojson'
+    topo.write_text(to_topojson(gdf, quantization), encoding='utf-8')
+
+    def parse_geojson(path):
+        return lambda: [shape(f['geometry']) for f in json.loads(path.read_bytes())['features']]
+
+    cases = [
+        ('geojson (GDAL)', pretty, parse_geojson(pretty)),
+        (f'geojson min p={precision}', compact, parse_geojson(compact)),
+        (f'topojson q={quantization}', topo,
+         lambda: [shape(f['geometry']) for f in topology_to_geojson(json.loads(topo.read_bytes()))['features']]),
+    ]
+
+    try:
+        fgb = output_dir / 'seccionales.fgb'
+        gdf.to_file(fgb, driver='FlatGeobuf')
+        cases.append(('flatgeobuf', fgb, lambda: gpd.read_file(fgb)))
+    except Exception as e:
+        print(f"  FlatGeobuf not available: {e}")
+
+    results = []
+    for name, path, parse in cases:
+        data = path.read_bytes()
+        results.append({
+            'encoding': name,
+            'bytes': len(data),
+            'gzip_bytes': len(gzip.compress(data)),
+            'parse_ms': round(best_ms(parse), 3),
+        })
+    return results
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    gdf = gpd.read_file(settings.SECCIONALES_GEOJSON)
+    with tempfile.TemporaryDirectory() as tmp:
+        results = benchmark_encodings(gdf, Path(tmp))
+
+    base = results[0]['bytes']
+    print(f"{'encoding':<24}{'bytes':>10}{'gzip':>10}{'ratio':>8}{'parse ms':>10}")
+    for r in results:
+        print(f"{r['encoding']:<24}{r['bytes']:>10,}{r['gzip_bytes']:>10,}{base / r['bytes']:>7.1f}x{r['parse_ms']:>10.2f}")
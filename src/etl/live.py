@@ -0,0 +1,671 @@
+"""
+Live (election-night) ingestion of partial results.
+
+Results arrive as batches of mesa rows, either as files dropped in a
+directory or from an HTTP endpoint polled with a cursor. Each batch is
+normalized with normalize_results_chunk, validated, and applied to the
+running totals of LiveCount:
+
+- mesa rows are kept as a dense (mesas x parties) matrix; a mesa reported
+  again replaces its previous row (telegram corrections), so the change
+  applied to its circuito and seccional is the row difference and
+  re-applying a batch is a no-op
+- each level keeps its zone totals in a WinnerIndex, so a batch re-ranks
+  only the (zone, party) cells it changed, O(log parties) each
+
+After every poll with new batches the seccional and circuito totals are
+published (atomically) to settings.LIVE_DIR, where the dashboards pick them
+up through LiveSnapshot. The count is checkpointed every
+settings.LIVE_CHECKPOINT_SECONDS and on exit; dropped files only move to
+applied/ once a checkpoint covers them, so a restarted watcher resumes from
+the checkpoint and re-reads whatever came after it.
+
+Usage:
+    python -m src.etl.live --watch DIR            # drop directory
+    python -m src.etl.live --poll URL             # HTTP feed
+    python -m src.etl.live --serve DIR            # stand-in HTTP feed serving DIR
+    python -m src.etl.live --replay FILE DIR      # split a mesa-level file into batches in DIR
+"""
+import argparse
+import json
+import os
+import time
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.winners import LabelCodes, WinnerIndex
+from src.config import settings
+from .extract import iter_result_chunks
+from .transform import MESA_COLUMNS, normalize_results_chunk
+from .utils import COLUMN_MAPPING, get_party_normalization, get_seccional_mapping, normalize_columns
+
+BATCH_SUFFIXES = ('.csv', '.json')
+FEED_PAGE_SIZE = 50  # Batches per response of the stand-in feed
+
+
+class BatchError(ValueError):
+    """A batch that failed validation; it is rejected and the count is unchanged."""
+
+
+def read_batch_file(path: Path) -> pd.DataFrame:
+    """Rows of a batch file: CSV, or JSON as a list of records or {"rows": [...]}."""
+    path = Path(path)
+    if path.suffix.lower() == '.json':
+        payload = json.loads(path.read_text(encoding='utf-8'))
+        return pd.DataFrame(payload['rows'] if isinstance(payload, dict) else payload)
+    chunks = list(iter_result_chunks(path))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+
+@dataclass
+class Batch:
+    """One delivery of results: raw rows, or the file they are read from."""
+    id: str
+    rows: Optional[pd.DataFrame] = None
+    path: Optional[Path] = None
+    stamp: int = 0  # File mtime when listed
+
+    def read(self) -> pd.DataFrame:
+        if self.rows is None:
+            try:
+                self.rows = read_batch_file(self.path)
+            except (OSError, ValueError, KeyError) as error:
+                raise BatchError(f"Unreadable batch: {error}") from error
+        return self.rows
+
+
+def validate_batch(raw: pd.DataFrame, year: int = settings.LIVE_YEAR, cargo: str = settings.LIVE_CARGO,
+                   seccional_mapping: Optional[Dict[str, Optional[str]]] = None,
+                   party_mapping: Optional[Dict[str, str]] = None,
+                   max_mesa_votes: int = settings.LIVE_MAX_MESA_VOTES) -> pd.DataFrame:
+    """
+    Normalize and check one batch.
+
+    Rows of other cargos are dropped (feeds usually carry every category).
+
+    Args:
+        raw: Raw batch rows (mesa level: circuito and mesa columns)
+        year: Election being counted
+        cargo: Category kept
+        seccional_mapping, party_mapping: Loaded once by the caller
+        max_mesa_votes: Upper bound of a plausible mesa total
+
+    Returns:
+        Rows with MESA_COLUMNS
+
+    Raises:
+        BatchError: Missing or malformed columns, not mesa level, other years, rows with
+            unknown seccionales or missing votes, negative votes, circuits
+            outside their seccional, repeated (mesa, party) rows or
+            implausible mesa totals
+    """
+    if raw.empty:
+        raise BatchError("Empty batch")
+    # Only the feed columns: normalize_columns renames any other name with an
+    # 'a' and an 'o' (porcentaje, total_votos) to anio
+    feed = [col for col in raw.columns if str(col).strip() in COLUMN_MAPPING or str(col).strip() in MESA_COLUMNS]
+    try:
+        chunk = normalize_results_chunk(raw[feed], seccional_mapping, party_mapping)
+    except ValueError as error:
+        raise BatchError(str(error)) from error
+    except Exception as error:  # Any malformed batch is rejected, never fatal to the watcher
+        raise BatchError(f"Malformed batch: {error}") from error
+    if 'mesa' not in chunk.columns:
+        raise BatchError("Live batches must be mesa-level (circuito and mesa columns)")
+
+    dropped = len(raw) - len(chunk)
+    if dropped:
+        raise BatchError(f"{dropped} rows with an unknown seccional or missing year/votes")
+    years = set(chunk['anio'].unique().tolist()) - {year}
+    if years:
+        raise BatchError(f"Rows for other elections: {sorted(years)} (counting {year})")
+
+    chunk = chunk[chunk['cargo'].str.upper() == cargo.upper()]
+    if (chunk['votos'] < 0).any():
+        raise BatchError("Negative votes")
+    if ((chunk['circuito'] == '') | (chunk['mesa'] == '')).any():
+        raise BatchError("Rows without circuito or mesa")
+
+    prefix = chunk['circuito'].str.extract(r'^0*(\d+)', expand=False)
+    outside = chunk.loc[prefix != chunk['seccional'], 'circuito'].unique()
+    if len(outside):
+        raise BatchError(f"Circuits outside their seccional: {sorted(outside)[:5]}")
+
+    repeated = chunk.duplicated(['circuito', 'mesa', 'agrupacion'])
+    if repeated.any():
+        raise BatchError(f"{int(repeated.sum())} repeated (mesa, agrupacion) rows")
+
+    totals = chunk.groupby(['circuito', 'mesa'], sort=False)['votos'].sum()
+    if (totals > max_mesa_votes).any():
+        raise BatchError(f"Mesas above {max_mesa_votes} votes: {totals[totals > max_mesa_votes].index[:5].tolist()}")
+    return chunk
+
+
+# ============================================================================
+# RUNNING TOTALS
+# ============================================================================
+
+def _fit(array: np.ndarray, shape) -> np.ndarray:
+    """`array` zero-extended to at least `shape`; the first axis doubles to amortize appends."""
+    if all(have >= need for have, need in zip(array.shape, shape)):
+        return array
+    grown = [max(need, 2 * have if axis == 0 and need > have else have)
+             for axis, (have, need) in enumerate(zip(array.shape, shape))]
+    out = np.zeros(grown, dtype=array.dtype)
+    out[tuple(slice(0, n) for n in array.shape)] = array
+    return out
+
+
+class ZoneTotals:
+    """Votes and ranking (a WinnerIndex) and mesas counted of every zone of one level."""
+
+    def __init__(self, level: str):
+        self.level = level
+        self.codes = LabelCodes()
+        self.index = WinnerIndex(by=(level,))
+        self.mesas = np.zeros(0, dtype=np.int64)
+
+    def add(self, zones: np.ndarray, delta: np.ndarray, fresh: np.ndarray) -> np.ndarray:
+        """Add per-mesa vote changes; `fresh` marks mesas counted for the first time. Returns changed zones."""
+        # Index rows and columns follow the zone and party codes (both append-only)
+        if len(self.index) < len(self.codes):
+            self.index.key_codes(np.arange(len(self.index), len(self.codes)))
+        if len(self.index.parties) < delta.shape[1]:
+            self.index.party_codes(np.arange(len(self.index.parties), delta.shape[1]))
+        self.mesas = _fit(self.mesas, (len(self.codes),))
+        np.add.at(self.mesas, zones[fresh], 1)
+
+        change = np.zeros((len(self.codes), delta.shape[1]), dtype=np.int64)
+        np.add.at(change, zones, delta)
+        zone, party = np.nonzero(change)
+        return self.index.add_codes(zone, party, change[zone, party])
+
+    def frame(self, parties: List[str]) -> pd.DataFrame:
+        """Long (zone, agrupacion, votos) rows with votes, plus total_votos and porcentaje."""
+        votes = self.index.votes[:len(self.codes), :len(parties)]
+        zone, party = np.nonzero(votes)
+        total = self.index.total[:len(self.codes)]
+        return pd.DataFrame({
+            self.level: np.asarray(self.codes.labels, dtype=object)[zone],
+            'agrupacion': np.asarray(parties, dtype=object)[party],
+            'votos': votes[zone, party],
+            'total_votos': total[zone],
+            'porcentaje': np.round(votes[zone, party] / total[zone] * 100, 2),
+        })
+
+    def winners(self, parties: List[str]) -> pd.DataFrame:
+        """Winner, runner-up and margin (points) per zone, with the mesas counted."""
+        n = len(self.codes)
+        winner, runner_up, margin = self.index.rankings(np.arange(n))
+        names = np.asarray(list(parties) + [None], dtype=object)
+        return pd.DataFrame({
+            self.level: self.codes.labels,
+            'agrupacion': names[winner],
+            'segundo': names[runner_up],
+            'margen_pct': np.round(margin, 2),
+            'mesas': self.mesas[:n],
+        })
+
+
+class LiveCount:
+    """
+    Running mesa, circuito and seccional totals of one election.
+
+    Args:
+        year: Election being counted
+        cargo: Category counted
+    """
+
+    LEVELS = ('circuito', 'seccional')
+
+    def __init__(self, year: int = settings.LIVE_YEAR, cargo: str = settings.LIVE_CARGO):
+        self.year = year
+        self.cargo = cargo
+        self.parties = LabelCodes()
+        self.mesas = LabelCodes()
+        self.mesa_votes = np.zeros((0, 0), dtype=np.int64)
+        self.mesa_zone = {level: np.zeros(0, dtype=np.int64) for level in self.LEVELS}
+        self.zones = {level: ZoneTotals(level) for level in self.LEVELS}
+        self.version = 0
+        self.batches = 0
+        self.cursor: Optional[str] = None
+        self.started = datetime.now().isoformat(timespec='seconds')
+
+    def apply(self, chunk: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Apply a validated batch (see validate_batch).
+
+        Returns:
+            Codes of the zones whose totals changed, per level
+        """
+        key = (chunk['circuito'] + '/' + chunk['mesa']).to_numpy(dtype=object)
+        row, keys = pd.factorize(key)
+        first = np.unique(row, return_index=True)[1]
+
+        party = self.parties.encode(chunk['agrupacion'].to_numpy(dtype=object))
+        new = np.zeros((len(keys), len(self.parties)), dtype=np.int64)
+        new[row, party] = chunk['votos'].to_numpy()
+
+        before = len(self.mesas)
+        mesas = self.mesas.encode(keys)
+        fresh = mesas >= before
+        self.mesa_votes = _fit(self.mesa_votes, (len(self.mesas), len(self.parties)))
+        for level in self.LEVELS:
+            self.mesa_zone[level] = _fit(self.mesa_zone[level], (len(self.mesas),))
+            zones = self.zones[level].codes.encode(chunk[level].to_numpy(dtype=object)[first])
+            self.mesa_zone[level][mesas[fresh]] = zones[fresh]
+
+        columns = slice(0, len(self.parties))
+        delta = new - self.mesa_votes[mesas, columns]
+        self.mesa_votes[mesas, columns] = new
+
+        self.version += 1
+        self.batches += 1
+        return {level: self.zones[level].add(self.mesa_zone[level][mesas], delta, fresh)
+                for level in self.LEVELS}
+
+    def results(self, level: str = 'seccional') -> pd.DataFrame:
+        """Totals of a level in the CLEAN_CSV schema (votes and shares per zone and party)."""
+        df = self.zones[level].frame(self.parties.labels)
+        df.insert(0, 'anio', self.year)
+        df.insert(1, 'cargo', self.cargo)
+        return df.sort_values([level, 'votos'], ascending=[True, False], ignore_index=True)
+
+    def winners(self, level: str = 'seccional') -> pd.DataFrame:
+        return self.zones[level].winners(self.parties.labels)
+
+    def state(self) -> dict:
+        return {
+            'year': self.year,
+            'cargo': self.cargo,
+            'started': self.started,
+            'version': self.version,
+            'batches': self.batches,
+            'mesas': len(self.mesas),
+            'votes': int(self.mesa_votes.sum()),
+            'updated': datetime.now().isoformat(timespec='seconds'),
+        }
+
+    def publish(self, directory: Path = settings.LIVE_DIR) -> None:
+        """Write the seccional and circuito totals, then state.json (the version readers watch)."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for level in self.LEVELS:
+            _atomic_write(directory / f'{level}.csv',
+                          lambda path, level=level: self.results(level).to_csv(path, index=False, encoding='utf-8'))
+        _atomic_write(directory / 'state.json',
+                      lambda path: path.write_text(json.dumps(self.state(), ensure_ascii=False), encoding='utf-8'))
+
+    # ------------------------------------------------------------------
+    # Checkpoints
+    # ------------------------------------------------------------------
+
+    def save(self, path: Path) -> None:
+        """Checkpoint the mesa matrix and labels in one npz (written atomically)."""
+        meta = {
+            'year': self.year, 'cargo': self.cargo, 'started': self.started,
+            'version': self.version, 'batches': self.batches, 'cursor': self.cursor,
+            'parties': self.parties.labels, 'mesas': self.mesas.labels,
+            'zones': {level: self.zones[level].codes.labels for level in self.LEVELS},
+        }
+        arrays = {f'zone_{level}': self.mesa_zone[level][:len(self.mesas)] for level in self.LEVELS}
+        votes = self.mesa_votes[:len(self.mesas), :len(self.parties)]
+
+        def write(tmp: Path):
+            with open(tmp, 'wb') as f:
+                np.savez(f, votes=votes, meta=np.array(json.dumps(meta, ensure_ascii=False)), **arrays)
+        _atomic_write(Path(path), write)
+
+    @classmethod
+    def load(cls, path: Path) -> 'LiveCount':
+        """Count restored from a checkpoint; zone totals and rankings are rebuilt from the mesa rows."""
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            votes = data['votes']
+            zones = {level: data[f'zone_{level}'] for level in cls.LEVELS}
+
+        count = cls(meta['year'], meta['cargo'])
+        count.started, count.version, count.batches, count.cursor = \
+            meta['started'], meta['version'], meta['batches'], meta['cursor']
+        count.parties = LabelCodes(meta['parties'])
+        count.mesas = LabelCodes(meta['mesas'])
+        count.mesa_votes = votes.astype(np.int64)
+        fresh = np.ones(len(votes), dtype=bool)
+        for level in cls.LEVELS:
+            count.zones[level].codes = LabelCodes(meta['zones'][level])
+            count.mesa_zone[level] = zones[level].astype(np.int64)
+            if len(votes):
+                count.zones[level].add(count.mesa_zone[level], count.mesa_votes, fresh)
+        return count
+
+
+def _atomic_write(path: Path, write: Callable[[Path], None]) -> None:
+    tmp = path.with_name(f'.{path.name}.tmp')
+    write(tmp)
+    os.replace(tmp, path)
+
+
+# ============================================================================
+# SOURCES
+# ============================================================================
+
+class DropDirectory:
+    """
+    Batch files (.csv, .json) dropped in a directory, oldest first.
+
+    Producers should write under a temporary name (a dotfile, or another
+    extension) and rename, so a half-written file is never read. Rejected
+    files move to rejected/ at once, with the reason in a .error file;
+    applied files move to applied/ on commit(), after a checkpoint.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        for sub in ('applied', 'rejected'):
+            (self.directory / sub).mkdir(parents=True, exist_ok=True)
+        self.cursor: Optional[str] = None
+        self._pending: Dict[str, Batch] = {}
+
+    def poll(self) -> List[Batch]:
+        batches = []
+        for path in self.directory.iterdir():
+            if path.name.startswith('.') or path.suffix.lower() not in BATCH_SUFFIXES or not path.is_file():
+                continue
+            try:
+                stamp = path.stat().st_mtime_ns
+            except OSError:
+                continue
+            pending = self._pending.get(path.name)
+            if pending is None or pending.stamp != stamp:
+                batches.append(Batch(path.name, path=path, stamp=stamp))
+        return sorted(batches, key=lambda batch: (batch.stamp, batch.id))
+
+    def applied(self, batch: Batch) -> None:
+        self._pending[batch.id] = batch
+
+    def rejected(self, batch: Batch, reason: str) -> None:
+        target = self.directory / 'rejected' / batch.path.name
+        os.replace(batch.path, target)
+        target.with_name(target.name + '.error').write_text(reason, encoding='utf-8')
+
+    def commit(self) -> None:
+        """Move the batches covered by the last checkpoint to applied/."""
+        for batch in self._pending.values():
+            try:
+                if batch.path.stat().st_mtime_ns == batch.stamp:
+                    os.replace(batch.path, self.directory / 'applied' / batch.path.name)
+            except OSError:
+                pass
+        self._pending.clear()
+
+
+class HttpFeed:
+    """
+    Batches polled from an HTTP endpoint.
+
+    GET {url}?after={cursor} returns {"batches": [{"id": ..., "rows": [{...}]}]}
+    with the batches after the given id (all of them without a cursor).
+    The cursor (id of the last batch handled) is kept in the checkpoint.
+    """
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+        self.cursor: Optional[str] = None
+
+    def poll(self) -> List[Batch]:
+        url = self.url
+        if self.cursor is not None:
+            url += ('&' if '?' in url else '?') + urllib.parse.urlencode({'after': self.cursor})
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                payload = json.load(response)
+        except (OSError, ValueError) as error:
+            print(f"[LIVE] Feed unavailable ({error}), retrying")
+            return []
+        return [Batch(str(batch['id']), rows=pd.DataFrame(batch.get('rows') or []))
+                for batch in payload.get('batches', [])]
+
+    def applied(self, batch: Batch) -> None:
+        self.cursor = batch.id
+
+    def rejected(self, batch: Batch, reason: str) -> None:
+        self.cursor = batch.id
+
+    def commit(self) -> None:
+        pass
+
+
+# ============================================================================
+# INGESTION LOOP
+# ============================================================================
+
+class LiveIngestor:
+    """
+    Polls a source, applies its batches to a LiveCount and publishes.
+
+    Args:
+        source: DropDirectory or HttpFeed
+        year: Election being counted
+        cargo: Category counted
+        directory: Output directory (snapshot, state.json, checkpoint.npz)
+        checkpoint_seconds: Minimum time between checkpoints
+    """
+
+    def __init__(self, source, year: int = settings.LIVE_YEAR, cargo: str = settings.LIVE_CARGO,
+                 directory: Path = settings.LIVE_DIR,
+                 checkpoint_seconds: float = settings.LIVE_CHECKPOINT_SECONDS):
+        self.source = source
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_path = self.directory / 'checkpoint.npz'
+        self.checkpoint_seconds = checkpoint_seconds
+
+        if self.checkpoint_path.exists():
+            self.count = LiveCount.load(self.checkpoint_path)
+            if (self.count.year, self.count.cargo) != (year, cargo):
+                raise ValueError(f"{self.checkpoint_path} belongs to {self.count.year} {self.count.cargo}; "
+                                 f"move it away to count {year} {cargo}")
+            print(f"[LIVE] Resumed from checkpoint: {self.count.batches} batches, {len(self.count.mesas):,} mesas")
+        else:
+            self.count = LiveCount(year, cargo)
+        source.cursor = self.count.cursor
+
+        self._mappings = (get_seccional_mapping(), get_party_normalization())
+        self._checkpointed = time.monotonic()
+        self._dirty = False
+
+    def step(self) -> int:
+        """Poll once, apply the new batches and publish; returns the batches applied."""
+        applied = 0
+        for batch in self.source.poll():
+            try:
+                chunk = validate_batch(batch.read(), self.count.year, self.count.cargo, *self._mappings)
+            except BatchError as error:
+                print(f"[LIVE] Rejected {batch.id}: {error}")
+                self.source.rejected(batch, str(error))
+                self.count.cursor = batch.id
+                self._dirty = True
+                continue
+            self.count.apply(chunk)
+            self.count.cursor = batch.id
+            self.source.applied(batch)
+            applied += 1
+
+        if applied:
+            self.count.publish(self.directory)
+            print(f"[LIVE] +{applied} batches: {len(self.count.mesas):,} mesas, "
+                  f"{int(self.count.mesa_votes.sum()):,} votes (version {self.count.version})")
+            self._dirty = True
+        if self._dirty and time.monotonic() - self._checkpointed >= self.checkpoint_seconds:
+            self.checkpoint()
+        return applied
+
+    def checkpoint(self) -> None:
+        self.count.save(self.checkpoint_path)
+        self.source.commit()
+        self._checkpointed = time.monotonic()
+        self._dirty = False
+
+    def run(self, interval: float = settings.LIVE_POLL_SECONDS, idle_exit: Optional[float] = None) -> LiveCount:
+        """
+        Poll until interrupted (or idle for `idle_exit` seconds), then checkpoint.
+
+        Returns:
+            The final count
+        """
+        idle_since = time.monotonic()
+        try:
+            while True:
+                if self.step():
+                    idle_since = time.monotonic()
+                    continue
+                if idle_exit is not None and time.monotonic() - idle_since >= idle_exit:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("\n[LIVE] Stopping")
+        finally:
+            self.checkpoint()
+        return self.count
+
+
+class LiveSnapshot:
+    """
+    Reader of the published snapshot for the dashboards.
+
+    poll() stats state.json and only reads the seccional totals when the
+    (started, version) pair changed, so it is cheap to call on a timer.
+    """
+
+    def __init__(self, directory: Path = settings.LIVE_DIR):
+        self.directory = Path(directory)
+        self.state: Optional[dict] = None
+        self._stamp: Optional[int] = None
+
+    @property
+    def year(self) -> Optional[int]:
+        return self.state['year'] if self.state else None
+
+    @property
+    def version(self) -> Optional[str]:
+        return f"{self.state['started']}/{self.state['version']}" if self.state else None
+
+    def poll(self) -> Optional[pd.DataFrame]:
+        """Seccional results when a new version was published since the last call, else None."""
+        path = self.directory / 'state.json'
+        try:
+            stamp = path.stat().st_mtime_ns
+            if stamp == self._stamp:
+                return None
+            state = json.loads(path.read_text(encoding='utf-8'))
+            df = pd.read_csv(self.directory / 'seccional.csv', dtype={'seccional': str})
+        except (OSError, ValueError):
+            return None
+        self._stamp = stamp
+        if self.state and (state['started'], state['version']) == (self.state['started'], self.state['version']):
+            return None
+        self.state = state
+        return df
+
+
+# ============================================================================
+# STAND-IN FEED AND REPLAY
+# ============================================================================
+
+def write_batches(df: pd.DataFrame, directory: Path, batches: int = 50, interval: float = 0.0,
+                  seed: int = 0) -> List[Path]:
+    """
+    Split mesa-level results into batch files of whole mesas in random order.
+
+    Stands in for the count arriving on election night: files are written
+    under a dotfile name and renamed into `directory`, one every `interval`
+    seconds.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    key = df['circuito'].astype(str) + '/' + df['mesa'].astype(str)
+    codes, keys = pd.factorize(key)
+    order = np.random.default_rng(seed).permutation(len(keys))
+    paths = []
+    for i, part in enumerate(np.array_split(order, batches), start=1):
+        path = directory / f'batch_{i:05d}.csv'
+        _atomic_write(path, lambda tmp, part=part: df[np.isin(codes, part)].to_csv(tmp, index=False, encoding='utf-8'))
+        paths.append(path)
+        if interval:
+            time.sleep(interval)
+    return paths
+
+
+def serve_feed(directory: Path, host: str = settings.API_HOST, port: int = 8070) -> None:
+    """Stand-in results endpoint for HttpFeed: serves the batch files of `directory` by name."""
+    directory = Path(directory)
+
+    class FeedHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+            after = query.get('after', [''])[0]
+            files = sorted(path for path in directory.iterdir()
+                           if path.suffix.lower() in BATCH_SUFFIXES and not path.name.startswith('.')
+                           and path.name > after)[:FEED_PAGE_SIZE]
+            body = json.dumps({'batches': [
+                {'id': path.name, 'rows': json.loads(read_batch_file(path).to_json(orient='records'))}
+                for path in files
+            ]}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), FeedHandler)
+    print(f"[LIVE] Serving {directory} on http://{host}:{port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Live election-night ingestion')
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--watch', type=Path, metavar='DIR', help='Watch a drop directory for batch files')
+    mode.add_argument('--poll', metavar='URL', help='Poll an HTTP results feed')
+    mode.add_argument('--serve', type=Path, metavar='DIR', help='Serve the batch files in DIR as a feed')
+    mode.add_argument('--replay', type=Path, nargs=2, metavar=('FILE', 'DIR'),
+                      help='Split a mesa-level results file into batch files in DIR')
+    parser.add_argument('--year', type=int, default=settings.LIVE_YEAR)
+    parser.add_argument('--cargo', default=settings.LIVE_CARGO)
+    parser.add_argument('--output', type=Path, default=settings.LIVE_DIR)
+    parser.add_argument('--interval', type=float, default=settings.LIVE_POLL_SECONDS,
+                        help='Polling interval (watch/poll) or seconds between batches (replay)')
+    parser.add_argument('--batches', type=int, default=50, help='Batch files written by --replay')
+    parser.add_argument('--port', type=int, default=8070, help='Port of --serve')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.serve:
+        serve_feed(args.serve, port=args.port)
+    elif args.replay:
+        source_file, target = args.replay
+        rows = normalize_columns(read_batch_file(source_file))
+        print(f"[OK] {len(write_batches(rows, target, args.batches, args.interval))} batches in {target}")
+    else:
+        source = DropDirectory(args.watch) if args.watch else HttpFeed(args.poll)
+        count = LiveIngestor(source, args.year, args.cargo, args.output).run(args.interval)
+        print(count.winners().to_string(index=False))
@@ -3,8 +3,13 @@ Load module - Save processed data to files and database.
 """
 import pandas as pd
 import geopandas as gpd
+import os
 import sqlite3
+from pathlib import Path
+from typing import Iterable, Optional
 from src.config import settings
+from src.monitoring.pipeline import stage
+from .geo_encoding import to_compact_geojson, to_topojson
 
 
 def load_to_csv(df: pd.DataFrame) -> None:
@@ -21,23 +26,304 @@ def load_to_csv(df: pd.DataFrame) -> None:
     if cols_to_drop:
         df = df.drop(columns=cols_to_drop)
 
-    df.to_csv(settings.CLEAN_CSV, index=False, encoding='utf-8')
+    with stage('csv', rows=len(df)):
+        df.to_csv(settings.CLEAN_CSV, index=False, encoding='utf-8')
 
     print(f"[OK] Saved to: {settings.CLEAN_CSV}")
 
 
-def load_geojson(gdf: gpd.GeoDataFrame) -> None:
+def load_geojson(gdf: gpd.GeoDataFrame,
+                 encodings: Iterable[str] = settings.GEOMETRY_ENCODINGS,
+                 precision: Optional[int] = settings.GEOJSON_PRECISION,
+                 quantization: int = settings.TOPOJSON_QUANTIZATION) -> None:
     """
-    Save geographic data to GeoJSON file.
+    Save geographic data in one or more geometry encodings.
 
     Args:
         gdf: Processed geodataframe
+        encodings: Any of 'geojson', 'topojson', 'flatgeobuf'
+        precision: Decimals kept in GeoJSON coordinates (None = full precision)
+        quantization: Grid size per axis for TopoJSON
     """
-    print("[LOAD] Saving GeoJSON...")
+    encodings = list(encodings)
+    unknown = set(encodings) - {'geojson', 'topojson', 'flatgeobuf'}
+    if unknown:
+        raise ValueError(f"Unknown geometry encodings: {sorted(unknown)}")
+
+    if 'geojson' in encodings:
+        print("[LOAD] Saving GeoJSON...")
+        with stage('geojson', rows=len(gdf)):
+            if precision is None:
+                gdf.to_file(settings.SECCIONALES_GEOJSON, driver='GeoJSON', encoding='utf-8')
+            else:
+                settings.SECCIONALES_GEOJSON.write_text(to_compact_geojson(gdf, precision), encoding='utf-8')
+        print(f"[OK] Saved to: {settings.SECCIONALES_GEOJSON}")
+
+    if 'topojson' in encodings:
+        print("[LOAD] Saving TopoJSON...")
+        with stage('topojson', rows=len(gdf)):
+            settings.SECCIONALES_TOPOJSON.write_text(to_topojson(gdf, quantization), encoding='utf-8')
+        print(f"[OK] Saved to: {settings.SECCIONALES_TOPOJSON}")
+
+    if 'flatgeobuf' in encodings:
+        print("[LOAD] Saving FlatGeobuf...")
+        with stage('flatgeobuf', rows=len(gdf)):
+            gdf.to_file(settings.SECCIONALES_FLATGEOBUF, driver='FlatGeobuf')
+        print(f"[OK] Saved to: {settings.SECCIONALES_FLATGEOBUF}")
+
+
+SECCIONALES_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS seccionales (
+        id INTEGER PRIMARY KEY,
+        nombre TEXT NOT NULL UNIQUE,
+        geometry BLOB NOT NULL,
+        minx REAL NOT NULL,
+        miny REAL NOT NULL,
+        maxx REAL NOT NULL,
+        maxy REAL NOT NULL,
+        centroid_x REAL NOT NULL,
+        centroid_y REAL NOT NULL,
+        area_m2 REAL NOT NULL
+    )
+    """,
+    # R*Tree over the bounding boxes; ids match seccionales.id
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS seccionales_rtree
+    USING rtree(id, minx, maxx, miny, maxy)
+    """,
+]
+
+
+def create_seccionales_table(conn: sqlite3.Connection) -> None:
+    """
+    Create the seccionales table and its R*Tree index.
+
+    Databases written before geometry was stored as WKB have a TEXT
+    geometry column and no bbox columns; that table only holds derived
+    data, so it is dropped and rebuilt.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(seccionales)")}
+    if columns and 'minx' not in columns:
+        print("  Migrating seccionales table to WKB geometry...")
+        conn.execute("DROP TABLE seccionales")
+
+    for statement in SECCIONALES_SCHEMA:
+        conn.execute(statement)
+
 
-    gdf.to_file(settings.SECCIONALES_GEOJSON, driver='GeoJSON', encoding='utf-8')
+def insert_seccionales(conn: sqlite3.Connection, gdf: gpd.GeoDataFrame) -> None:
+    """
+    Insert or replace seccional geometries with their spatial metadata.
+
+    Geometry is stored as WKB in EPSG:4326. Area is computed in the local
+    UTM projection and the centroid is projected back to lon/lat.
 
-    print(f"[OK] Saved to: {settings.SECCIONALES_GEOJSON}")
+    Args:
+        conn: Open database connection (caller commits)
+        gdf: Seccional polygons with a 'seccional' column
+    """
+    if gdf.crs is None:
+        gdf = gdf.set_crs('EPSG:4326')
+    gdf = gdf.to_crs('EPSG:4326')
+    projected = gdf.geometry.to_crs(gdf.estimate_utm_crs())
+
+    bounds = gdf.geometry.bounds
+    centroids = projected.centroid.to_crs('EPSG:4326')
+    rows = [
+        (int(seccional), str(seccional), sqlite3.Binary(wkb),
+         minx, miny, maxx, maxy, cx, cy, area)
+        for seccional, wkb, minx, miny, maxx, maxy, cx, cy, area in zip(
+            gdf['seccional'], gdf.geometry.to_wkb(),
+            bounds['minx'], bounds['miny'], bounds['maxx'], bounds['maxy'],
+            centroids.x, centroids.y, projected.area
+        )
+    ]
+
+    conn.executemany("""
+        INSERT OR REPLACE INTO seccionales
+        (id, nombre, geometry, minx, miny, maxx, maxy, centroid_x, centroid_y, area_m2)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.executemany(
+        "INSERT OR REPLACE INTO seccionales_rtree (id, minx, maxx, miny, maxy) VALUES (?, ?, ?, ?, ?)",
+        [(row[0], row[3], row[5], row[4], row[6]) for row in rows]
+    )
+
+
+SUMMARY_SCHEMA = [
+    # Per (anio, seccional): total votes plus winner, runner-up and margin
+    """
+    CREATE TABLE IF NOT EXISTS totales_seccional (
+        anio INTEGER NOT NULL,
+        seccional_id INTEGER NOT NULL,
+        total_votos INTEGER NOT NULL,
+        agrupaciones INTEGER NOT NULL,
+        ganador_id INTEGER NOT NULL,
+        ganador_votos INTEGER NOT NULL,
+        segundo_id INTEGER,
+        segundo_votos INTEGER,
+        margen_votos INTEGER NOT NULL,
+        margen_pct REAL NOT NULL,
+        PRIMARY KEY (anio, seccional_id),
+        FOREIGN KEY (seccional_id) REFERENCES seccionales(id),
+        FOREIGN KEY (ganador_id) REFERENCES agrupaciones(id),
+        FOREIGN KEY (segundo_id) REFERENCES agrupaciones(id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_totales_seccional_ganador ON totales_seccional(anio, ganador_id)",
+    # Per (anio, agrupacion): city-wide votes, share and seccionales won
+    """
+    CREATE TABLE IF NOT EXISTS totales_agrupacion (
+        anio INTEGER NOT NULL,
+        agrupacion_id INTEGER NOT NULL,
+        votos INTEGER NOT NULL,
+        porcentaje REAL NOT NULL,
+        seccionales_ganadas INTEGER NOT NULL,
+        PRIMARY KEY (anio, agrupacion_id),
+        FOREIGN KEY (agrupacion_id) REFERENCES agrupaciones(id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_totales_agrupacion_votos ON totales_agrupacion(anio, votos DESC)",
+    """
+    CREATE VIEW IF NOT EXISTS v_ganadores AS
+    SELECT t.anio, t.seccional_id AS seccional, g.nombre AS ganador, g.color AS ganador_color,
+           t.ganador_votos, s.nombre AS segundo, t.segundo_votos, t.total_votos,
+           ROUND(100.0 * t.ganador_votos / t.total_votos, 2) AS ganador_pct,
+           t.margen_votos, t.margen_pct
+    FROM totales_seccional t
+    JOIN agrupaciones g ON g.id = t.ganador_id
+    LEFT JOIN agrupaciones s ON s.id = t.segundo_id
+    """,
+    """
+    CREATE VIEW IF NOT EXISTS v_totales_agrupacion AS
+    SELECT t.anio, a.nombre AS agrupacion, a.color, t.votos, t.porcentaje, t.seccionales_ganadas
+    FROM totales_agrupacion t
+    JOIN agrupaciones a ON a.id = t.agrupacion_id
+    """,
+]
+
+REFRESH_TOTALES_SECCIONAL_SQL = """
+    INSERT INTO totales_seccional
+    (anio, seccional_id, total_votos, agrupaciones, ganador_id, ganador_votos,
+     segundo_id, segundo_votos, margen_votos, margen_pct)
+    SELECT anio, seccional_id, total_votos, agrupaciones,
+           MAX(CASE WHEN rank = 1 THEN agrupacion_id END),
+           MAX(CASE WHEN rank = 1 THEN votos END),
+           MAX(CASE WHEN rank = 2 THEN agrupacion_id END),
+           MAX(CASE WHEN rank = 2 THEN votos END),
+           MAX(CASE WHEN rank = 1 THEN votos END) - COALESCE(MAX(CASE WHEN rank = 2 THEN votos END), 0),
+           ROUND(100.0 * (MAX(CASE WHEN rank = 1 THEN votos END)
+                          - COALESCE(MAX(CASE WHEN rank = 2 THEN votos END), 0)) / NULLIF(total_votos, 0), 2)
+    FROM (
+        SELECT anio, seccional_id, agrupacion_id, votos,
+               SUM(votos) OVER w AS total_votos,
+               COUNT(*) OVER w AS agrupaciones,
+               ROW_NUMBER() OVER (PARTITION BY anio, seccional_id ORDER BY votos DESC, agrupacion_id) AS rank
+        FROM resultados
+        WHERE anio = ?
+        WINDOW w AS (PARTITION BY anio, seccional_id)
+    )
+    WHERE rank <= 2
+    GROUP BY anio, seccional_id
+"""
+
+REFRESH_TOTALES_AGRUPACION_SQL = """
+    INSERT INTO totales_agrupacion (anio, agrupacion_id, votos, porcentaje, seccionales_ganadas)
+    SELECT r.anio, r.agrupacion_id, SUM(r.votos),
+           ROUND(100.0 * SUM(r.votos) / (SELECT SUM(votos) FROM resultados WHERE anio = r.anio), 2),
+           (SELECT COUNT(*) FROM totales_seccional t
+            WHERE t.anio = r.anio AND t.ganador_id = r.agrupacion_id)
+    FROM resultados r
+    WHERE r.anio = ?
+    GROUP BY r.anio, r.agrupacion_id
+"""
+
+
+def refresh_summary_tables(conn: sqlite3.Connection, anios) -> None:
+    """
+    Recompute the materialized summary tables for the given years only.
+
+    Years that were not reloaded keep their existing summary rows, so a
+    load that touches one election does not re-aggregate the others.
+
+    Args:
+        conn: Open database connection (caller commits)
+        anios: Years whose resultados rows changed
+    """
+    for statement in SUMMARY_SCHEMA:
+        conn.execute(statement)
+
+    for anio in anios:
+        conn.execute("DELETE FROM totales_seccional WHERE anio = ?", (int(anio),))
+        conn.execute("DELETE FROM totales_agrupacion WHERE anio = ?", (int(anio),))
+        conn.execute(REFRESH_TOTALES_SECCIONAL_SQL, (int(anio),))
+        conn.execute(REFRESH_TOTALES_AGRUPACION_SQL, (int(anio),))
+
+
+READ_API_INDEXES = [
+    """
+    CREATE INDEX IF NOT EXISTS idx_resultados_anio_seccional
+    ON resultados(anio, seccional_id, agrupacion_id, votos)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_resultados_anio_agrupacion
+    ON resultados(anio, agrupacion_id, seccional_id, votos)
+    """,
+]
+
+
+def upgrade_read_schema(conn: sqlite3.Connection) -> bool:
+    """
+    Bring a database written by an older pipeline up to the read API schema.
+
+    Adds what the API needs and can be derived from the stored rows: WKB
+    seccional geometry with bbox columns and the R*Tree (from the old WKT
+    geometry), the covering indexes and the summary tables for every year
+    in resultados. Before the summaries are built, rows repeated by older
+    runs are dropped (the last load of each anio/cargo/seccional/agrupacion
+    wins). Current databases are left untouched.
+
+    Args:
+        conn: Read-write database connection (committed here)
+
+    Returns:
+        True if anything was added
+    """
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if 'resultados' not in tables or 'seccionales' not in tables:
+        raise FileNotFoundError("Database has no resultados/seccionales tables (run python -m src.etl)")
+
+    upgraded = False
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(seccionales)")}
+    if 'minx' not in columns or 'seccionales_rtree' not in tables:
+        import shapely
+        rows = conn.execute("SELECT id, geometry FROM seccionales ORDER BY id").fetchall()
+        if 'minx' in columns:
+            geometry = shapely.from_wkb([bytes(wkb) for _, wkb in rows])
+        else:
+            geometry = shapely.from_wkt([wkt for _, wkt in rows])
+        gdf = gpd.GeoDataFrame({'seccional': [id_ for id_, _ in rows]}, geometry=geometry, crs='EPSG:4326')
+        create_seccionales_table(conn)
+        insert_seccionales(conn, gdf)
+        upgraded = True
+
+    for statement in READ_API_INDEXES:
+        conn.execute(statement)
+
+    if 'totales_seccional' not in tables or 'totales_agrupacion' not in tables:
+        # Pipelines before year replacement appended every run: keep the last load of each row
+        conn.execute("""
+            DELETE FROM resultados WHERE id NOT IN (
+                SELECT MAX(id) FROM resultados GROUP BY anio, cargo, seccional_id, agrupacion_id
+            )
+        """)
+        anios = [row[0] for row in conn.execute("SELECT DISTINCT anio FROM resultados")]
+        refresh_summary_tables(conn, anios)
+        upgraded = True
+
+    conn.commit()
+    return upgraded
 
 
 def load_to_database(df: pd.DataFrame, gdf: gpd.GeoDataFrame) -> None:
@@ -56,14 +342,8 @@ def load_to_database(df: pd.DataFrame, gdf: gpd.GeoDataFrame) -> None:
         # Create tables
         print("  Creating tables...")
 
-        # Seccionales table
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS seccionales (
-                id INTEGER PRIMARY KEY,
-                nombre TEXT NOT NULL UNIQUE,
-                geometry TEXT NOT NULL
-            )
-        """)
+        # Seccionales table (WKB geometry with precomputed bbox, centroid and area)
+        create_seccionales_table(conn)
 
         # Agrupaciones table
         conn.execute("""
@@ -95,13 +375,14 @@ def load_to_database(df: pd.DataFrame, gdf: gpd.GeoDataFrame) -> None:
         conn.execute("CREATE INDEX IF NOT EXISTS idx_resultados_seccional ON resultados(seccional_id)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_resultados_agrupacion ON resultados(agrupacion_id)")
 
+        # Covering indexes for the read API (zone/year and party/year lookups)
+        for statement in READ_API_INDEXES:
+            conn.execute(statement)
+
         # Insert seccionales
         print("  Inserting seccionales...")
-        for _, row in gdf.iterrows():
-            conn.execute(
-                "INSERT OR IGNORE INTO seccionales (id, nombre, geometry) VALUES (?, ?, ?)",
-                (int(row['seccional']), row['seccional'], row['geometry'].wkt)
-            )
+        with stage('seccionales', rows=len(gdf)):
+            insert_seccionales(conn, gdf)
 
         # Insert agrupaciones
         print("  Inserting agrupaciones...")
@@ -109,12 +390,13 @@ def load_to_database(df: pd.DataFrame, gdf: gpd.GeoDataFrame) -> None:
         colors = get_party_colors()
 
         agrupaciones = df['agrupacion'].unique()
-        for agrupacion in agrupaciones:
-            color = colors.get(agrupacion, '#808080')
-            conn.execute(
-                "INSERT OR IGNORE INTO agrupaciones (nombre, color) VALUES (?, ?)",
-                (agrupacion, color)
-            )
+        with stage('agrupaciones', rows=len(agrupaciones)):
+            for agrupacion in agrupaciones:
+                color = colors.get(agrupacion, '#808080')
+                conn.execute(
+                    "INSERT OR IGNORE INTO agrupaciones (nombre, color) VALUES (?, ?)",
+                    (agrupacion, color)
+                )
 
         # Get agrupacion IDs
         agrupacion_ids = {}
@@ -122,33 +404,226 @@ def load_to_database(df: pd.DataFrame, gdf: gpd.GeoDataFrame) -> None:
         for row in cursor:
             agrupacion_ids[row[1]] = row[0]
 
+        # Replace the loaded years so re-running the pipeline does not duplicate rows
+        anios = [int(anio) for anio in df['anio'].unique()]
+        conn.execute(
+            f"DELETE FROM resultados WHERE anio IN ({','.join('?' * len(anios))})",
+            anios
+        )
+
         # Insert resultados
         print("  Inserting resultados...")
-        for _, row in df.iterrows():
-            seccional_id = int(row['seccional'])
-            agrupacion_id = agrupacion_ids[row['agrupacion']]
-
-            conn.execute("""
-                INSERT INTO resultados
-                (anio, cargo, seccional_id, agrupacion_id, votos, porcentaje, total_votos)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                row['anio'],
-                row['cargo'],
-                seccional_id,
-                agrupacion_id,
-                row['votos'],
-                row.get('porcentaje'),
-                row.get('total_votos')
-            ))
-
-        conn.commit()
+        with stage('resultados', rows=len(df)):
+            for _, row in df.iterrows():
+                seccional_id = int(row['seccional'])
+                agrupacion_id = agrupacion_ids[row['agrupacion']]
+
+                conn.execute("""
+                    INSERT INTO resultados
+                    (anio, cargo, seccional_id, agrupacion_id, votos, porcentaje, total_votos)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    row['anio'],
+                    row['cargo'],
+                    seccional_id,
+                    agrupacion_id,
+                    row['votos'],
+                    row.get('porcentaje'),
+                    row.get('total_votos')
+                ))
+
+        print("  Refreshing summary tables...")
+        with stage('summary_tables'):
+            refresh_summary_tables(conn, anios)
+
+        with stage('commit'):
+            conn.commit()
         print(f"[OK] Database saved to: {settings.DATABASE_FILE}")
 
     finally:
         conn.close()
 
 
+MESA_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS agrupaciones (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre TEXT NOT NULL UNIQUE,
+        color TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS resultados_mesa (
+        anio INTEGER NOT NULL,
+        cargo TEXT NOT NULL,
+        seccional_id INTEGER NOT NULL,
+        circuito TEXT NOT NULL,
+        mesa TEXT NOT NULL,
+        agrupacion_id INTEGER NOT NULL,
+        votos INTEGER NOT NULL,
+        FOREIGN KEY (agrupacion_id) REFERENCES agrupaciones(id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_resultados_mesa_anio_circuito ON resultados_mesa(anio, circuito, mesa)",
+    """
+    CREATE TABLE IF NOT EXISTS resultados_circuito (
+        anio INTEGER NOT NULL,
+        cargo TEXT NOT NULL,
+        seccional_id INTEGER NOT NULL,
+        circuito TEXT NOT NULL,
+        agrupacion_id INTEGER NOT NULL,
+        votos INTEGER NOT NULL,
+        PRIMARY KEY (anio, cargo, circuito, agrupacion_id)
+    ) WITHOUT ROWID
+    """,
+]
+
+
+class MesaResultsWriter:
+    """
+    Append streamed, normalized chunks to SQLite and a Parquet file.
+
+    Each chunk is written as one SQLite transaction and one Parquet row
+    group, so memory stays bounded by the chunk size. Years are replaced
+    the first time they appear in the stream, in both outputs: the Parquet
+    file is written aside and, on exit, the other years' rows are copied
+    over from the previous file before it is replaced. Parquet output
+    needs pyarrow; without it only SQLite is written.
+
+    Use as a context manager:
+
+        with MesaResultsWriter() as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, database=settings.DATABASE_FILE, parquet_path=settings.MESA_PARQUET):
+        self.database = database
+        self.parquet_path = Path(parquet_path)
+        self.rows_written = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._parquet_writer = None
+        self._agrupacion_ids = {}
+        self._years_seen = set()
+
+    def __enter__(self) -> 'MesaResultsWriter':
+        self._conn = sqlite3.connect(self.database)
+        for statement in MESA_SCHEMA:
+            self._conn.execute(statement)
+        self._agrupacion_ids = {nombre: id_ for id_, nombre in self._conn.execute("SELECT id, nombre FROM agrupaciones")}
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._parquet_writer is not None:
+            self._close_parquet()
+        if self._conn is not None:
+            if exc_type is None:
+                self._conn.commit()
+            self._conn.close()
+
+    def _party_ids(self, parties) -> dict:
+        from .utils import get_party_colors
+
+        new = [p for p in parties if p not in self._agrupacion_ids]
+        if new:
+            colors = get_party_colors()
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO agrupaciones (nombre, color) VALUES (?, ?)",
+                [(p, colors.get(p, '#808080')) for p in new]
+            )
+            placeholders = ','.join('?' * len(new))
+            self._agrupacion_ids.update(
+                {nombre: id_ for id_, nombre in
+                 self._conn.execute(f"SELECT id, nombre FROM agrupaciones WHERE nombre IN ({placeholders})", new)}
+            )
+        return self._agrupacion_ids
+
+    def _replace_new_years(self, anios) -> None:
+        for anio in set(int(a) for a in anios) - self._years_seen:
+            self._conn.execute("DELETE FROM resultados_mesa WHERE anio = ?", (anio,))
+            self._conn.execute("DELETE FROM resultados_circuito WHERE anio = ?", (anio,))
+            self._years_seen.add(anio)
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        """Write one normalized mesa-level chunk."""
+        if chunk.empty:
+            return
+
+        self._replace_new_years(chunk['anio'].unique())
+        ids = self._party_ids(chunk['agrupacion'].unique())
+        self._conn.executemany(
+            """
+            INSERT INTO resultados_mesa (anio, cargo, seccional_id, circuito, mesa, agrupacion_id, votos)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            zip(chunk['anio'].tolist(), chunk['cargo'].tolist(), chunk['seccional'].astype(int).tolist(),
+                chunk['circuito'].tolist(), chunk['mesa'].tolist(),
+                chunk['agrupacion'].map(ids).tolist(), chunk['votos'].tolist())
+        )
+        self._conn.commit()
+
+        self._write_parquet(chunk)
+        self.rows_written += len(chunk)
+
+    def _write_parquet(self, chunk: pd.DataFrame) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            return
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self._parquet_tmp, table.schema, compression='zstd')
+        self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+
+    @property
+    def _parquet_tmp(self) -> Path:
+        return self.parquet_path.with_name(self.parquet_path.name + '.tmp')
+
+    def _close_parquet(self) -> None:
+        """
+        Copy over the years this run did not write, then replace the file.
+
+        Done on errors too: the SQLite chunks are already committed, and
+        the Parquet file mirrors them.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        writer, self._parquet_writer = self._parquet_writer, None
+        try:
+            if self.parquet_path.exists():
+                previous = pq.ParquetFile(self.parquet_path)
+                replaced = pa.array(sorted(self._years_seen), type=writer.schema.field('anio').type)
+                for group in range(previous.num_row_groups):
+                    table = previous.read_row_group(group).cast(writer.schema)
+                    table = table.filter(pc.invert(pc.is_in(table['anio'], value_set=replaced)))
+                    if table.num_rows:
+                        writer.write_table(table)
+        finally:
+            writer.close()
+        os.replace(self._parquet_tmp, self.parquet_path)
+
+    def write_circuit_totals(self, df: pd.DataFrame) -> None:
+        """Store circuit-level aggregates produced by the stream."""
+        if df.empty:
+            return
+
+        self._replace_new_years(df['anio'].unique())
+        ids = self._party_ids(df['agrupacion'].unique())
+        self._conn.executemany(
+            """
+            INSERT OR REPLACE INTO resultados_circuito (anio, cargo, seccional_id, circuito, agrupacion_id, votos)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            zip(df['anio'].tolist(), df['cargo'].tolist(), df['seccional'].astype(int).tolist(),
+                df['circuito'].tolist(), df['agrupacion'].map(ids).tolist(), df['votos'].tolist())
+        )
+        self._conn.commit()
+
+
 def load_all(df: pd.DataFrame, gdf: gpd.GeoDataFrame) -> None:
     """
     Load data to all destinations (CSV, GeoJSON, Database).
@@ -158,8 +633,10 @@ def load_all(df: pd.DataFrame, gdf: gpd.GeoDataFrame) -> None:
         gdf: Processed geodataframe
     """
     load_to_csv(df)
-    load_geojson(gdf)
-    load_to_database(df, gdf)
+    with stage('geometry'):
+        load_geojson(gdf)
+    with stage('database'):
+        load_to_database(df, gdf)
     print("\n[OK] All data loaded successfully!")
 
 
@@ -0,0 +1,294 @@
+"""
+Synthetic election generator for load and scale testing.
+
+Produces seeded, reproducible elections in the repository's own schemas:
+
+- raw per-year result workbooks in the layout extract_electoral_data reads
+  (año, cargo, seccional="Seccional N", agrupacion with raw spellings,
+  diputados), as .xlsx or .csv
+- raw mesa-level result files for the streaming pipeline (adds circuito
+  and mesa columns)
+- circuit polygons with the properties of Seccionales_Circuitos.geojson
+
+Seccional results are the exact sums of the mesa results. Party support
+is drawn per year city-wide and perturbed per seccional and per mesa, so
+winners vary across zones.
+
+Usage:
+    python -m src.etl.synthetic OUTPUT_DIR [--years 6] [--seccionales 56] ...
+"""
+import argparse
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from shapely.geometry import MultiPoint, box
+
+from src.config import settings
+from .utils import get_party_normalization
+
+CARGO = 'DIPUTADOS NACIONALES'
+RAW_COLUMNS = ['año', 'cargo', 'seccional', 'agrupacion', 'diputados']
+RAW_MESA_COLUMNS = ['año', 'cargo', 'seccional', 'circuito', 'mesa', 'agrupacion', 'diputados']
+
+# Extent of the generated city, in degrees around settings.CORDOBA_CENTER
+CITY_HALF_WIDTH = 0.12
+CITY_HALF_HEIGHT = 0.10
+
+
+def circuit_code(seccional: int, index: int) -> str:
+    """Circuit code in the GeoJSON style: 14P, 14Q, ... then 14A1, 14B1."""
+    letter = chr(ord('A') + index % 26)
+    return f"{seccional}{letter}{index // 26 or ''}"
+
+
+@dataclass
+class SyntheticElection:
+    """
+    Parameters of a synthetic election series.
+
+    Attributes:
+        years: Number of elections (2021, 2023, ...)
+        parties: Parties per election
+        seccionales: Number of seccionales
+        circuits: Circuits per seccional
+        mesas: Mesas per circuit
+        vertices: Approximate vertices per polygon edge
+        voters: Mean voters per mesa
+        seed: Random seed; equal parameters give identical outputs
+    """
+    years: int = 3
+    parties: int = 8
+    seccionales: int = 14
+    circuits: int = 8
+    mesas: int = 10
+    vertices: int = 16
+    voters: int = 300
+    seed: int = 0
+
+    @property
+    def anios(self) -> List[int]:
+        return [2021 + 2 * i for i in range(self.years)]
+
+    @property
+    def party_names(self) -> List[str]:
+        """Normalized party names: real ones first, then numbered ones."""
+        real = ['HACEMOS POR CÓRDOBA', 'JUNTOS POR EL CAMBIO', 'LA LIBERTAD AVANZA',
+                'UNIÓN POR LA PATRIA', 'FRENTE DE IZQUIERDA', 'ENCUENTRO VECINAL CÓRDOBA']
+        return (real + [f'AGRUPACION {i + 1}' for i in range(len(real), self.parties)])[:self.parties]
+
+    def raw_party_names(self) -> List[str]:
+        """Party names as spelled in the raw files (first raw variant per party)."""
+        raw = {}
+        for original, normalized in get_party_normalization().items():
+            raw.setdefault(normalized, original)
+        return [raw.get(name, name) for name in self.party_names]
+
+    def seccional_mapping(self) -> Dict[str, Optional[str]]:
+        """seccional_names.json equivalent covering every generated seccional."""
+        mapping = {f'Seccional {s}': str(s) for s in range(1, self.seccionales + 1)}
+        mapping['Seccional'] = None
+        return mapping
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+
+    def _mesa_votes(self) -> np.ndarray:
+        """Votes with shape (years, seccionales, circuits, mesas, parties)."""
+        rng = np.random.default_rng(self.seed)
+        shape = (self.years, self.seccionales, self.circuits, self.mesas)
+
+        city = rng.dirichlet(np.full(self.parties, 2.0), size=self.years)
+        seccional = np.stack([rng.dirichlet(city[y] * 40 + 0.05, size=self.seccionales)
+                              for y in range(self.years)])
+        mesa = rng.dirichlet(np.ones(self.parties) * 200, size=shape) * seccional[:, :, None, None, :]
+        mesa /= mesa.sum(axis=-1, keepdims=True)
+
+        voters = rng.poisson(self.voters, size=shape)
+        return rng.multinomial(voters, mesa)
+
+    def mesa_results(self, raw: bool = True) -> pd.DataFrame:
+        """
+        Mesa-level results.
+
+        Args:
+            raw: Raw layout (RAW_MESA_COLUMNS, "Seccional N", raw party
+                spellings) instead of the normalized mesa schema
+
+        Returns:
+            One row per (anio, seccional, circuito, mesa, agrupacion)
+        """
+        votes = self._mesa_votes()
+        idx = np.indices(votes.shape).reshape(votes.ndim, -1)
+        seccional = idx[1] + 1
+        circuito = np.array([circuit_code(s, c) for s, c in zip(seccional, idx[2])])
+        names = self.raw_party_names() if raw else self.party_names
+
+        df = pd.DataFrame({
+            'anio': np.asarray(self.anios)[idx[0]],
+            'cargo': CARGO,
+            'seccional': [f'Seccional {s}' for s in seccional] if raw else seccional.astype(str),
+            'circuito': circuito,
+            'mesa': idx[3] + 1,
+            'agrupacion': np.asarray(names)[idx[4]],
+            'votos': votes.reshape(-1),
+        })
+        return df.rename(columns={'anio': 'año', 'votos': 'diputados'}) if raw else df
+
+    def results(self) -> pd.DataFrame:
+        """Seccional-level results in the processed schema (RESULT_COLUMNS)."""
+        votes = self._mesa_votes().sum(axis=(2, 3))
+        idx = np.indices(votes.shape).reshape(votes.ndim, -1)
+        return pd.DataFrame({
+            'anio': np.asarray(self.anios)[idx[0]],
+            'cargo': CARGO,
+            'seccional': (idx[1] + 1).astype(str),
+            'agrupacion': np.asarray(self.party_names)[idx[2]],
+            'votos': votes.reshape(-1),
+        })
+
+    def raw_results(self) -> List[pd.DataFrame]:
+        """Per-year frames in the layout extract_electoral_data returns."""
+        df = self.results()
+        raw_names = dict(zip(self.party_names, self.raw_party_names()))
+        df['seccional'] = 'Seccional ' + df['seccional']
+        df['agrupacion'] = df['agrupacion'].map(raw_names)
+        df = df.rename(columns={'anio': 'año', 'votos': 'diputados'})[RAW_COLUMNS]
+        return [group.reset_index(drop=True) for _, group in df.groupby('año', sort=True)]
+
+    # ------------------------------------------------------------------
+    # Geometry
+    # ------------------------------------------------------------------
+
+    def circuits_frame(self) -> gpd.GeoDataFrame:
+        """
+        Circuit polygons with Seccionales_Circuitos.geojson properties.
+
+        Seccionales are Voronoi cells of random seeds over the city extent;
+        each is split into Voronoi cells of its own circuit seeds, so the
+        circuits of a seccional tile it and dissolve back into it.
+        """
+        rng = np.random.default_rng(self.seed + 1)
+        lat0, lon0 = settings.CORDOBA_CENTER
+        extent = box(lon0 - CITY_HALF_WIDTH, lat0 - CITY_HALF_HEIGHT,
+                     lon0 + CITY_HALF_WIDTH, lat0 + CITY_HALF_HEIGHT)
+
+        seccional_cells = _voronoi_cells(_random_points(rng, extent, self.seccionales), extent)
+        step = np.sqrt(extent.area / (self.seccionales * self.circuits)) / max(self.vertices, 1)
+
+        records, geometries = [], []
+        for s, cell in enumerate(seccional_cells, start=1):
+            circuit_cells = _voronoi_cells(_random_points(rng, cell, self.circuits), cell)
+            for c, geometry in enumerate(circuit_cells):
+                code = circuit_code(s, c)
+                records.append({
+                    'Nombre': f'Seccional {s} Circuito {code[len(str(s)):]}',
+                    'Descripcion': f'BARRIO {code}',
+                    'Seccional': str(s),
+                    'Circuito': code,
+                    'Seccion': 1,
+                    'Secnom': 'Capital',
+                    'union': f'Seccional {s}',
+                })
+                geometries.append(shapely.segmentize(geometry, step))
+
+        return gpd.GeoDataFrame(records, geometry=geometries, crs='EPSG:4326')
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def write(self, output_dir: Path, fmt: str = 'xlsx', mesa_level: bool = True) -> Dict[str, Path]:
+        """
+        Write raw inputs to a directory.
+
+        Files: {anio}_porseccional_diputados.{fmt} per year,
+        {anio}_pormesa_diputados.csv per year (with mesa_level),
+        Seccionales_Circuitos.geojson and seccional_names.json.
+
+        Args:
+            output_dir: Target directory (created if missing)
+            fmt: 'xlsx' or 'csv' for the seccional-level files
+            mesa_level: Also write mesa-level CSVs
+
+        Returns:
+            Mapping of a short key (e.g. 'seccional_2023') to the file path
+        """
+        if fmt not in ('xlsx', 'csv'):
+            raise ValueError(f"Unsupported format '{fmt}' (available: xlsx, csv)")
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = {}
+
+        for df in self.raw_results():
+            anio = int(df['año'].iloc[0])
+            path = output_dir / f'{anio}_porseccional_diputados.{fmt}'
+            if fmt == 'xlsx':
+                df.to_excel(path, index=False, engine='openpyxl')
+            else:
+                df.to_csv(path, index=False, encoding='utf-8')
+            paths[f'seccional_{anio}'] = path
+
+        if mesa_level:
+            mesas = self.mesa_results()
+            for anio, df in mesas.groupby('año', sort=True):
+                path = output_dir / f'{anio}_pormesa_diputados.csv'
+                df.to_csv(path, index=False, encoding='utf-8')
+                paths[f'mesa_{anio}'] = path
+
+        paths['geojson'] = output_dir / 'Seccionales_Circuitos.geojson'
+        self.circuits_frame().to_file(paths['geojson'], driver='GeoJSON', encoding='utf-8')
+
+        paths['seccional_mapping'] = output_dir / 'seccional_names.json'
+        paths['seccional_mapping'].write_text(
+            json.dumps(self.seccional_mapping(), ensure_ascii=False, indent=2), encoding='utf-8'
+        )
+        return paths
+
+
+def _random_points(rng: np.random.Generator, polygon, n: int) -> np.ndarray:
+    """n distinct random points inside a polygon (rejection sampling)."""
+    minx, miny, maxx, maxy = polygon.bounds
+    points = np.empty((0, 2))
+    while len(points) < n:
+        candidates = rng.uniform((minx, miny), (maxx, maxy), size=(max(2 * n, 16), 2))
+        inside = shapely.contains_xy(polygon, candidates[:, 0], candidates[:, 1])
+        points = np.unique(np.vstack([points, candidates[inside]]), axis=0)
+    return points[rng.permutation(len(points))[:n]]
+
+
+def _voronoi_cells(points: np.ndarray, extent) -> List:
+    """Voronoi cells of points clipped to extent, in the points' order."""
+    if len(points) == 1:
+        return [extent]
+    cells = shapely.voronoi_polygons(MultiPoint(points), extend_to=extent, ordered=True)
+    cells = shapely.intersection(np.asarray(cells.geoms), extent)
+    return [shapely.make_valid(cell) if not cell.is_valid else cell for cell in cells]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a synthetic election dataset')
+    parser.add_argument('output_dir', type=Path)
+    defaults = SyntheticElection()
+    for name in ('years', 'parties', 'seccionales', 'circuits', 'mesas', 'vertices', 'voters', 'seed'):
+        parser.add_argument(f'--{name}', type=int, default=getattr(defaults, name))
+    parser.add_argument('--format', choices=['xlsx', 'csv'], default='xlsx')
+    parser.add_argument('--no-mesas', action='store_true', help='Skip the mesa-level files')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    election = SyntheticElection(
+        years=args.years, parties=args.parties, seccionales=args.seccionales,
+        circuits=args.circuits, mesas=args.mesas, vertices=args.vertices,
+        voters=args.voters, seed=args.seed,
+    )
+    for key, path in election.write(args.output_dir, args.format, not args.no_mesas).items():
+        print(f"[OK] {key}: {path}")
@@ -1,10 +1,19 @@
 """
 Transform module - Clean and normalize electoral data.
 """
+import numpy as np
 import pandas as pd
 import geopandas as gpd
-from typing import List
-from .utils import normalize_seccional, normalize_party_name, normalize_columns
+from typing import Dict, Iterable, List, Optional
+from src.monitoring.pipeline import stage
+from .coverage import dissolve_coverage
+from .utils import (
+    normalize_seccional, normalize_party_name, normalize_columns,
+    get_seccional_mapping, get_party_normalization,
+)
+
+RESULT_COLUMNS = ['anio', 'cargo', 'seccional', 'agrupacion', 'votos']
+MESA_COLUMNS = ['anio', 'cargo', 'seccional', 'circuito', 'mesa', 'agrupacion', 'votos']
 
 
 def transform_electoral_data(dfs: List[pd.DataFrame]) -> pd.DataFrame:
@@ -12,7 +21,7 @@ def transform_electoral_data(dfs: List[pd.DataFrame]) -> pd.DataFrame:
     Transform and normalize electoral data from multiple years.
 
     Args:
-        dfs: List of dataframes [df_2021, df_2023, df_2025]
+        dfs: List of per-year dataframes (e.g. [df_2021, df_2023, df_2025])
 
     Returns:
         Single normalized dataframe with all years
@@ -21,16 +30,16 @@ def transform_electoral_data(dfs: List[pd.DataFrame]) -> pd.DataFrame:
 
     normalized_dfs = []
 
-    for i, df in enumerate(dfs):
-        year = [2021, 2023, 2025][i]
-        print(f"  Processing {year}...")
-
+    for df in dfs:
         # Make a copy to avoid modifying original
         df = df.copy()
 
         # Normalize column names
         df = normalize_columns(df)
 
+        year = df['anio'].iloc[0] if 'anio' in df.columns and len(df) else '?'
+        print(f"  Processing {year}...")
+
         # Ensure required columns exist
         required_cols = ['anio', 'cargo', 'seccional', 'agrupacion', 'votos']
         missing = [col for col in required_cols if col not in df.columns]
@@ -91,12 +100,9 @@ def transform_geojson(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
 
     print(f"  Input: {len(gdf)} circuits")
 
-    # Fix invalid geometries before dissolving
-    print("  Fixing invalid geometries...")
-    gdf['geometry'] = gdf['geometry'].buffer(0)
-
-    # Dissolve circuits into seccionales
-    gdf_seccionales = gdf.dissolve(by='Seccional', as_index=False)
+    # Repair the circuit coverage (cached) and merge along shared edges
+    with stage('dissolve', rows=len(gdf)):
+        gdf_seccionales = dissolve_coverage(gdf, by='Seccional')
 
     # Keep only essential columns
     gdf_seccionales = gdf_seccionales[['Seccional', 'geometry']].copy()
@@ -114,29 +120,189 @@ def transform_geojson(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
     return gdf_seccionales
 
 
-def calculate_percentages(df: pd.DataFrame) -> pd.DataFrame:
+def normalize_results_chunk(df: pd.DataFrame,
+                            seccional_mapping: Optional[Dict[str, Optional[str]]] = None,
+                            party_mapping: Optional[Dict[str, str]] = None) -> pd.DataFrame:
     """
-    Calculate vote percentages for each seccional/year combination.
+    Normalize one streamed chunk of results with vectorized lookups.
+
+    Unlike transform_electoral_data, the mapping files are loaded once by
+    the caller and applied with Series.map, so each chunk costs O(rows)
+    without per-row JSON reads. Mesa-level chunks keep their circuito and
+    mesa columns; bare numeric seccionales ("5") are accepted as-is.
 
     Args:
-        df: Electoral dataframe
+        df: Raw chunk from extract.iter_result_chunks
+        seccional_mapping: Seccional name mapping (loaded if not provided)
+        party_mapping: Party normalization mapping (loaded if not provided)
 
     Returns:
-        DataFrame with added percentage columns
+        Chunk with MESA_COLUMNS (mesa-level) or RESULT_COLUMNS, without
+        total rows or rows with missing votes
     """
-    print("[TRANSFORM] Calculating percentages...")
+    if seccional_mapping is None:
+        seccional_mapping = get_seccional_mapping()
+    if party_mapping is None:
+        party_mapping = get_party_normalization()
+
+    df = normalize_columns(df)
+    columns = MESA_COLUMNS if 'mesa' in df.columns else RESULT_COLUMNS
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns {missing} in results chunk")
+
+    df = df[columns]
+    seccional = df['seccional'].astype(str).str.strip()
+    mapped = seccional.map(seccional_mapping)
+    numeric = seccional.where(seccional.str.fullmatch(r'\d+'))
+    seccional = mapped.fillna(numeric.str.lstrip('0'))
+
+    agrupacion = df['agrupacion'].astype(str).str.strip()
+    votos = pd.to_numeric(df['votos'], errors='coerce')
+
+    out = {
+        'anio': pd.to_numeric(df['anio'], errors='coerce'),
+        'cargo': df['cargo'].astype(str).str.strip(),
+        'seccional': seccional,
+    }
+    if columns is MESA_COLUMNS:
+        out['circuito'] = df['circuito'].fillna('').astype(str).str.strip().str.upper()
+        out['mesa'] = df['mesa'].fillna('').astype(str).str.strip()
+    out['agrupacion'] = agrupacion.map(party_mapping).fillna(agrupacion)
+    out['votos'] = votos
+
+    chunk = pd.DataFrame(out)
+    chunk = chunk[chunk['seccional'].notna() & chunk['votos'].notna() & chunk['anio'].notna()]
+    return chunk.astype({'anio': 'int64', 'votos': 'int64'})
+
+
+class StreamingAggregator:
+    """
+    Running circuit and seccional vote totals over a stream of chunks.
 
-    df = df.copy()
+    Each chunk is reduced with a groupby before being folded into the
+    running totals, so memory is bounded by the number of distinct
+    (year, zone, party) keys rather than by the number of mesa rows.
+    """
+
+    SECCIONAL_KEYS = ['anio', 'cargo', 'seccional', 'agrupacion']
+    CIRCUITO_KEYS = ['anio', 'cargo', 'seccional', 'circuito', 'agrupacion']
+
+    def __init__(self):
+        self._seccional: Optional[pd.Series] = None
+        self._circuito: Optional[pd.Series] = None
+        self.rows = 0
+
+    @staticmethod
+    def _fold(total: Optional[pd.Series], part: pd.Series) -> pd.Series:
+        return part if total is None else total.add(part, fill_value=0)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Fold one normalized chunk into the running totals."""
+        self.rows += len(chunk)
+        self._seccional = self._fold(self._seccional, chunk.groupby(self.SECCIONAL_KEYS, sort=False)['votos'].sum())
+        if 'circuito' in chunk.columns:
+            self._circuito = self._fold(self._circuito, chunk.groupby(self.CIRCUITO_KEYS, sort=False)['votos'].sum())
+
+    def seccional_results(self) -> pd.DataFrame:
+        """Seccional-level results in the shape transform_electoral_data returns."""
+        if self._seccional is None:
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+        df = self._seccional.astype('int64').rename('votos').reset_index()
+        return df.sort_values(['anio', 'seccional', 'votos'], ascending=[True, True, False], ignore_index=True)
+
+    def circuito_results(self) -> pd.DataFrame:
+        """Circuit-level results (empty for seccional-level sources)."""
+        if self._circuito is None:
+            return pd.DataFrame(columns=self.CIRCUITO_KEYS + ['votos'])
+        df = self._circuito.astype('int64').rename('votos').reset_index()
+        return df.sort_values(['anio', 'circuito', 'votos'], ascending=[True, True, False], ignore_index=True)
+
+
+# Pseudo-party rows that are not votes for a list
+BLANK_VOTES = {'VOTOS EN BLANCO', 'EN BLANCO', 'BLANCO'}
+NULL_VOTES = {'VOTOS NULOS', 'NULOS', 'VOTOS RECURRIDOS', 'RECURRIDOS', 'VOTOS IMPUGNADOS', 'IMPUGNADOS'}
+
+# Denominator name -> rows of `agrupacion` excluded from it
+DENOMINATORS = {
+    'total': set(),
+    'validos': NULL_VOTES,
+    'positivos': NULL_VOTES | BLANK_VOTES,
+}
+
+# Grouping name -> key columns; '' is the default seccional grouping
+GROUPINGS = {
+    '': ['anio', 'seccional'],
+    'ciudad': ['anio'],
+}
+
+
+def _share_columns(denominator: str, grouping: str):
+    """Output column names for one (denominator, grouping) pair."""
+    suffix = f'_{grouping}' if grouping else ''
+    if denominator == 'total':
+        return f'total_votos{suffix}', f'porcentaje{suffix}'
+    return f'total_{denominator}{suffix}', f'porcentaje_{denominator}{suffix}'
+
+
+def calculate_percentages(df: pd.DataFrame,
+                          denominators: Iterable[str] = ('total',),
+                          groupings: Optional[Dict[str, List[str]]] = None) -> pd.DataFrame:
+    """
+    Calculate vote shares for each grouping and denominator, in place.
 
-    # Calculate total votes per seccional/year
-    totals = df.groupby(['anio', 'seccional'])['votos'].sum().reset_index()
-    totals = totals.rename(columns={'votos': 'total_votos'})
+    Group totals are broadcast back to the rows with integer group codes
+    and np.bincount, so no totals frame is built and nothing is merged or
+    copied; only the new total/percentage columns are allocated. With the
+    defaults this adds `total_votos` and `porcentaje` per seccional/year.
 
-    # Merge totals back
-    df = df.merge(totals, on=['anio', 'seccional'], how='left')
+    Rows whose party is in a denominator's excluded set (blank or null
+    votes) get a null percentage for that denominator.
+
+    Args:
+        df: Electoral dataframe (modified in place)
+        denominators: Names from DENOMINATORS ('total', 'validos', 'positivos')
+        groupings: Grouping name -> key columns (default: GROUPINGS['']
+            only); a non-empty name is appended to the column names, e.g.
+            {'ciudad': ['anio']} adds total_votos_ciudad/porcentaje_ciudad
+
+    Returns:
+        The same dataframe with the share columns added
+    """
+    print("[TRANSFORM] Calculating percentages...")
 
-    # Calculate percentage
-    df['porcentaje'] = (df['votos'] / df['total_votos'] * 100).round(2)
+    unknown = set(denominators) - set(DENOMINATORS)
+    if unknown:
+        raise ValueError(f"Unknown denominators {sorted(unknown)} (available: {list(DENOMINATORS)})")
+    groupings = {'': GROUPINGS['']} if groupings is None else groupings
+
+    votos = df['votos'].to_numpy(dtype=np.float64)
+    party = df['agrupacion'].str.upper().str.strip() if any(DENOMINATORS[d] for d in denominators) else None
+
+    for grouping, keys in groupings.items():
+        codes = df.groupby(keys, sort=False, observed=True).ngroup().to_numpy(dtype=np.float64)
+        # Rows with a null key are in no group (ngroup gives NaN): they get null totals
+        grouped = ~np.isnan(codes)
+        codes = np.where(grouped, codes, 0).astype(np.int64)
+        n_groups = codes.max() + 1 if len(codes) else 0
+
+        for denominator in denominators:
+            excluded = DENOMINATORS[denominator]
+            counted = ~party.isin(excluded).to_numpy() if excluded else None
+            weights = votos if counted is None else np.where(counted, votos, 0.0)
+
+            # bincount of nothing (empty frame) is int64: cast so null keys can be masked
+            totals = np.bincount(codes[grouped], weights=weights[grouped], minlength=n_groups)[codes]
+            totals = totals.astype(np.float64)
+            totals[~grouped] = np.nan
+            total_col, pct_col = _share_columns(denominator, grouping)
+            df[total_col] = totals.astype(np.int64) if grouped.all() else totals
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                pct = np.round(votos / totals * 100, 2)
+            if counted is not None:
+                pct[~counted] = np.nan
+            df[pct_col] = pct
 
     print(f"[OK] Calculated percentages")
 
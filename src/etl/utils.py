@@ -78,7 +78,11 @@ COLUMN_MAPPING = {
     'agrupacion': 'agrupacion',
     'seccional': 'seccional',
     'Seccional': 'seccional',
-    'cargo': 'cargo'
+    'cargo': 'cargo',
+    'circuito': 'circuito',
+    'Circuito': 'circuito',
+    'mesa': 'mesa',
+    'Mesa': 'mesa'
 }
 
 
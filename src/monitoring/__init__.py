@@ -0,0 +1,28 @@
+"""
+Runtime instrumentation: metrics registry, Dash request metrics, pipeline
+stage profiling and profiler hooks.
+"""
+from .metrics import REGISTRY, MetricsRegistry, cached, json_logger
+from .pipeline import PipelineRun, stage
+from .profiling import SlowRequestProfiler
+
+__all__ = [
+    'DashMetrics',
+    'instrument_dash_app',
+    'REGISTRY',
+    'MetricsRegistry',
+    'cached',
+    'json_logger',
+    'PipelineRun',
+    'stage',
+    'SlowRequestProfiler',
+]
+
+
+def __getattr__(name):
+    # The Dash request instrumentation (Flask) loads on first use, so the ETL
+    # can import pipeline stages without the web stack
+    if name in ('DashMetrics', 'instrument_dash_app'):
+        from . import instrumentation
+        return getattr(instrumentation, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,144 @@
+"""
+Request instrumentation for the Dash dashboards.
+
+instrument_dash_app() hooks the Flask server behind a Dash app, so every
+request is measured without touching the callbacks themselves. Requests
+to Dash's callback endpoint are attributed to the callback function that
+serves them (looked up from the request's `output` id in
+app.callback_map); other requests are labeled by Flask endpoint.
+"""
+import time
+from typing import Optional
+
+from flask import Response, g, request
+
+from src.config import settings
+from .metrics import REGISTRY, SIZE_BUCKETS, MetricsRegistry, json_logger
+from .profiling import SlowRequestProfiler
+
+CALLBACK_ENDPOINT = '/_dash-update-component'
+# Method label values (any other token the client sends is labelled 'other')
+HTTP_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+class DashMetrics:
+    """Metric families recorded for one registry."""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY):
+        self.callback_duration = registry.histogram(
+            'dash_callback_duration_seconds', 'Dash callback latency.', ['callback'])
+        self.callback_request_bytes = registry.histogram(
+            'dash_callback_request_bytes', 'Dash callback request payload size.', ['callback'], SIZE_BUCKETS)
+        self.callback_response_bytes = registry.histogram(
+            'dash_callback_response_bytes', 'Dash callback response payload size.', ['callback'], SIZE_BUCKETS)
+        self.callback_requests = registry.counter(
+            'dash_callback_requests_total', 'Dash callback requests by status code.', ['callback', 'status'])
+        self.callback_in_flight = registry.gauge(
+            'dash_callback_in_flight', 'Dash callbacks currently executing.', ['callback'])
+        self.http_duration = registry.histogram(
+            'http_request_duration_seconds', 'HTTP request latency (all routes).', ['endpoint', 'method'])
+        self.http_requests = registry.counter(
+            'http_requests_total', 'HTTP requests by status code.', ['endpoint', 'method', 'status'])
+        self.http_in_flight = registry.gauge(
+            'http_requests_in_flight', 'HTTP requests currently being served.')
+
+
+def _callback_name(app, payload: Optional[dict]) -> str:
+    """
+    Name of the callback function behind a callback request.
+
+    The output id comes from the client, so ids the app does not register
+    are all labelled 'unknown' rather than creating one series each.
+    """
+    output = payload.get('output') if isinstance(payload, dict) else None
+    entry = app.callback_map.get(output) if isinstance(output, str) else None
+    if entry is None:
+        return 'unknown'
+    return getattr(entry.get('callback'), '__name__', None) or output
+
+
+def instrument_dash_app(app, registry: MetricsRegistry = REGISTRY,
+                        json_logs: bool = settings.METRICS_JSON_LOGS,
+                        profiler: Optional[SlowRequestProfiler] = None,
+                        metrics_path: str = settings.METRICS_PATH) -> DashMetrics:
+    """
+    Add request metrics, JSON logs, an optional profiler and /metrics.
+
+    Args:
+        app: dash.Dash instance (its Flask server is hooked)
+        registry: Registry that receives the metrics and is exposed
+        json_logs: Emit one JSON log line per callback request
+        profiler: Slow request profiler (default: from settings, off
+            unless PROFILE_SLOW_MS is set)
+        metrics_path: Route serving the Prometheus text format
+
+    Returns:
+        The metric families, e.g. for custom observations
+    """
+    server = app.server
+    metrics = DashMetrics(registry)
+    profiler = SlowRequestProfiler() if profiler is None else profiler
+    logger = json_logger() if json_logs else None
+
+    @server.before_request
+    def _start_request():
+        g.metrics_start = time.perf_counter()
+        metrics.http_in_flight.inc()
+
+        g.metrics_callback = None
+        if request.path == CALLBACK_ENDPOINT:
+            g.metrics_callback = _callback_name(app, request.get_json(silent=True))
+            metrics.callback_in_flight.inc(callback=g.metrics_callback)
+            g.metrics_profile = profiler.start()
+
+    @server.after_request
+    def _record_request(response):
+        elapsed = time.perf_counter() - g.get('metrics_start', time.perf_counter())
+        endpoint = request.endpoint or 'unmatched'
+        method = request.method if request.method in HTTP_METHODS else 'other'
+        status = str(response.status_code)
+        metrics.http_duration.observe(elapsed, endpoint=endpoint, method=method)
+        metrics.http_requests.inc(endpoint=endpoint, method=method, status=status)
+
+        name = g.get('metrics_callback')
+        if name is None:
+            return response
+
+        request_bytes = request.content_length or 0
+        response_bytes = response.calculate_content_length() or 0
+        metrics.callback_duration.observe(elapsed, callback=name)
+        metrics.callback_request_bytes.observe(request_bytes, callback=name)
+        metrics.callback_response_bytes.observe(response_bytes, callback=name)
+        metrics.callback_requests.inc(callback=name, status=status)
+
+        profile_path = profiler.finish(g.pop('metrics_profile', None), elapsed, name)
+        if logger is not None:
+            logger.info({
+                'event': 'dash_callback',
+                'callback': name,
+                'status': response.status_code,
+                'duration_ms': round(elapsed * 1000, 2),
+                'request_bytes': request_bytes,
+                'response_bytes': response_bytes,
+                'profile': str(profile_path) if profile_path else None,
+            })
+        return response
+
+    @server.teardown_request
+    def _end_request(exc):
+        # Runs even when a view raised, so gauges and profiles never leak
+        if g.get('metrics_start') is None:
+            return
+        metrics.http_in_flight.dec()
+        session = g.pop('metrics_profile', None)
+        if session is not None:
+            session.stop()
+        name = g.get('metrics_callback')
+        if name is not None:
+            metrics.callback_in_flight.dec(callback=name)
+
+    def _metrics_view():
+        return Response(registry.expose(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+    server.add_url_rule(metrics_path, 'metrics', _metrics_view)
+    return metrics
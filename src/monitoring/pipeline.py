@@ -0,0 +1,221 @@
+"""
+Stage timing and memory profiling for batch pipelines.
+
+Code marks its steps with `with stage('name') as s: ...; s.rows = n`.
+Outside a PipelineRun this is a no-op, so the ETL functions stay usable
+on their own; inside one, every stage records wall time, CPU time, RSS at
+start/end, peak RSS and rows per second. Nested stages get slash-joined
+paths (load/database/resultados).
+
+Peak RSS is sampled by a background thread (psutil when installed, else
+/proc/self/statm), so very short spikes between samples can be missed.
+"""
+import contextvars
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from .profiling import ProfileSession
+
+_current_run: contextvars.ContextVar = contextvars.ContextVar('pipeline_run', default=None)
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, if it can be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def max_rss() -> Optional[int]:
+    """Process lifetime peak RSS in bytes, if it can be read (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    try:
+        import resource  # Unix only
+    except ImportError:
+        try:
+            import psutil
+            return getattr(psutil.Process().memory_info(), 'peak_wset', None)  # Windows
+        except ImportError:
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+@dataclass
+class StageRecord:
+    """Measurements of one stage; `rows` may be set inside the block."""
+    name: str
+    path: str = ''
+    depth: int = 0
+    rows: Optional[int] = None
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rss_start: Optional[int] = None
+    rss_end: Optional[int] = None
+    rss_peak: Optional[int] = None
+    children: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_s(self) -> Optional[float]:
+        if self.rows is None or self.wall_s <= 0:
+            return None
+        return self.rows / self.wall_s
+
+    def to_dict(self) -> dict:
+        record = asdict(self)
+        record['rows_per_s'] = round(self.rows_per_s, 1) if self.rows_per_s is not None else None
+        record['wall_s'] = round(self.wall_s, 6)
+        record['cpu_s'] = round(self.cpu_s, 6)
+        return record
+
+
+class PipelineRun:
+    """
+    Context manager collecting StageRecords for one pipeline execution.
+
+    Args:
+        name: Pipeline name stored in the report
+        sample_interval: Seconds between RSS samples
+        flamegraph: Also profile the whole run and write it here
+            (pyinstrument speedscope JSON, or a cProfile .prof fallback)
+    """
+
+    def __init__(self, name: str, sample_interval: float = 0.01, flamegraph: Optional[Path] = None):
+        self.name = name
+        self.sample_interval = sample_interval
+        self.flamegraph = Path(flamegraph) if flamegraph else None
+        self.stages: List[StageRecord] = []
+        self._stack: List[StageRecord] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._profile: Optional[ProfileSession] = None
+        self._token = None
+        self.root = StageRecord(name)
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.sample_interval):
+            rss = current_rss()
+            if rss is None:
+                return
+            with self._lock:
+                for record in [self.root] + self._stack:
+                    record.rss_peak = max(record.rss_peak or 0, rss)
+
+    def __enter__(self) -> 'PipelineRun':
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.root.rss_start = self.root.rss_peak = current_rss()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._token = _current_run.set(self)
+        self._sampler = threading.Thread(target=self._sample, name='rss-sampler', daemon=True)
+        self._sampler.start()
+        if self.flamegraph:
+            self._profile = ProfileSession()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._profile is not None:
+            self._profile.stop()
+            self.flamegraph.parent.mkdir(parents=True, exist_ok=True)
+            self.flamegraph = self._profile.write(self.flamegraph, speedscope=True)
+        self._stop.set()
+        self._sampler.join()
+        _current_run.reset(self._token)
+        self.root.wall_s = time.perf_counter() - self._wall
+        self.root.cpu_s = time.process_time() - self._cpu
+        self.root.rss_end = current_rss()
+        self.root.rss_peak = max(self.root.rss_peak or 0, self.root.rss_end or 0) or None
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[StageRecord]:
+        parent = self._stack[-1] if self._stack else self.root
+        path = f'{parent.path}/{name}' if parent.path else name
+        record = StageRecord(name, path, len(self._stack), rows)
+        parent.children.append(path)
+
+        record.rss_start = record.rss_peak = current_rss()
+        with self._lock:
+            self._stack.append(record)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_s = time.perf_counter() - wall
+            record.cpu_s = time.process_time() - cpu
+            record.rss_end = current_rss()
+            with self._lock:
+                self._stack.pop()
+                if record.rss_end is not None:
+                    record.rss_peak = max(record.rss_peak or 0, record.rss_end)
+            self.stages.append(record)
+
+    def report(self) -> dict:
+        """JSON-serializable run report; stages in execution (start) order."""
+        order = {path: i for i, path in enumerate(_preorder(self.root, {s.path: s for s in self.stages}))}
+        return {
+            'pipeline': self.name,
+            'started_at': self.started_at,
+            'wall_s': round(self.root.wall_s, 6),
+            'cpu_s': round(self.root.cpu_s, 6),
+            'rss_start': self.root.rss_start,
+            'rss_end': self.root.rss_end,
+            'rss_peak': self.root.rss_peak,
+            'max_rss': max_rss(),
+            'flamegraph': str(self.flamegraph) if self.flamegraph else None,
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+            },
+            'stages': [s.to_dict() for s in sorted(self.stages, key=lambda s: order.get(s.path, 0))],
+        }
+
+    def write_report(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2, ensure_ascii=False), encoding='utf-8')
+        return path
+
+    def summary(self) -> str:
+        """Plain-text table of the stages for console output."""
+        lines = [f"{'stage':<40} {'wall s':>9} {'cpu s':>9} {'peak MB':>9} {'rows/s':>12}"]
+        for record in self.report()['stages']:
+            label = '  ' * record['depth'] + record['name']
+            peak = f"{record['rss_peak'] / 2**20:.1f}" if record['rss_peak'] else '-'
+            rate = f"{record['rows_per_s']:,.0f}" if record['rows_per_s'] else '-'
+            lines.append(f"{label:<40} {record['wall_s']:>9.3f} {record['cpu_s']:>9.3f} {peak:>9} {rate:>12}")
+        return '\n'.join(lines)
+
+
+def _preorder(record: StageRecord, by_path: dict) -> Iterator[str]:
+    for child in record.children:
+        yield child
+        if child in by_path:
+            yield from _preorder(by_path[child], by_path)
+
+
+@contextmanager
+def stage(name: str, rows: Optional[int] = None) -> Iterator[StageRecord]:
+    """Record a stage in the active PipelineRun, or do nothing without one."""
+    run = _current_run.get()
+    if run is None:
+        yield StageRecord(name, rows=rows)
+        return
+    with run.stage(name, rows) as record:
+        yield record
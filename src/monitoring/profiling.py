@@ -0,0 +1,104 @@
+"""
+Optional profiler hook for slow requests.
+
+pyinstrument (a sampling profiler) is used when installed; it is not a
+hard dependency. Without it the hook falls back to cProfile, which is
+deterministic and has more overhead, so keep the sample rate low.
+"""
+import cProfile
+import pstats
+import random
+import re
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.config import settings
+
+
+def _pyinstrument():
+    try:
+        import pyinstrument
+    except ImportError:
+        return None
+    return pyinstrument
+
+
+class ProfileSession:
+    """One running profile (pyinstrument or cProfile)."""
+
+    def __init__(self):
+        pyinstrument = _pyinstrument()
+        if pyinstrument is not None:
+            self.kind = 'pyinstrument'
+            self._profiler = pyinstrument.Profiler(async_mode='disabled')
+            self._profiler.start()
+        else:
+            self.kind = 'cprofile'
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self) -> None:
+        if self.kind == 'cprofile':
+            self._profiler.disable()
+        else:
+            self._profiler.stop()
+
+    def write(self, path: Path, speedscope: bool = False) -> Path:
+        """Write the profile; returns the path with the suffix actually used."""
+        if self.kind == 'cprofile':
+            path = path.with_suffix('.prof')
+            pstats.Stats(self._profiler).dump_stats(path)
+        elif speedscope:
+            from pyinstrument.renderers import SpeedscopeRenderer
+            path = path.with_suffix('.speedscope.json')
+            path.write_text(self._profiler.output(SpeedscopeRenderer()), encoding='utf-8')
+        else:
+            path = path.with_suffix('.html')
+            path.write_text(self._profiler.output_html(), encoding='utf-8')
+        return path
+
+
+class SlowRequestProfiler:
+    """
+    Profile a random sample of requests and keep the slow ones.
+
+    Call start() when a request begins and finish() when it ends; the
+    profile is written only if the request took at least threshold_ms.
+
+    Args:
+        threshold_ms: Minimum duration for a profile to be kept (0 = off)
+        sample_rate: Fraction of requests profiled (0..1)
+        output_dir: Directory for the profile files
+    """
+
+    def __init__(self, threshold_ms: float = settings.PROFILE_SLOW_MS,
+                 sample_rate: float = settings.PROFILE_SAMPLE_RATE,
+                 output_dir: Path = settings.PROFILES_DIR):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.output_dir = Path(output_dir)
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0 and self.sample_rate > 0
+
+    def start(self) -> Optional[ProfileSession]:
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        try:
+            return ProfileSession()
+        except ValueError:
+            # cProfile allows one active profiler per process (Python 3.12+)
+            return None
+
+    def finish(self, session: Optional[ProfileSession], elapsed: float, name: str) -> Optional[Path]:
+        """Stop a session; write it if the request was slow. Returns the file, if any."""
+        if session is None:
+            return None
+        session.stop()
+        if elapsed * 1000 < self.threshold_ms:
+            return None
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9_-]+', '_', name).strip('_')[:80] or 'request'
+        return session.write(self.output_dir / f'{time.strftime("%Y%m%d-%H%M%S")}_{slug}_{elapsed * 1000:.0f}ms')
@@ -1,3 +1,10 @@
 """
 Visualization module for maps, charts, and dashboards.
 """
+from .maps import ElectoralMapGenerator, build_base_geometry, compute_winners
+
+__all__ = [
+    'ElectoralMapGenerator',
+    'build_base_geometry',
+    'compute_winners',
+]
@@ -0,0 +1,271 @@
+"""
+Animated year-slider figure with compact Plotly frames.
+
+The seccional geometry is embedded once, in the base Choroplethmap trace.
+Each animation frame only carries the per-year `z` values and hover
+customdata for that trace, so the output size grows with the number of
+zones per year rather than with the full geometry per year.
+"""
+import gzip
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import geopandas as gpd
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from src.config import settings
+from .maps import PARTY_COLORS, _write_atomic
+
+HOVER_TEMPLATE = (
+    '<b>Seccional %{location}</b><br>'
+    'Ganador: %{customdata[0]}<br>'
+    'Votos: %{customdata[1]:,}<br>'
+    'Porcentaje: %{customdata[2]:.1f}%<extra></extra>'
+)
+
+
+def round_coordinates(coords, precision: int):
+    """Recursively round a GeoJSON coordinate array."""
+    if coords and isinstance(coords[0], (int, float)):
+        return [round(c, precision) for c in coords]
+    return [round_coordinates(c, precision) for c in coords]
+
+
+def compact_geojson(base: gpd.GeoDataFrame, precision: int = 5) -> dict:
+    """
+    Build a minimal FeatureCollection keyed by Seccional.
+
+    Properties are dropped and coordinates rounded to `precision` decimals
+    (5 decimals is about 1 m at Córdoba's latitude).
+
+    Args:
+        base: Seccional geometry with a Seccional column
+        precision: Decimals kept in coordinates
+
+    Returns:
+        GeoJSON dict whose features use the seccional as `id`
+    """
+    features = []
+    for seccional, geometry in zip(base['Seccional'], base.geometry):
+        geo = geometry.__geo_interface__
+        features.append({
+            'type': 'Feature',
+            'id': str(seccional),
+            'properties': {},
+            'geometry': {'type': geo['type'], 'coordinates': round_coordinates(geo['coordinates'], precision)}
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def party_color_index(parties: Iterable[str]) -> Dict[str, int]:
+    """Stable party -> integer code mapping used as the choropleth `z`."""
+    return {party: i for i, party in enumerate(sorted(set(parties)))}
+
+
+def discrete_colorscale(party_index: Dict[str, int]) -> list:
+    """Piecewise-constant colorscale so code i is painted with party i's color."""
+    n = max(len(party_index), 1)
+    colors = [PARTY_COLORS.get(party, PARTY_COLORS['DEFAULT']) for party in party_index] or [PARTY_COLORS['DEFAULT']]
+    scale = []
+    for i, color in enumerate(colors):
+        scale.append([i / n, color])
+        scale.append([(i + 1) / n, color])
+    return scale
+
+
+def year_frame_data(ganadores: pd.DataFrame, year: int, locations: List[str],
+                    party_index: Dict[str, int]) -> dict:
+    """
+    Per-year arrays for the choropleth trace: z codes and hover customdata.
+
+    Seccionales without data get a null z and 'N/D' in the hover.
+    """
+    gan_year = ganadores[ganadores['anio'] == year].set_index('seccional').reindex(locations)
+
+    z = [party_index.get(party) if pd.notna(party) else None for party in gan_year['agrupacion']]
+    customdata = [
+        [party if pd.notna(party) else 'N/D',
+         int(votos) if pd.notna(votos) else 0,
+         float(pct) if pd.notna(pct) else 0.0]
+        for party, votos, pct in zip(gan_year['agrupacion'], gan_year['votos'], gan_year['porcentaje'])
+    ]
+    return {'z': z, 'customdata': customdata}
+
+
+def build_animation_figure(base: gpd.GeoDataFrame, ganadores: pd.DataFrame,
+                           years: Optional[List[int]] = None, precision: int = 5) -> go.Figure:
+    """
+    Build the year-slider figure with geometry only in the base trace.
+
+    Args:
+        base: Seccional geometry (Seccional, lat, lon, geometry)
+        ganadores: Winners per (anio, seccional)
+        years: Years to animate (default: all years in ganadores)
+        precision: Decimals kept in geometry coordinates
+
+    Returns:
+        Plotly figure with one compact frame per year
+    """
+    years = sorted(ganadores['anio'].unique()) if years is None else list(years)
+    locations = [str(s) for s in base['Seccional']]
+    party_index = party_color_index(ganadores['agrupacion'].dropna())
+    frame_data = {year: year_frame_data(ganadores, year, locations, party_index) for year in years}
+
+    first = frame_data[years[0]]
+    choropleth = go.Choroplethmap(
+        geojson=compact_geojson(base, precision),
+        locations=locations,
+        z=first['z'],
+        customdata=first['customdata'],
+        zmin=-0.5,
+        zmax=max(len(party_index), 1) - 0.5,
+        colorscale=discrete_colorscale(party_index),
+        showscale=False,
+        marker_opacity=0.6,
+        marker_line_width=1.5,
+        marker_line_color='#2E86AB',
+        hovertemplate=HOVER_TEMPLATE,
+        name='seccionales'
+    )
+
+    # Label positions never change between years, so they live only in the base figure
+    labels = go.Scattermap(
+        lat=[round(lat, precision) for lat in base['lat']],
+        lon=[round(lon, precision) for lon in base['lon']],
+        mode='text',
+        text=[f'Seccional {s}' for s in locations],
+        textfont=dict(size=13, color='#1a1a1a', family='Arial'),
+        hoverinfo='skip',
+        showlegend=False,
+        name='labels'
+    )
+
+    frames = [
+        go.Frame(
+            data=[go.Choroplethmap(z=frame_data[year]['z'], customdata=frame_data[year]['customdata'])],
+            traces=[0],
+            name=str(year),
+            layout=go.Layout(title_text=f'Elecciones {year} - Córdoba Capital')
+        )
+        for year in years
+    ]
+
+    fig = go.Figure(data=[choropleth, labels], frames=frames)
+    fig.update_layout(
+        map_style="carto-positron",
+        map_zoom=11.8,
+        map_center={"lat": settings.CORDOBA_CENTER[0], "lon": settings.CORDOBA_CENTER[1]},
+        margin={"r": 0, "t": 80, "l": 0, "b": 100},
+        title={
+            'text': f'Evolución Electoral Córdoba Capital {years[0]}-{years[-1]}',
+            'x': 0.5,
+            'xanchor': 'center',
+            'font': {'size': 20, 'family': 'Arial', 'color': '#333'}
+        },
+        height=750,
+        hoverlabel=dict(
+            bgcolor="white",
+            font_size=13,
+            font_family="Arial"
+        ),
+        sliders=[{
+            'active': 0,
+            'yanchor': 'top',
+            'y': 0,
+            'xanchor': 'left',
+            'x': 0.1,
+            'currentvalue': {
+                'prefix': 'Año: ',
+                'visible': True,
+                'xanchor': 'center',
+                'font': {'size': 18, 'color': '#333'}
+            },
+            'pad': {'b': 10, 't': 50},
+            'len': 0.8,
+            'steps': [
+                {
+                    'args': [
+                        [str(year)],
+                        {
+                            'frame': {'duration': 500, 'redraw': True},
+                            'mode': 'immediate',
+                            'transition': {'duration': 300}
+                        }
+                    ],
+                    'label': str(year),
+                    'method': 'animate'
+                }
+                for year in years
+            ]
+        }],
+        updatemenus=[{
+            'type': 'buttons',
+            'showactive': False,
+            'y': 0.02,
+            'x': 0.95,
+            'xanchor': 'right',
+            'yanchor': 'bottom',
+            'buttons': [
+                {
+                    'label': '▶ Play',
+                    'method': 'animate',
+                    'args': [
+                        None,
+                        {
+                            'frame': {'duration': 1500, 'redraw': True},
+                            'fromcurrent': True,
+                            'transition': {'duration': 500}
+                        }
+                    ]
+                },
+                {
+                    'label': '⏸ Pause',
+                    'method': 'animate',
+                    'args': [
+                        [None],
+                        {
+                            'frame': {'duration': 0, 'redraw': False},
+                            'mode': 'immediate',
+                            'transition': {'duration': 0}
+                        }
+                    ]
+                }
+            ]
+        }]
+    )
+    return fig
+
+
+def write_compact_html(fig: go.Figure, path: Path, include_plotlyjs='cdn', write_gzip: bool = False) -> Path:
+    """
+    Write the figure as a minified standalone HTML file.
+
+    The figure JSON is emitted without whitespace and plotly.js is linked
+    from the CDN by default instead of being inlined. With write_gzip a
+    precompressed `.gz` sibling is written for static servers.
+
+    Args:
+        fig: Figure to write
+        path: Output HTML path
+        include_plotlyjs: Passed to plotly.io.to_html ('cdn', True, False...)
+        write_gzip: Also write `<path>.gz`
+
+    Returns:
+        Path of the HTML file
+    """
+    path = Path(path)
+    html = pio.to_html(fig, include_plotlyjs=include_plotlyjs, full_html=True, auto_play=False)
+    html = '\n'.join(line.strip() for line in html.splitlines() if line.strip())
+    _write_atomic(path, html)
+
+    if write_gzip:
+        gz_path = path.with_name(path.name + '.gz')
+        tmp_path = gz_path.with_name('.' + gz_path.name + '.tmp')
+        # mtime=0 keeps the archive byte-identical across identical runs
+        with open(tmp_path, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=9, mtime=0) as f:
+            f.write(html.encode('utf-8'))
+        tmp_path.replace(gz_path)
+
+    return path
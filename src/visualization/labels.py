@@ -0,0 +1,212 @@
+"""
+Polygon label anchors and a single canvas label layer for Folium maps.
+
+Anchors are computed once per geometry build:
+
+    - position: pole of inaccessibility (polylabel) of the largest part, so
+      labels stay inside concave polygons where the centroid may not;
+      representative_point is the fallback
+    - min_zoom: first zoom level at which the label fits without
+      overlapping a higher-priority (larger) polygon's label, found by a
+      greedy placement in Web Mercator pixel space for each zoom level;
+      with show_all_from, every label is drawn from that zoom on (e.g. the
+      map's opening zoom for the few seccional labels), and collisions
+      only hide labels below it
+
+LabelLayer draws every label on one <canvas> redrawn on pan/zoom, instead
+of one Marker + DivIcon (with inline HTML) per polygon, so the map HTML
+holds one compact JSON array and the DOM one element regardless of the
+number of labels (seccionales or circuits).
+"""
+import json
+import math
+from typing import Optional
+
+import geopandas as gpd
+import numpy as np
+import shapely
+from branca.element import MacroElement
+from jinja2 import Template
+from shapely.ops import polylabel
+
+TILE_SIZE = 256
+CHAR_WIDTH = 0.6  # Average glyph width as a fraction of the font size
+LABEL_PADDING = 4  # Pixels kept free around each label
+
+
+def _largest_part(geometry):
+    parts = shapely.get_parts(geometry)
+    return parts[np.argmax(shapely.area(parts))] if len(parts) > 1 else parts[0]
+
+
+def anchor_points(gdf: gpd.GeoDataFrame, tolerance_m: float = 1.0) -> gpd.GeoSeries:
+    """
+    Label anchor of each polygon (polylabel of its largest part).
+
+    Computed in Web Mercator so the tolerance is in meters and the
+    inaccessibility pole is not stretched by longitude.
+    """
+    projected = gdf.geometry.to_crs(3857) if gdf.crs is not None and gdf.crs.is_geographic else gdf.geometry
+    points = []
+    for geometry in projected:
+        if geometry is None or geometry.is_empty:
+            points.append(None)
+            continue
+        part = _largest_part(geometry)
+        try:
+            point = polylabel(part, tolerance=tolerance_m)
+        except Exception:
+            point = part.representative_point()
+        points.append(point if part.contains(point) else part.representative_point())
+    anchors = gpd.GeoSeries(points, index=gdf.index, crs=projected.crs)
+    return anchors.to_crs(gdf.crs) if anchors.crs != gdf.crs else anchors
+
+
+def _pixels(lon: np.ndarray, lat: np.ndarray, zoom: int):
+    """Web Mercator pixel coordinates at a zoom level."""
+    scale = TILE_SIZE * 2 ** zoom
+    x = (lon + 180.0) / 360.0 * scale
+    sin = np.sin(np.radians(np.clip(lat, -85.0511, 85.0511)))
+    y = (0.5 - np.log((1 + sin) / (1 - sin)) / (4 * math.pi)) * scale
+    return x, y
+
+
+def label_min_zooms(lon, lat, text, priority, min_zoom: int, max_zoom: int,
+                    font_size: int = 11, show_all_from: Optional[int] = None) -> np.ndarray:
+    """
+    First zoom at which each label is drawn without collisions.
+
+    Labels are placed greedily by descending priority at every zoom; a
+    label placed at one zoom stays placed at higher zooms (distances only
+    grow). Labels that never fit get max_zoom + 1 (hidden), unless
+    show_all_from is set: then no label starts later than that zoom.
+    """
+    lon, lat = np.asarray(lon, dtype=float), np.asarray(lat, dtype=float)
+    half_w = np.array([len(str(t)) for t in text]) * font_size * CHAR_WIDTH / 2 + LABEL_PADDING
+    half_h = font_size * 0.6 + LABEL_PADDING
+    order = np.argsort(-np.asarray(priority, dtype=float), kind='stable')
+    shown = np.full(len(lon), max_zoom + 1)
+
+    for zoom in range(min_zoom, max_zoom + 1):
+        x, y = _pixels(lon, lat, zoom)
+        placed = [i for i in order if shown[i] <= zoom]
+        for i in order:
+            if shown[i] <= zoom or np.isnan(x[i]):
+                continue
+            if placed:
+                others = np.asarray(placed)
+                overlap = (np.abs(x[others] - x[i]) < half_w[others] + half_w[i]) & \
+                          (np.abs(y[others] - y[i]) < 2 * half_h)
+                if overlap.any():
+                    continue
+            shown[i] = zoom
+            placed.append(i)
+    if show_all_from is not None:
+        shown = np.minimum(shown, show_all_from)
+    return shown
+
+
+def add_label_anchors(gdf: gpd.GeoDataFrame, text, min_zoom: int = 11, max_zoom: int = 15,
+                      font_size: int = 11, show_all_from: Optional[int] = None) -> gpd.GeoDataFrame:
+    """
+    Add lat, lon, label and min_zoom columns for LabelLayer.
+
+    Args:
+        gdf: Polygons in a geographic CRS
+        text: Label text per row (Series or column name)
+        min_zoom, max_zoom: Zoom range of the map
+        font_size: Label font size in pixels (for collision boxes)
+        show_all_from: Zoom from which every label is drawn even if it
+            collides (default: collisions hide labels at every zoom)
+
+    Returns:
+        Copy of gdf with the anchor columns; larger polygons win collisions
+    """
+    gdf = gdf.copy()
+    anchors = anchor_points(gdf)
+    gdf['lat'] = anchors.y
+    gdf['lon'] = anchors.x
+    gdf['label'] = (gdf[text] if isinstance(text, str) else text).astype(str).values
+    area = gdf.geometry.to_crs(3857).area if gdf.crs is not None and gdf.crs.is_geographic else gdf.geometry.area
+    gdf['min_zoom'] = label_min_zooms(gdf['lon'], gdf['lat'], gdf['label'], area, min_zoom, max_zoom, font_size,
+                                      show_all_from)
+    return gdf
+
+
+def label_data(frame, precision: int = 6) -> list:
+    """Compact [lat, lon, text, min_zoom] rows for LabelLayer."""
+    rows = frame[['lat', 'lon', 'label', 'min_zoom']].dropna(subset=['lat', 'lon'])
+    return [[round(float(lat), precision), round(float(lon), precision), str(label), int(zoom)]
+            for lat, lon, label, zoom in rows.itertuples(index=False)]
+
+
+class LabelLayer(MacroElement):
+    """
+    All polygon labels of a map drawn on one canvas.
+
+    Args:
+        labels: Rows with lat, lon, label and min_zoom (see
+            add_label_anchors), or a precomputed label_data() list
+        font: CSS font shorthand
+        color: Text color
+        halo: Outline color drawn behind the text
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var map = {{ this._parent.get_name() }};
+            var labels = {{ this.data }};
+            var LabelCanvas = L.Layer.extend({
+                onAdd: function(map) {
+                    this._canvas = L.DomUtil.create('canvas', 'leaflet-label-layer');
+                    var style = this._canvas.style;
+                    style.position = 'absolute'; style.top = '0'; style.left = '0';
+                    style.pointerEvents = 'none'; style.zIndex = 450;
+                    map.getContainer().appendChild(this._canvas);
+                    map.on('move zoomend resize viewreset', this._redraw, this);
+                    map.on('zoomstart', this._clear, this);
+                    this._redraw();
+                },
+                onRemove: function(map) {
+                    map.off('move zoomend resize viewreset', this._redraw, this);
+                    map.off('zoomstart', this._clear, this);
+                    L.DomUtil.remove(this._canvas);
+                },
+                _clear: function() {
+                    this._canvas.getContext('2d').clearRect(0, 0, this._canvas.width, this._canvas.height);
+                },
+                _redraw: function() {
+                    var size = map.getSize(), ratio = window.devicePixelRatio || 1;
+                    var canvas = this._canvas, ctx = canvas.getContext('2d');
+                    canvas.width = size.x * ratio; canvas.height = size.y * ratio;
+                    canvas.style.width = size.x + 'px'; canvas.style.height = size.y + 'px';
+                    ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+                    ctx.font = {{ this.font|tojson }};
+                    ctx.textAlign = 'center'; ctx.textBaseline = 'middle';
+                    ctx.lineJoin = 'round'; ctx.lineWidth = 3;
+                    ctx.strokeStyle = {{ this.halo|tojson }}; ctx.fillStyle = {{ this.color|tojson }};
+                    var zoom = map.getZoom(), bounds = map.getBounds().pad(0.1);
+                    for (var i = 0; i < labels.length; i++) {
+                        var l = labels[i];
+                        if (l[3] > zoom || !bounds.contains([l[0], l[1]])) continue;
+                        var p = map.latLngToContainerPoint([l[0], l[1]]);
+                        ctx.strokeText(l[2], p.x, p.y);
+                        ctx.fillText(l[2], p.x, p.y);
+                    }
+                }
+            });
+            new LabelCanvas().addTo(map);
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, labels, font: str = 'bold 11px Arial, sans-serif', color: str = '#1a1a1a',
+                 halo: str = '#ffffff'):
+        super().__init__()
+        self._name = 'LabelLayer'
+        data = labels if isinstance(labels, list) else label_data(labels)
+        self.data = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        self.font = font
+        self.color = color
+        self.halo = halo
@@ -0,0 +1,238 @@
+"""
+Server push of live results to open dashboards (Server-Sent Events).
+
+attach_live_push() adds an SSE route (settings.LIVE_STREAM_PATH) to the
+Flask server behind a Dash app. One LiveBroadcaster thread per process
+watches the snapshot published by src.etl.live; when its version changes
+the thread diffs the seccional totals against the previous version and
+encodes the zones that changed, once, as one SSE message appended to a
+shared log. Every open stream waits on the log's condition and writes
+those same bytes, so an update costs one diff and one encode in total and
+a socket write per viewer. Streams that fall behind the log, or reconnect
+with a Last-Event-ID other than the current version, get the full
+snapshot instead.
+
+Messages (data is JSON; votes are aligned with `parties`):
+    event: snapshot  {"version", "year", "parties", "zones": {seccional: [votes]}}
+    event: delta     {"version", "base", "year", "parties", "zones": {changed seccional: [votes]}}
+
+In the browser (assets/live_push.js) the stream updates the live-data
+store client-side, and a clientside callback patches the charts and
+metrics and recolors the map iframe in place: no figure is refetched.
+
+Each open stream holds a worker thread, so serve with threads or green
+threads (the Procfile and render.yaml use gunicorn --worker-class gthread
+--threads 100; gevent also works); attach_live_push() refuses gunicorn's
+sync worker, where the first viewer would block the whole process. Without
+LIVE_ENABLED the stream is never attached and any worker class will do.
+"""
+import json
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Mapping, Optional
+
+import pandas as pd
+from dash import ClientsideFunction, Input, Output, State, dcc
+from flask import Response, request
+
+from src.config import settings
+from src.etl.live import LiveSnapshot
+from src.monitoring import REGISTRY
+
+LIVE_STREAMS = REGISTRY.gauge('live_push_streams', 'Open live result streams (SSE).')
+LIVE_MESSAGES = REGISTRY.counter('live_push_messages_total', 'Live result messages broadcast by event.', ['event'])
+
+
+def _event(event: str, version: str, payload: dict) -> bytes:
+    data = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+    return f"event: {event}\nid: {version}\ndata: {data}\n\n".encode('utf-8')
+
+
+def zone_vectors(df: pd.DataFrame, parties: Optional[List[str]] = None):
+    """
+    Party list and {seccional: [votes]} of a snapshot.
+
+    Parties already in `parties` keep their position and new ones are
+    appended, so clients can keep their vectors across deltas.
+    """
+    parties = list(parties or [])
+    for party in df['agrupacion'].unique():
+        if party not in parties:
+            parties.append(party)
+    votes = df.pivot_table(index='seccional', columns='agrupacion', values='votos', aggfunc='sum', fill_value=0)
+    votes = votes.reindex(columns=parties, fill_value=0)
+    return parties, {str(zone): [int(v) for v in row] for zone, row in zip(votes.index, votes.to_numpy())}
+
+
+class LiveBroadcaster:
+    """
+    Turns snapshot versions into SSE messages shared by every stream.
+
+    Args:
+        snapshot: Snapshot reader (default: settings.LIVE_DIR)
+        interval: Seconds between snapshot checks
+        history: Messages kept for streams that are catching up
+        heartbeat: Seconds of silence before a keep-alive comment
+        on_update: Called with the new seccional results (e.g. to refresh
+            the server-side data the regular callbacks render)
+    """
+
+    def __init__(self, snapshot: Optional[LiveSnapshot] = None, interval: float = settings.LIVE_POLL_SECONDS,
+                 history: int = settings.LIVE_PUSH_HISTORY, heartbeat: float = settings.LIVE_PUSH_HEARTBEAT,
+                 on_update: Optional[Callable[[pd.DataFrame], None]] = None):
+        self.snapshot = snapshot or LiveSnapshot()
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.on_update = on_update
+        self.version: Optional[str] = None
+        self._condition = threading.Condition()
+        self._log: deque = deque(maxlen=history)
+        self._sequence = 0
+        self._snapshot_message: Optional[bytes] = None
+        self._parties: List[str] = []
+        self._zones: Dict[str, List[int]] = {}
+        self._year: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'LiveBroadcaster':
+        """Start the watcher thread (once)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='live-broadcaster', daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.poll()
+            except Exception as error:  # Keep broadcasting after a bad snapshot
+                print(f"[LIVE] Broadcast failed: {error}")
+            time.sleep(self.interval)
+
+    def poll(self) -> bool:
+        """Broadcast the snapshot if a new version was published; True if it was."""
+        df = self.snapshot.poll()
+        if df is None:
+            return False
+        year, version = self.snapshot.year, self.snapshot.version
+        parties, zones = zone_vectors(df, self._parties if year == self._year else None)
+
+        snapshot = _event('snapshot', version, {'version': version, 'year': year, 'parties': parties, 'zones': zones})
+        if self.version is None or year != self._year:
+            message, event = snapshot, 'snapshot'
+        else:
+            width = len(parties)
+            changed = {zone: votes for zone, votes in zones.items()
+                       if self._zones.get(zone, []) + [0] * (width - len(self._zones.get(zone, []))) != votes}
+            message, event = _event('delta', version, {'version': version, 'base': self.version, 'year': year,
+                                                       'parties': parties, 'zones': changed}), 'delta'
+
+        if self.on_update is not None:
+            self.on_update(df)
+        with self._condition:
+            self.version, self._year, self._parties, self._zones = version, year, parties, zones
+            self._snapshot_message = snapshot
+            self._sequence += 1
+            self._log.append((self._sequence, message))
+            self._condition.notify_all()
+        LIVE_MESSAGES.inc(event=event)
+        return True
+
+    def stream(self, last_event_id: Optional[str] = None) -> Iterator[bytes]:
+        """SSE byte stream of one client: the snapshot if it is behind, then every message."""
+        with self._condition:
+            sequence = self._sequence
+            first = self._snapshot_message if last_event_id != self.version else None
+
+        LIVE_STREAMS.inc()
+        try:
+            yield b'retry: 3000\n\n'
+            if first is not None:
+                yield first
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._sequence > sequence, timeout=self.heartbeat)
+                    if self._sequence == sequence:
+                        messages = None
+                    elif not self._log or self._log[0][0] > sequence + 1:
+                        messages = [self._snapshot_message]  # Fell behind the log
+                    else:
+                        messages = [message for number, message in self._log if number > sequence]
+                    sequence = self._sequence
+                if messages is None:
+                    yield b': keep-alive\n\n'
+                else:
+                    yield from messages
+        finally:
+            LIVE_STREAMS.dec()
+
+
+def live_push_components(colors: Mapping[str, str], path: str = settings.LIVE_STREAM_PATH) -> list:
+    """Layout stores for the live stream (config for assets/live_push.js and the client-side state)."""
+    config = {'url': path, 'colors': dict(colors), 'default': colors.get('DEFAULT', '#CCCCCC')} \
+        if settings.LIVE_ENABLED else None
+    return [dcc.Store(id='live-config', data=config), dcc.Store(id='live-data')]
+
+
+def _sync_worker() -> bool:
+    """True when running in a gunicorn sync worker (one request at a time)."""
+    threaded = ('gunicorn.workers.gthread', 'gunicorn.workers.base_async')
+    return 'gunicorn.workers.sync' in sys.modules and not any(name in sys.modules for name in threaded)
+
+
+def attach_live_push(app, on_update: Optional[Callable[[pd.DataFrame], None]] = None,
+                     path: str = settings.LIVE_STREAM_PATH,
+                     broadcaster: Optional[LiveBroadcaster] = None) -> LiveBroadcaster:
+    """
+    Serve live results over SSE and apply them in the browser.
+
+    The layout must include live_push_components(); the clientside
+    callbacks update pie-chart, bar-chart, metric-total-votos and
+    metric-ganador, and recolor the map in electoral-map, when the
+    selected year is the one being counted.
+
+    Args:
+        app: dash.Dash instance (its Flask server gets the route)
+        on_update: See LiveBroadcaster
+        path: Route of the event stream
+        broadcaster: Broadcaster to serve (default: a new one)
+
+    Returns:
+        The running broadcaster
+
+    Raises:
+        RuntimeError: Under gunicorn's sync worker, which cannot hold streams open
+    """
+    if _sync_worker():
+        raise RuntimeError('Live push needs a threaded or async worker '
+                           '(gunicorn --worker-class gthread --threads 100)')
+    broadcaster = broadcaster or LiveBroadcaster(on_update=on_update)
+
+    def _stream_view():
+        return Response(broadcaster.stream(request.headers.get('Last-Event-ID')), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+    app.server.add_url_rule(path, 'live_stream', _stream_view)
+
+    app.clientside_callback(
+        ClientsideFunction(namespace='live', function_name='connect'),
+        Output('live-data', 'data'),
+        Input('live-config', 'data'),
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='live', function_name='apply'),
+        [Output('pie-chart', 'figure', allow_duplicate=True),
+         Output('bar-chart', 'figure', allow_duplicate=True),
+         Output('metric-total-votos', 'children', allow_duplicate=True),
+         Output('metric-ganador', 'children', allow_duplicate=True)],
+        Input('live-data', 'data'),
+        [State('live-config', 'data'),
+         State('year-slider', 'value'),
+         State('seccional-dropdown', 'value'),
+         State('pie-chart', 'figure'),
+         State('bar-chart', 'figure')],
+        prevent_initial_call=True,
+    )
+    return broadcaster.start()
@@ -0,0 +1,384 @@
+"""
+Electoral map generator - static Folium maps colored by winning party.
+
+The seccional geometry, its GeoJSON features and the label layer are built
+once per generator. Rendering a year only swaps the per-seccional style and
+tooltip properties, so regenerating many elections costs one serialization
+per year instead of one dissolve, one label anchor pass and one DataFrame scan
+per feature.
+"""
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import folium
+import geopandas as gpd
+import pandas as pd
+
+from src.analysis.winners import WinnerIndex
+from src.config import settings
+from src.etl.coverage import dissolve_coverage
+from .labels import LabelLayer, add_label_anchors, label_data
+
+# ============================================================================
+# PALETA DE COLORES ELECTORAL
+# ============================================================================
+PARTY_COLORS = {
+    'LA LIBERTAD AVANZA': '#9370DB',           # Violeta
+    'ALIANZA LA LIBERTAD AVANZA': '#9370DB',   # Violeta
+    'JUNTOS POR EL CAMBIO': '#FFD700',         # Amarillo
+    'HACEMOS POR CÓRDOBA': '#87CEEB',          # Celeste
+    'UNIÓN POR LA PATRIA': '#0047AB',          # Azul
+    'FRENTE DE IZQUIERDA': '#DC143C',          # Rojo
+    'FRENTE DE IZQUIERDA  Y DE TRABAJADORES - UNIDAD': '#DC143C',
+    'ENCUENTRO VECINAL CÓRDOBA': '#98D8C8',
+    'ALIANZA PROVINCIAS UNIDAS': '#F08080',
+    'DEFENDAMOS CÓRDOBA': '#20B2AA',
+    'DEFAULT': '#CCCCCC'  # Gris
+}
+
+BORDER_COLOR = '#2E86AB'
+
+# Paleta cualitativa para grupos de perfiles electorales (clustering)
+CLUSTER_COLORS = ['#1b9e77', '#d95f02', '#7570b3', '#e7298a', '#66a61e', '#e6ab02', '#a6761d', '#666666']
+
+TOOLTIP_FIELDS = ['nombre', 'agrupacion', 'votos_formatted', 'porcentaje_formatted', 'total_votos_formatted']
+TOOLTIP_ALIASES = ['Seccional:', 'Ganador:', 'Votos:', 'Porcentaje:', 'Total votos:']
+TOOLTIP_STYLE = (
+    "background-color: white; "
+    "color: #333333; "
+    "font-family: Arial, sans-serif; "
+    "font-size: 13px; "
+    "padding: 10px; "
+    "border: 2px solid #2E86AB; "
+    "border-radius: 4px; "
+    "box-shadow: 0 2px 4px rgba(0,0,0,0.2);"
+)
+
+LABEL_FONT = '500 13px Arial, sans-serif'
+MIN_ZOOM, MAX_ZOOM = 11, 14
+
+
+def build_base_geometry(geojson_path: Path = settings.GEOJSON_FILE,
+                        simplify_tolerance: float = 0.001) -> gpd.GeoDataFrame:
+    """
+    Merge circuits into simplified seccional polygons with label anchors.
+
+    The circuit coverage is repaired and merged along shared edges
+    (src.etl.coverage.dissolve_coverage), as in the ETL.
+
+    Args:
+        geojson_path: Circuit-level GeoJSON file
+        simplify_tolerance: Simplification tolerance in degrees
+
+    Returns:
+        GeoDataFrame with Seccional, nombre, lat, lon, label, min_zoom and
+        geometry columns (see labels.add_label_anchors)
+    """
+    dissolved = dissolve_coverage(gpd.read_file(geojson_path), by='Seccional')
+    dissolved['geometry'] = dissolved.geometry.simplify(tolerance=simplify_tolerance, preserve_topology=True)
+    dissolved['Seccional'] = dissolved['Seccional'].astype(str)
+    dissolved['nombre'] = 'Seccional ' + dissolved['Seccional']
+    # Seccional labels are few: all of them are shown from the opening zoom
+    dissolved = add_label_anchors(dissolved, 'nombre', MIN_ZOOM, MAX_ZOOM, font_size=13,
+                                  show_all_from=settings.DEFAULT_ZOOM)
+
+    return dissolved[['Seccional', 'nombre', 'lat', 'lon', 'label', 'min_zoom', 'geometry']]
+
+
+def compute_winners(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Get the winning party for every (anio, seccional) pair.
+
+    Args:
+        df: Electoral dataframe with anio, seccional, agrupacion and votos
+
+    Returns:
+        DataFrame with one winner row per year and seccional
+    """
+    ganadores = WinnerIndex.from_frame(df).frame()
+    return ganadores[['anio', 'seccional', 'agrupacion', 'votos', 'porcentaje', 'total_votos']]
+
+
+def _format_int(value) -> str:
+    return f'{int(value):,}' if pd.notna(value) else 'N/D'
+
+
+def _format_pct(value) -> str:
+    return f'{value:.1f}%' if pd.notna(value) else 'N/D'
+
+
+def build_year_layers(ganadores: pd.DataFrame) -> Dict[int, Dict[str, dict]]:
+    """
+    Precompute the style and tooltip data of every seccional for every year.
+
+    Args:
+        ganadores: Winners dataframe from compute_winners
+
+    Returns:
+        Mapping year -> seccional -> properties dict
+    """
+    ganadores = ganadores.assign(
+        seccional=ganadores['seccional'].astype(str),
+        color=ganadores['agrupacion'].map(PARTY_COLORS).fillna(PARTY_COLORS['DEFAULT']),
+        votos_formatted=ganadores['votos'].map(_format_int),
+        porcentaje_formatted=ganadores['porcentaje'].map(_format_pct),
+        total_votos_formatted=ganadores['total_votos'].map(_format_int),
+    )
+
+    layers: Dict[int, Dict[str, dict]] = {}
+    columns = ['agrupacion', 'color', 'votos_formatted', 'porcentaje_formatted', 'total_votos_formatted']
+    for anio, seccional, *values in ganadores[['anio', 'seccional'] + columns].itertuples(index=False):
+        layers.setdefault(int(anio), {})[seccional] = dict(zip(columns, values))
+
+    return layers
+
+
+def cluster_layer(gdf: gpd.GeoDataFrame, zone_column: str, clusters: pd.DataFrame,
+                  name: str = 'Perfiles electorales', show: bool = False) -> folium.FeatureGroup:
+    """
+    Toggleable overlay coloring zones by electoral-profile cluster.
+
+    Args:
+        gdf: Zone polygons
+        zone_column: Zone id column of gdf (matched as str)
+        clusters: zone, cluster and perfil columns (see
+            src.analysis.clustering.zone_clusters)
+        name: Layer name in the LayerControl
+        show: Visible when the map opens
+
+    Returns:
+        FeatureGroup to add to a map alongside folium.LayerControl
+    """
+    zone = clusters.columns[0]
+    data = gdf[[zone_column, 'geometry']].assign(**{zone_column: gdf[zone_column].astype(str)})
+    data = data.merge(clusters.assign(**{zone: clusters[zone].astype(str)}),
+                      left_on=zone_column, right_on=zone, how='inner')
+    data['grupo'] = 'Grupo ' + (data['cluster'] + 1).astype(str)
+    data['color'] = [CLUSTER_COLORS[c % len(CLUSTER_COLORS)] for c in data['cluster']]
+
+    layer = folium.FeatureGroup(name=name, show=show)
+    folium.GeoJson(
+        data[[zone_column, 'grupo', 'perfil', 'color', 'geometry']],
+        style_function=lambda feature: {
+            'fillColor': feature['properties']['color'],
+            'fillOpacity': 0.7,
+            'color': '#333333',
+            'weight': 1,
+            'opacity': 1
+        },
+        tooltip=folium.GeoJsonTooltip(
+            fields=[zone_column, 'grupo', 'perfil'],
+            aliases=[f'{zone_column}:', 'Grupo:', 'Perfil:'],
+            style=TOOLTIP_STYLE,
+            sticky=False
+        )
+    ).add_to(layer)
+    return layer
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    """Write text to path through a temporary file in the same directory."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class ElectoralMapGenerator:
+    """
+    Render per-year electoral maps over a shared base geometry.
+
+    The GeoJSON features and label anchors are derived once from the base
+    geometry; render() only attaches the year's style and tooltip properties.
+    """
+
+    def __init__(self, base: gpd.GeoDataFrame, ganadores: pd.DataFrame):
+        self.layers = build_year_layers(ganadores)
+
+        geometries = json.loads(base[['Seccional', 'geometry']].to_json())['features']
+        self._base_features = [
+            (seccional, nombre, feature['geometry'])
+            for seccional, nombre, feature in zip(base['Seccional'], base['nombre'], geometries)
+        ]
+        self._labels = label_data(base)
+
+    @classmethod
+    def from_files(cls, geojson_path: Path = settings.GEOJSON_FILE,
+                   csv_path: Path = settings.CLEAN_CSV) -> 'ElectoralMapGenerator':
+        """Build a generator from the raw GeoJSON and the processed CSV."""
+        df_electoral = pd.read_csv(csv_path)
+        df_electoral['seccional'] = df_electoral['seccional'].astype(str)
+        return cls(build_base_geometry(geojson_path), compute_winners(df_electoral))
+
+    @property
+    def years(self) -> List[int]:
+        return sorted(self.layers)
+
+    @property
+    def seccionales(self) -> List[str]:
+        return [seccional for seccional, _, _ in self._base_features]
+
+    def winner_counts(self, year: int) -> Dict[str, int]:
+        """Number of seccionales won by each party in a year."""
+        counts: Dict[str, int] = {}
+        for info in self.layers.get(year, {}).values():
+            counts[info['agrupacion']] = counts.get(info['agrupacion'], 0) + 1
+        return counts
+
+    def feature_collection(self, year: int) -> dict:
+        """GeoJSON FeatureCollection for a year, sharing the base geometries."""
+        year_layer = self.layers.get(year, {})
+        features = []
+        for seccional, nombre, geometry in self._base_features:
+            info = year_layer.get(seccional)
+            properties = {
+                'Seccional': seccional,
+                'nombre': nombre,
+                'agrupacion': info['agrupacion'] if info else 'N/D',
+                'color': info['color'] if info else PARTY_COLORS['DEFAULT'],
+                'votos_formatted': info['votos_formatted'] if info else 'N/D',
+                'porcentaje_formatted': info['porcentaje_formatted'] if info else 'N/D',
+                'total_votos_formatted': info['total_votos_formatted'] if info else 'N/D',
+            }
+            features.append({'type': 'Feature', 'id': seccional, 'properties': properties, 'geometry': geometry})
+
+        return {'type': 'FeatureCollection', 'features': features}
+
+    def legend_html(self, year: int) -> str:
+        """Legend with the parties that won at least one seccional."""
+        counts = self.winner_counts(year)
+
+        legend_html = f'''
+        <div style="
+            position: fixed;
+            bottom: 50px;
+            right: 50px;
+            width: 250px;
+            background-color: white;
+            border: 2px solid #2E86AB;
+            border-radius: 5px;
+            padding: 15px;
+            font-family: Arial, sans-serif;
+            font-size: 12px;
+            box-shadow: 0 2px 6px rgba(0,0,0,0.3);
+            z-index: 9999;
+        ">
+            <h4 style="margin: 0 0 10px 0; color: #2E86AB; font-size: 14px;">
+                ELECCIONES {year}
+            </h4>
+        '''
+        for partido in sorted(counts):
+            color = PARTY_COLORS.get(partido, PARTY_COLORS['DEFAULT'])
+            legend_html += f'''
+            <div style="margin: 5px 0;">
+                <span style="
+                    display: inline-block;
+                    width: 20px;
+                    height: 14px;
+                    background-color: {color};
+                    border: 1px solid #333;
+                    margin-right: 8px;
+                    vertical-align: middle;
+                "></span>
+                <span style="font-size: 11px;">{partido} ({counts[partido]})</span>
+            </div>
+            '''
+        legend_html += '</div>'
+        return legend_html
+
+    def build_map(self, year: int) -> folium.Map:
+        """Create the Folium map for a year."""
+        m = folium.Map(
+            location=settings.CORDOBA_CENTER,
+            zoom_start=settings.DEFAULT_ZOOM,
+            tiles='CartoDB positron',
+            max_zoom=MAX_ZOOM,
+            min_zoom=MIN_ZOOM
+        )
+
+        folium.GeoJson(
+            self.feature_collection(year),
+            name='Seccionales',
+            style_function=lambda feature: {
+                'fillColor': feature['properties']['color'],
+                'fillOpacity': 0.6,
+                'color': BORDER_COLOR,
+                'weight': 1.5,
+                'opacity': 1
+            },
+            highlight_function=lambda feature: {
+                'fillColor': feature['properties']['color'],
+                'fillOpacity': 0.85,
+                'color': BORDER_COLOR,
+                'weight': 2.5,
+                'opacity': 1
+            },
+            tooltip=folium.GeoJsonTooltip(
+                fields=TOOLTIP_FIELDS,
+                aliases=TOOLTIP_ALIASES,
+                style=TOOLTIP_STYLE,
+                sticky=False
+            )
+        ).add_to(m)
+
+        LabelLayer(self._labels, font=LABEL_FONT).add_to(m)
+
+        m.get_root().html.add_child(folium.Element(self.legend_html(year)))
+        return m
+
+    def render(self, year: int) -> str:
+        """Render the full standalone HTML document for a year."""
+        return self.build_map(year).get_root().render()
+
+    def write(self, year: int, output_dir: Path) -> Path:
+        """Render a year and write it atomically to output_dir."""
+        path = Path(output_dir) / f'mapa_electoral_{year}.html'
+        _write_atomic(path, self.render(year))
+        return path
+
+    def generate(self, years: Optional[Iterable[int]] = None,
+                 output_dir: Path = settings.ANALYSIS_DIR,
+                 workers: Optional[int] = None) -> List[Path]:
+        """
+        Render and write maps for several years.
+
+        Args:
+            years: Years to render (default: every year with data)
+            output_dir: Destination directory
+            workers: Worker processes (default: one per year up to CPU count;
+                1 renders in-process)
+
+        Returns:
+            Paths of the written files, in the order of years
+        """
+        years = list(self.years if years is None else years)
+        if workers is None:
+            workers = min(len(years), os.cpu_count() or 1)
+
+        if workers <= 1 or len(years) <= 1:
+            return [self.write(year, output_dir) for year in years]
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as pool:
+            return list(pool.map(_write_year, years, [output_dir] * len(years)))
+
+
+_worker_generator: Optional[ElectoralMapGenerator] = None
+
+
+def _init_worker(generator: ElectoralMapGenerator) -> None:
+    global _worker_generator
+    _worker_generator = generator
+
+
+def _write_year(year: int, output_dir: Path) -> Path:
+    return _worker_generator.write(year, output_dir)
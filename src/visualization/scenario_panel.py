@@ -0,0 +1,177 @@
+"""
+Dashboard panel for what-if scenarios: coalitions and uniform swing.
+
+The panel holds a Plotly map (one Choroplethmap trace per winning list)
+and a table of zones won and seats, observed vs scenario. Every control
+change runs one ScenarioEngine.run() over the preloaded share matrix and
+rebuilds the figure from a GeoJSON serialized once at registration, so the
+callback stays well under 100 ms; unlike the Folium maps no HTML document
+is rendered per update.
+"""
+import json
+from typing import Dict, List, Mapping, Optional
+
+import dash_bootstrap_components as dbc
+import geopandas as gpd
+import plotly.graph_objects as go
+from dash import Input, Output, callback, dcc, html
+
+from src.analysis.scenarios import ScenarioEngine, ScenarioResult
+from src.config import settings
+
+FALLBACK_COLORS = ['#8dd3c7', '#bebada', '#fb8072', '#80b1d3', '#fdb462', '#b3de69', '#fccde5', '#bc80bd']
+SWING_RANGE = 10  # Slider range in points (+/-)
+
+
+def coalition_name(members: List[str]) -> str:
+    return ' + '.join(members)
+
+
+def party_color(party: str, colors: Mapping[str, str], members: Optional[List[str]] = None) -> str:
+    """Party color; a coalition takes the color of its first member with one."""
+    for name in [party] + list(members or []):
+        if name in colors:
+            return colors[name]
+    return FALLBACK_COLORS[sum(map(ord, party)) % len(FALLBACK_COLORS)]
+
+
+def scenario_panel(engine: ScenarioEngine, title: str = "Escenarios: ¿qué pasaría si...?") -> dbc.Row:
+    """Layout of the scenario panel (controls, map and seats table)."""
+    year = max(engine.years)
+    return dbc.Row([
+        dbc.Col([
+            dbc.Card([
+                dbc.CardHeader(html.H3(title), className="card-header-custom"),
+                dbc.CardBody([
+                    dbc.Row([
+                        dbc.Col([
+                            html.Label("Año:", className="fw-bold mb-1"),
+                            dcc.Dropdown(id="scenario-year", value=year, clearable=False,
+                                         options=[{'label': str(y), 'value': y} for y in engine.years])
+                        ], md=2),
+                        dbc.Col([
+                            html.Label("Listas que compiten juntas:", className="fw-bold mb-1"),
+                            dcc.Dropdown(id="scenario-merge", multi=True, value=[],
+                                         placeholder="Seleccionar dos o más listas")
+                        ], md=5),
+                        dbc.Col([
+                            html.Label("Swing uniforme (puntos):", className="fw-bold mb-1"),
+                            dcc.Dropdown(id="scenario-swing-party", placeholder="Lista"),
+                            dcc.Slider(id="scenario-swing", min=-SWING_RANGE, max=SWING_RANGE, step=0.5, value=0,
+                                       marks={v: f'{v:+d}' for v in range(-SWING_RANGE, SWING_RANGE + 1, 5)})
+                        ], md=5)
+                    ], className="mb-3"),
+                    dbc.Row([
+                        dbc.Col(dcc.Graph(id="scenario-map", style={"height": "50vh"},
+                                          config={'responsive': True, 'displayModeBar': False}), md=8),
+                        dbc.Col(html.Div(id="scenario-seats"), md=4)
+                    ])
+                ])
+            ])
+        ])
+    ], className="mb-3")
+
+
+def _figure(result: ScenarioResult, geojson: dict, zone_property: str, colors: Mapping[str, str],
+            members: Dict[str, List[str]]) -> go.Figure:
+    winners = result.winner[0, 0]
+    margin = result.margin[0, 0]
+    share = result.shares[0, 0][range(len(result.zones)), winners]
+    figure = go.Figure()
+    for index in sorted(set(winners.tolist()), key=lambda i: result.parties[i]):
+        party = result.parties[index]
+        zones = [z for z, w in enumerate(winners) if w == index]
+        color = party_color(party, colors, members.get(party))
+        figure.add_trace(go.Choroplethmap(
+            geojson=geojson, featureidkey=f'properties.{zone_property}',
+            locations=[result.zones[z] for z in zones], z=[1] * len(zones),
+            colorscale=[[0, color], [1, color]], showscale=False, name=party, showlegend=True,
+            marker={'opacity': 0.7, 'line': {'width': 1, 'color': '#2E86AB'}},
+            customdata=[[share[z] * 100, margin[z]] for z in zones],
+            hovertemplate=(f'<b>%{{location}}</b><br>{party}<br>%{{customdata[0]:.1f}}% '
+                           '(margen %{customdata[1]:.1f} pts)<extra></extra>'),
+        ))
+    figure.update_layout(
+        map={'style': 'carto-positron', 'zoom': 10.5,
+             'center': {'lat': settings.CORDOBA_CENTER[0], 'lon': settings.CORDOBA_CENTER[1]}},
+        margin={'l': 0, 'r': 0, 't': 0, 'b': 0},
+        legend={'yanchor': 'top', 'y': 0.99, 'xanchor': 'left', 'x': 0.01, 'font': {'size': 10},
+                'bgcolor': 'rgba(255,255,255,0.8)'},
+        uirevision='scenario',
+    )
+    return figure
+
+
+def _seats_table(base: ScenarioResult, scenario: ScenarioResult, colors: Mapping[str, str],
+                 members: Dict[str, List[str]]):
+    observed = base.totals().set_index('agrupacion')
+    simulated = scenario.totals().set_index('agrupacion')
+    parties = sorted(set(observed.index) | set(simulated.index),
+                     key=lambda p: (-simulated['bancas'].get(p, 0), -simulated['zonas_ganadas'].get(p, 0), p))
+    rows = []
+    for party in parties:
+        def cell(column):
+            before, after = int(observed[column].get(party, 0)), int(simulated[column].get(party, 0))
+            return html.Td(f"{before} → {after}" if before != after else str(after),
+                           style={'fontWeight': 'bold' if before != after else 'normal'})
+        rows.append(html.Tr([
+            html.Td(party, style={'fontSize': '11px',
+                                  'borderLeft': f'6px solid {party_color(party, colors, members.get(party))}'}),
+            cell('zonas_ganadas'),
+            cell('bancas'),
+        ]))
+    header = html.Thead(html.Tr([html.Th("Lista"), html.Th("Seccionales"), html.Th("Bancas")]))
+    return dbc.Table([header, html.Tbody(rows)], bordered=True, hover=True, size='sm', responsive=True)
+
+
+def register_scenario_callbacks(engine: ScenarioEngine, gdf: gpd.GeoDataFrame, zone_column: str,
+                                colors: Mapping[str, str], refresh_id: Optional[str] = None) -> None:
+    """
+    Register the panel callbacks.
+
+    Args:
+        engine: Scenario engine over the same zones as gdf
+        gdf: Zone polygons (simplified; serialized once here)
+        zone_column: Zone id column of gdf
+        colors: Party colors
+        refresh_id: Store whose data changes when the engine is updated
+            (e.g. live-data); the scenario is re-run on each change
+    """
+    geojson = json.loads(gdf[[zone_column, 'geometry']].assign(
+        **{zone_column: gdf[zone_column].astype(str)}).to_json())
+
+    @callback(
+        [Output("scenario-merge", "options"),
+         Output("scenario-swing-party", "options")],
+        [Input("scenario-year", "value"),
+         Input("scenario-merge", "value")]
+    )
+    def update_scenario_options(year, merge):
+        parties = engine.parties_with_votes(year)
+        merge = [party for party in (merge or []) if party in parties]
+        swing_parties = ([coalition_name(merge)] if len(merge) > 1 else []) + \
+                        [party for party in parties if len(merge) < 2 or party not in merge]
+        return ([{'label': party, 'value': party} for party in parties],
+                [{'label': party, 'value': party} for party in swing_parties])
+
+    @callback(
+        [Output("scenario-map", "figure"),
+         Output("scenario-seats", "children")],
+        [Input("scenario-year", "value"),
+         Input("scenario-merge", "value"),
+         Input("scenario-swing-party", "value"),
+         Input("scenario-swing", "value")] + ([Input(refresh_id, "data")] if refresh_id else [])
+    )
+    def update_scenario(year, merge, swing_party, swing, *refresh):
+        merge = [party for party in (merge or []) if party in engine.parties_with_votes(year)]
+        members = {coalition_name(merge): merge} if len(merge) > 1 else {}
+        if swing_party in merge and members:
+            swing_party = coalition_name(merge)
+        swing = {swing_party: swing} if swing_party and swing else None
+        if swing_party and swing and swing_party not in members and swing_party not in engine.parties:
+            swing = None
+
+        base = engine.run(years=[year])
+        scenario = engine.run(members or None, swing, years=[year])
+        return (_figure(scenario, geojson, zone_column, colors, members),
+                _seats_table(base, scenario, colors, members))
@@ -7,6 +7,8 @@ import pandas as pd
 import geopandas as gpd
 import json
 
+from src.analysis.winners import WinnerIndex
+
 # Colores de partidos
 PARTY_COLORS = {
     'LA LIBERTAD AVANZA': '#9370DB',
@@ -33,7 +35,7 @@ dissolved['Seccional'] = dissolved['Seccional'].astype(str)
 df_electoral = pd.read_csv('data/processed/electoral_data_clean.csv')
 df_electoral['seccional'] = df_electoral['seccional'].astype(str)
 
-ganadores = df_electoral.loc[df_electoral.groupby(['anio', 'seccional'])['votos'].idxmax()]
+ganadores = WinnerIndex.from_frame(df_electoral).frame()
 
 print(f"   OK Datos cargados: {len(dissolved)} seccionales, {len(df_electoral)} registros")
 